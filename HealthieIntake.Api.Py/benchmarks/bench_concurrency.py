@@ -0,0 +1,82 @@
+"""
+Concurrency benchmark: patient searches mixed with draft saves
+
+Fires concurrent `/api/healthie/patients/search` calls (which go to
+Healthie) together with `/api/intake/draft` saves and `/` probes (which
+do not). With a blocking Healthie transport the draft and probe latencies
+track the stub's latency; with the async transport they should not.
+
+Usage:
+    python -m benchmarks.stub_healthie --latency-ms 250 &
+    HEALTHIE_API_URL=http://127.0.0.1:8765/graphql uvicorn main:app --port 5096 &
+    python -m benchmarks.bench_concurrency --searches 50 --drafts 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _timed(client: httpx.AsyncClient, results: Dict[str, List[float]], name: str,
+                 method: str, url: str, **kwargs) -> None:
+    start = time.perf_counter()
+    response = await client.request(method, url, **kwargs)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if response.status_code >= 400:
+        results.setdefault(f"{name} (errors)", []).append(elapsed_ms)
+    else:
+        results.setdefault(name, []).append(elapsed_ms)
+
+
+async def run(base_url: str, searches: int, drafts: int, probes: int) -> Dict[str, List[float]]:
+    results: Dict[str, List[float]] = {}
+    limits = httpx.Limits(max_connections=500, max_keepalive_connections=500)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        tasks = []
+        for i in range(searches):
+            tasks.append(_timed(client, results, "search", "POST", "/api/healthie/patients/search",
+                                json={"firstName": "John", "lastName": "Doe", "dob": "1990-01-01"}))
+        for i in range(drafts):
+            tasks.append(_timed(client, results, "draft", "POST", "/api/intake/draft",
+                                json={"patient_healthie_id": f"bench-{i}", "first_name": "John",
+                                      "last_name": "Doe", "current_step": "2",
+                                      "form_data": {"gender": "Male"}}))
+        for i in range(probes):
+            tasks.append(_timed(client, results, "root", "GET", "/"))
+
+        await asyncio.gather(*tasks)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search + draft save concurrency benchmark")
+    parser.add_argument("--base-url", default="http://127.0.0.1:5096")
+    parser.add_argument("--searches", type=int, default=50)
+    parser.add_argument("--drafts", type=int, default=200,
+                        help="Draft saves (requires PostgreSQL); 0 to skip")
+    parser.add_argument("--probes", type=int, default=200,
+                        help="GET / requests that touch neither Healthie nor PostgreSQL")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.base_url, args.searches, args.drafts, args.probes))
+
+    print(f"{'route':<20}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for name, samples in sorted(results.items()):
+        print(f"{name:<20}{len(samples):>6}{_percentile(samples, 50):>10.1f}"
+              f"{_percentile(samples, 95):>10.1f}{_percentile(samples, 99):>10.1f}"
+              f"{statistics.mean(samples):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
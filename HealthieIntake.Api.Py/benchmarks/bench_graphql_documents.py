@@ -0,0 +1,56 @@
+"""
+GraphQL document micro-benchmark: per-call parsing vs the pre-parsed registry
+
+Per Healthie call, compares the client-side CPU spent on the document:
+    inline     gql(source) in the method body plus print_ast() in the
+               transport, as every call did before the registry
+    registry   lookup() of the pre-parsed document and its pre-printed text
+
+Also reports request body size with the full query text vs a hash-only
+persisted query.
+
+Usage:
+    python -m benchmarks.bench_graphql_documents
+    python -m benchmarks.bench_graphql_documents --rounds 5000
+"""
+import argparse
+import json
+import timeit
+
+from gql import gql
+from graphql import print_ast
+
+from services import healthie_client  # noqa: F401  (registers the client's documents)
+from services.graphql_documents import lookup, registered_documents
+
+
+def measure(func, rounds: int) -> float:
+    """Best-of-5 mean microseconds per call"""
+    timer = timeit.Timer(func)
+    return min(timer.repeat(repeat=5, number=rounds)) / rounds * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GraphQL document parsing micro-benchmark")
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    documents = {name: doc for name, doc in registered_documents().items()
+                 if not name.startswith("form_answer_groups_batch_")}
+    # Batched history document at the default batch size
+    documents["form_answer_groups_batch_25"] = lookup(healthie_client._form_answer_groups_batch_document(25))
+
+    print(f"{'document':<38}{'inline us':>11}{'registry us':>13}{'saved':>8}{'full B':>9}{'hash B':>8}")
+    for name, persisted in documents.items():
+        source = persisted.query
+        inline_us = measure(lambda: print_ast(gql(source)), args.rounds)
+        registry_us = measure(lambda: lookup(persisted.document).query, args.rounds)
+
+        full_size = len(json.dumps({"query": persisted.query}))
+        hash_size = len(json.dumps({"extensions": {"persistedQuery": {"version": 1, "sha256Hash": persisted.sha256}}}))
+        print(f"{name:<38}{inline_us:>11.1f}{registry_us:>13.2f}{inline_us - registry_us:>8.1f}"
+              f"{full_size:>9}{hash_size:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Serialization micro-benchmark: FastAPI default path vs the fast_json path
+
+Compares, per payload, what a route spends turning its return value into
+response bytes:
+    default    response_model validation + serialization (models), or
+               jsonable_encoder + JSONResponse.render (dicts)
+    fast_json  model_json() (models), or ORJSONResponse.render (dicts)
+
+Payloads mirror production shapes: a single intake (with and without an
+inline signature data URL), the 50-row /api/intake/list page, the form
+structure and a patient search result.
+
+Usage:
+    python -m benchmarks.bench_serialization
+    python -m benchmarks.bench_serialization --rounds 2000 --answers 200
+"""
+import argparse
+import asyncio
+import base64
+import os
+import timeit
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from fast_json import model_json
+from models import CustomModuleForm, Patient
+from models.custom_module import CustomModule
+
+
+def make_intake(index: int, answers: int, inline_signature: bool) -> Dict[str, Any]:
+    """An IntakeRecord.to_dict()-shaped intake"""
+    now = datetime.now(timezone.utc).isoformat()
+    signature = ("data:image/png;base64," + base64.b64encode(os.urandom(24_000)).decode()
+                 if inline_signature else "blob:sha256:" + "ab" * 32)
+    return {
+        "id": str(uuid.uuid4()),
+        "patient_healthie_id": str(3642270 + index),
+        "first_name": "John",
+        "last_name": "Doe",
+        "email": f"patient{index}@example.com",
+        "date_of_birth": "1990-01-01",
+        "phone": "(555) 123-4567",
+        "schema_version": "1.0-poc",
+        "status": "completed",
+        "current_step": "6",
+        "created_at": now,
+        "updated_at": now,
+        "last_updated_at": now,
+        "submitted_at": now,
+        "form_data": {
+            "answers": {
+                **{str(19056452 + q): f"Answer text for question {q} with some detail" for q in range(answers)},
+                "19056501_image": signature,
+                "19056501_typed_name": "John Doe",
+            },
+            "emergency_contact": {"name": "Jane Doe", "relationship": "Spouse", "phone": "(555) 987-6543"},
+            "medications": [
+                {"id": i, "drugName": "Ibuprofen", "dosage": "200 mg", "startDate": "2024-01-01",
+                 "directions": "Twice daily with food"}
+                for i in range(5)
+            ],
+            "primary_language": "English",
+            "height_feet": "5", "height_inches": "10", "weight": "180",
+        },
+    }
+
+
+def make_form(modules: int) -> CustomModuleForm:
+    return CustomModuleForm(
+        id="2215494",
+        name="Override App: Intake Form",
+        custom_modules=[
+            CustomModule(id=str(19056452 + i), label=f"Question {i}: please describe your symptoms",
+                         mod_type="text", required=i % 3 == 0, options=["Yes", "No"] if i % 5 == 0 else None)
+            for i in range(modules)
+        ],
+    )
+
+
+def default_dict(content: Any) -> bytes:
+    """What FastAPI does with a returned dict and no response_model"""
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def fast_dict(content: Any) -> bytes:
+    return ORJSONResponse(content).body
+
+
+def default_model(annotation: Any) -> Callable[[Any], bytes]:
+    """What FastAPI does with a returned model and a declared response_model"""
+    field = create_model_field(name="Response", type_=annotation, mode="serialization")
+    loop = asyncio.new_event_loop()
+
+    def encode(value: Any) -> bytes:
+        content = loop.run_until_complete(serialize_response(field=field, response_content=value))
+        return JSONResponse(content).body
+    return encode
+
+
+def measure(func: Callable[[Any], bytes], payload: Any, rounds: int) -> float:
+    """Best-of-5 mean microseconds per call"""
+    timer = timeit.Timer(lambda: func(payload))
+    return min(timer.repeat(repeat=5, number=rounds)) / rounds * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Response serialization micro-benchmark")
+    parser.add_argument("--rounds", type=int, default=500)
+    parser.add_argument("--answers", type=int, default=120, help="Answers per intake")
+    args = parser.parse_args()
+
+    intake = make_intake(0, args.answers, inline_signature=False)
+    intake_inline = make_intake(0, args.answers, inline_signature=True)
+    page = {"total_count": 5000, "returned_count": 50,
+            "intakes": [make_intake(i, args.answers, inline_signature=False) for i in range(50)]}
+    form = make_form(120)
+    patients: List[Patient] = [Patient(id=str(i), email=f"p{i}@example.com", first_name="John", last_name="Doe")
+                               for i in range(5)]
+
+    cases = [
+        ("intake (signature ref)", intake, default_dict, fast_dict),
+        ("intake (inline signature)", intake_inline, default_dict, fast_dict),
+        ("/api/intake/list, 50 rows", page, default_dict, fast_dict),
+        ("form structure, 120 modules", form, default_model(CustomModuleForm), model_json),
+        ("patient search, 5 results", patients, default_model(List[Patient]), model_json),
+    ]
+
+    print(f"{'payload':<30}{'bytes':>10}{'default us':>13}{'fast us':>10}{'speedup':>9}")
+    for name, payload, default, fast in cases:
+        default_size = len(default(payload))
+        size = len(fast(payload))
+        if default_size != size:
+            print(f"  note: {name} output differs in size ({default_size} vs {size} bytes)")
+        default_us = measure(default, payload, args.rounds)
+        fast_us = measure(fast, payload, args.rounds)
+        print(f"{name:<30}{size:>10}{default_us:>13.1f}{fast_us:>10.1f}{default_us / fast_us:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
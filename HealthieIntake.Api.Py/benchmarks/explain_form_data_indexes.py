@@ -0,0 +1,189 @@
+"""
+EXPLAIN check: form_data queries use their indexes at production scale
+
+Loads a disposable PostgreSQL (see local_postgres.py) with synthetic
+intakes, builds the form_data indexes (migrations/006) and EXPLAIN ANALYZEs
+the statements IntakeRepository sends:
+
+    expression   find_by_form_field on a FORM_DATA_INDEXED_PATHS path
+    containment  find_by_form_field on any other path, find_by_form_data
+    legacy       the old form_data[...].astext = value filter (for comparison)
+
+Exits non-zero if an indexed query does not use its expected index, so it
+can gate schema or query changes.
+
+Usage:
+    python -m benchmarks.explain_form_data_indexes                 # 1,000,000 rows
+    python -m benchmarks.explain_form_data_indexes --rows 100000
+    python -m benchmarks.explain_form_data_indexes --database-url postgresql+asyncpg://...
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from benchmarks.local_postgres import LocalPostgres
+from models.database import Base, IntakeRecord
+from repositories.form_data_query import expression_index_ddl, form_field_condition, indexed_paths
+
+# One INSERT ... SELECT per chunk keeps the load inside a few seconds per 100k rows
+LOAD_SQL = """
+INSERT INTO intakes (id, patient_healthie_id, first_name, last_name, email, date_of_birth, phone,
+                     schema_version, status, created_at, last_updated_at, submitted_at, form_data)
+SELECT gen_random_uuid(), 'p' || i, 'First' || i, 'Last' || i, 'patient' || i || '@example.com',
+       '1980-01-01', '555' || lpad((i % 10000000)::text, 7, '0'), '1.0-poc',
+       CASE WHEN i % 10 = 0 THEN 'draft' ELSE 'completed' END,
+       now() - (i || ' seconds')::interval, now(), now(),
+       jsonb_build_object(
+           'answers', jsonb_build_object(
+               '19056452', 'Answer ' || (i % 1000),
+               '19056453', to_char(date '1940-01-01' + (i % 20000), 'YYYY-MM-DD'),
+               '19056454', repeat('free text ', 20)
+           ),
+           'emergency_contact', jsonb_build_object(
+               'name', 'Contact ' || i,
+               'relationship', (ARRAY['Spouse', 'Parent', 'Sibling', 'Friend'])[1 + i % 4],
+               'phone', '555' || lpad(i::text, 7, '0')
+           ),
+           'hospitalized_recently', CASE WHEN i % 50 = 0 THEN 'Yes' ELSE 'No' END,
+           'primary_language', (ARRAY['English', 'Spanish', 'Other'])[1 + i % 3],
+           'height_feet', 5 + i % 2
+       )
+FROM generate_series(CAST(:start AS integer), CAST(:stop AS integer)) AS i
+"""
+
+
+def queries(rows: int) -> List[Dict[str, Any]]:
+    """Statements to explain, with the index each one must use (None: not asserted)"""
+    target = rows // 2
+    form_data = IntakeRecord.form_data
+
+    def statement(condition):
+        return select(IntakeRecord).where(condition).order_by(IntakeRecord.created_at.desc()).limit(100)
+
+    cases = [
+        {
+            "name": "find_by_form_field emergency_contact.name",
+            "statement": statement(form_field_condition(form_data, "emergency_contact.name", f"Contact {target}")),
+            "index": "ix_intakes_fd_emergency_contact_name",
+        },
+        {
+            "name": "find_by_form_field answers.19056453",
+            "statement": statement(form_field_condition(form_data, "answers.19056453", "1994-09-12")),
+            "index": "ix_intakes_form_data_path_ops",
+        },
+        {
+            "name": "find_by_form_data phone + hospitalized",
+            "statement": statement(form_data.contains({
+                "emergency_contact": {"phone": f"555{target:07d}"}, "hospitalized_recently": "Yes"
+            })),
+            "index": "ix_intakes_form_data_path_ops",
+        },
+        {
+            "name": "legacy astext filter",
+            "statement": statement(form_data["emergency_contact"]["name"].astext == f"Contact {target}"),
+            "index": None,
+        },
+    ]
+    if ("emergency_contact", "name") not in indexed_paths():
+        cases[0]["index"] = "ix_intakes_form_data_path_ops"
+    return cases
+
+
+def plan_nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) of a statement, sent with its bind parameters"""
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain)
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    return "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def explain(conn: AsyncConnection, statement) -> Dict[str, Any]:
+    """Root of the executed plan, with timing and buffers"""
+    raw = (await conn.execute(Explain(statement))).scalar_one()
+    return (json.loads(raw) if isinstance(raw, str) else raw)[0]
+
+
+async def load(conn: AsyncConnection, rows: int, chunk: int = 100_000) -> None:
+    await conn.run_sync(Base.metadata.create_all)
+    existing = (await conn.execute(text("SELECT count(*) FROM intakes"))).scalar_one()
+    if existing >= rows:
+        print(f"Using {existing:,} existing rows")
+        return
+
+    started = time.perf_counter()
+    for start in range(existing + 1, rows + 1, chunk):
+        await conn.execute(text(LOAD_SQL), {"start": start, "stop": min(start + chunk - 1, rows)})
+        await conn.commit()
+        print(f"  loaded {min(start + chunk - 1, rows):,} rows", end="\r", flush=True)
+    print(f"\rLoaded {rows - existing:,} rows in {time.perf_counter() - started:.1f}s")
+
+
+async def run(database_url: str, rows: int) -> bool:
+    engine = create_async_engine(database_url)
+    try:
+        async with engine.connect() as conn:
+            await load(conn, rows)
+            for tokens in sorted(indexed_paths()):
+                await conn.execute(text(expression_index_ddl(tokens, concurrently=False)))
+            await conn.execute(text("ANALYZE intakes"))
+            await conn.commit()
+
+            passed = True
+            print(f"\n{'query':<44}{'ms':>9}  {'buffers':>8}  plan")
+            for case in queries(rows):
+                explained = await explain(conn, case["statement"])
+                nodes = list(plan_nodes(explained["Plan"]))
+                used = sorted({node["Index Name"] for node in nodes if "Index Name" in node})
+                seq_scan = any(node["Node Type"] == "Seq Scan" for node in nodes)
+                buffers = explained["Plan"].get("Shared Hit Blocks", 0) + explained["Plan"].get("Shared Read Blocks", 0)
+                ok = case["index"] is None or (case["index"] in used and not seq_scan)
+                passed = passed and ok
+                plan = ", ".join(used) or ("Seq Scan" if seq_scan else nodes[-1]["Node Type"])
+                status = "" if case["index"] is None else ("ok" if ok else f"FAIL (expected {case['index']})")
+                print(f"{case['name']:<44}{explained['Execution Time']:>9.2f}  {buffers:>8}  {plan}  {status}")
+            return passed
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN form_data queries against a large intakes table")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--database-url", default=None, help="Existing database (default: disposable local PostgreSQL)")
+    parser.add_argument("--postgres-backend", choices=["docker", "pgserver"], default=None)
+    args = parser.parse_args()
+
+    postgres: Optional[LocalPostgres] = None
+    database_url = args.database_url
+    if database_url is None:
+        postgres = LocalPostgres(args.postgres_backend)
+        database_url = postgres.start()
+    try:
+        passed = asyncio.run(run(database_url, args.rows))
+    finally:
+        if postgres is not None:
+            postgres.stop()
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,472 @@
+"""
+Scripted load scenarios with per-route latency percentiles
+
+Scenarios:
+    autosave_storm  patients save a full draft, then stream merge-patch autosaves
+    search_burst    concurrent patient searches, patient lookups and form loads
+    submit_wave     patients save and submit at once; the outbox is then drained
+    admin_browsing  admins page the dashboard and open intakes (with ETag revalidation)
+
+By default the whole stack is started locally and torn down afterwards:
+a disposable PostgreSQL (see local_postgres.py), the Healthie stub and
+the API under uvicorn. Results are written as JSON keyed by git commit so
+two runs can be compared.
+
+Usage:
+    python -m benchmarks.scenarios --output bench-results/$(git rev-parse --short HEAD).json
+    python -m benchmarks.scenarios --scenarios search_burst --latency-ms 250 --scale 2
+    python -m benchmarks.scenarios --output new.json --compare bench-results/base.json
+    python -m benchmarks.scenarios --base-url http://127.0.0.1:5096   # existing API
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.local_postgres import LocalPostgres
+
+API_DIR = Path(__file__).resolve().parent.parent
+
+FIRST_NAMES = ["John", "Jane", "Corey", "Maria", "Wei", "Aisha", "Luis", "Emma", "Noah", "Olivia"]
+LAST_NAMES = ["Doe", "Crowley", "Garcia", "Chen", "Khan", "Smith"]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Recorder:
+    """Collects request latencies per route template"""
+
+    def __init__(self, client: httpx.AsyncClient, concurrency: int):
+        self.client = client
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self._slots = asyncio.Semaphore(concurrency)
+
+    async def call(self, route: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        """
+        Send one request and record its latency under route
+
+        Args:
+            route: Route template used as the report key, e.g. 'GET /api/intake/{intake_id}'
+            method: HTTP method
+            url: Concrete URL
+
+        Returns:
+            The response, or None on a transport error
+        """
+        async with self._slots:
+            start = time.perf_counter()
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except httpx.HTTPError:
+                response = None
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self.samples.setdefault(route, []).append(elapsed_ms)
+        # 404/409 are expected answers in these flows, not failures
+        if response is None or response.status_code >= 500 or response.status_code in (400, 422):
+            self.errors[route] = self.errors.get(route, 0) + 1
+        return response
+
+    def record(self, route: str, elapsed_ms: float, ok: bool = True) -> None:
+        """Record a timing measured outside call()"""
+        self.samples.setdefault(route, []).append(elapsed_ms)
+        if not ok:
+            self.errors[route] = self.errors.get(route, 0) + 1
+
+    def summary(self, duration_s: float) -> Dict[str, Dict[str, float]]:
+        return {
+            route: {
+                "n": len(samples),
+                "errors": self.errors.get(route, 0),
+                "throughput_rps": round(len(samples) / duration_s, 2) if duration_s else 0.0,
+                "p50_ms": round(percentile(samples, 50), 2),
+                "p95_ms": round(percentile(samples, 95), 2),
+                "p99_ms": round(percentile(samples, 99), 2),
+                "max_ms": round(max(samples), 2),
+                "mean_ms": round(statistics.mean(samples), 2),
+            }
+            for route, samples in sorted(self.samples.items())
+        }
+
+
+def _patient(index: int, prefix: str) -> Dict[str, Any]:
+    return {
+        "patient_healthie_id": f"{prefix}-{index}",
+        "first_name": FIRST_NAMES[index % len(FIRST_NAMES)],
+        "last_name": LAST_NAMES[index % len(LAST_NAMES)],
+        "date_of_birth": "1990-01-01",
+        "email": f"{prefix}-{index}@example.com",
+        "phone": "(555) 123-4567",
+        "current_step": "1",
+        "form_data": {
+            "gender": "Male",
+            "emergency_contact": {"name": "Jane Doe", "relationship": "Spouse", "phone": "(555) 987-6543"},
+            "answers": {str(19056452 + q): f"answer {q}" for q in range(20)},
+        },
+    }
+
+
+# ============================================================================
+# Scenarios
+# ============================================================================
+
+async def autosave_storm(rec: Recorder, scale: float, ctx: Dict[str, Any]) -> None:
+    """Every patient saves once, then autosaves small merge patches back to back"""
+    patients = max(1, int(100 * scale))
+    autosaves = 10
+
+    async def patient_session(index: int) -> None:
+        draft = _patient(index, "storm")
+        response = await rec.call("POST /api/intake/draft", "POST", "/api/intake/draft", json=draft)
+        version = response.json().get("last_updated_at") if response is not None and response.is_success else None
+
+        for step in range(autosaves):
+            patch = {"last_updated_at": version, "current_step": str(step % 6 + 1),
+                     "merge_patch": {"answers": {str(19056452 + step): f"edit {step}"}}}
+            healthie_id = draft["patient_healthie_id"]
+            response = await rec.call("PATCH /api/intake/draft/{healthie_id}", "PATCH",
+                                      f"/api/intake/draft/{healthie_id}", json=patch)
+            if response is not None and response.is_success:
+                version = response.json().get("last_updated_at")
+            else:
+                # Same fallback as the React client: full save
+                draft["form_data"]["answers"][str(19056452 + step)] = f"edit {step}"
+                response = await rec.call("POST /api/intake/draft", "POST", "/api/intake/draft", json=draft)
+                version = response.json().get("last_updated_at") if response is not None and response.is_success else None
+
+            if step % 5 == 4:
+                await rec.call("GET /api/intake/draft/{healthie_id}", "GET", f"/api/intake/draft/{healthie_id}")
+
+    await asyncio.gather(*(patient_session(i) for i in range(patients)))
+
+
+async def search_burst(rec: Recorder, scale: float, ctx: Dict[str, Any]) -> None:
+    """Front-desk style burst: searches, patient lookups and form loads at once"""
+    searches = max(1, int(200 * scale))
+    rng = random.Random(10)
+    tasks = []
+    for i in range(searches):
+        body = {"firstName": rng.choice(FIRST_NAMES), "lastName": rng.choice(LAST_NAMES), "dob": "1990-01-01"}
+        tasks.append(rec.call("POST /api/healthie/patients/search", "POST", "/api/healthie/patients/search", json=body))
+        if i % 2 == 0:
+            patient_id = str(3642270 + i % 5)
+            tasks.append(rec.call("GET /api/healthie/patients/{patient_id}", "GET", f"/api/healthie/patients/{patient_id}"))
+        if i % 4 == 0:
+            tasks.append(rec.call("GET /api/healthie/forms/{form_id}", "GET", f"/api/healthie/forms/{ctx['form_id']}"))
+    await asyncio.gather(*tasks)
+
+
+async def submit_wave(rec: Recorder, scale: float, ctx: Dict[str, Any]) -> None:
+    """Patients finish at the same time; then the Healthie sync worker drains the outbox"""
+    patients = max(1, int(150 * scale))
+
+    async def finish(index: int) -> None:
+        intake = _patient(index, "wave")
+        await rec.call("POST /api/intake/draft", "POST", "/api/intake/draft", json=intake)
+        intake["current_step"] = "6"
+        await rec.call("POST /api/intake/submit", "POST", "/api/intake/submit", json=intake)
+        healthie_id = intake["patient_healthie_id"]
+        await rec.call("GET /api/intake/completed/{healthie_id}", "GET", f"/api/intake/completed/{healthie_id}")
+
+    await asyncio.gather(*(finish(i) for i in range(patients)))
+
+    if ctx.get("env") is not None:
+        # Outbox drain time is part of the submit path's end-to-end cost
+        start = time.perf_counter()
+        worker = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "workers.healthie_sync", "--once",
+            cwd=API_DIR, env=ctx["env"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        returncode = await worker.wait()
+        rec.record("worker healthie_sync --once", (time.perf_counter() - start) * 1000, returncode == 0)
+
+
+async def admin_browsing(rec: Recorder, scale: float, ctx: Dict[str, Any]) -> None:
+    """Admins page the dashboard, open intakes and revalidate them with If-None-Match"""
+    viewers = max(1, int(10 * scale))
+    max_pages = 10
+
+    async def browse(viewer: int) -> None:
+        status = "completed" if viewer % 2 else None
+        cursor = None
+        for _ in range(max_pages):
+            params = {"limit": 50}
+            if status:
+                params["status"] = status
+            if cursor:
+                params["cursor"] = cursor
+            response = await rec.call("GET /api/admin/intakes", "GET", "/api/admin/intakes", params=params)
+            if response is None or not response.is_success:
+                return
+            page = response.json()
+
+            for intake in page["intakes"][:5]:
+                url = f"/api/intake/{intake['id']}"
+                opened = await rec.call("GET /api/intake/{intake_id}", "GET", url)
+                etag = opened.headers.get("etag") if opened is not None else None
+                if etag:
+                    await rec.call("GET /api/intake/{intake_id} (If-None-Match)", "GET", url,
+                                   headers={"If-None-Match": etag})
+
+            if page["intakes"]:
+                patient_id = page["intakes"][0]["patient_healthie_id"]
+                await rec.call("GET /api/healthie/patients/{patient_id}/forms", "GET",
+                               f"/api/healthie/patients/{patient_id}/forms")
+
+            cursor = page.get("next_cursor")
+            if not cursor:
+                break
+        await rec.call("GET /api/admin/outbox", "GET", "/api/admin/outbox")
+
+    await asyncio.gather(*(browse(i) for i in range(viewers)))
+
+
+SCENARIOS: Dict[str, Callable[[Recorder, float, Dict[str, Any]], Awaitable[None]]] = {
+    "autosave_storm": autosave_storm,
+    "search_burst": search_burst,
+    "submit_wave": submit_wave,
+    "admin_browsing": admin_browsing,
+}
+
+
+# ============================================================================
+# Local stack
+# ============================================================================
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=2).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+class LocalStack:
+    """Disposable PostgreSQL + Healthie stub + API under uvicorn"""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.postgres: Optional[LocalPostgres] = None
+        self.processes: List[subprocess.Popen] = []
+        self.base_url = ""
+        self.stub_url = ""
+        self.env: Dict[str, str] = {}
+
+    def __enter__(self) -> "LocalStack":
+        try:
+            self._start()
+        except BaseException:
+            self.__exit__()
+            raise
+        return self
+
+    def _start(self) -> None:
+        args = self.args
+        database_url = args.database_url
+        if not database_url:
+            self.postgres = LocalPostgres(args.postgres_backend)
+            database_url = self.postgres.start()
+
+        stub_port, api_port = _free_port(), _free_port()
+        self.stub_url = f"http://127.0.0.1:{stub_port}"
+        self.base_url = f"http://127.0.0.1:{api_port}"
+        self.env = {
+            **os.environ,
+            "DATABASE_URL": database_url,
+            "HEALTHIE_API_URL": f"{self.stub_url}/graphql",
+            "HEALTHIE_API_KEY": "bench",
+            "OUTBOX_POLL_INTERVAL_SECONDS": "0.2",
+        }
+        output = None if args.verbose else subprocess.DEVNULL
+
+        self.processes.append(subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.stub_healthie", "--port", str(stub_port),
+             "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+             "--error-rate", str(args.error_rate), "--seed", "1"],
+            cwd=API_DIR, stdout=output, stderr=output
+        ))
+        _wait_for(f"{self.stub_url}/stats")
+
+        # Once per run, as in a deploy; the API workers only check the version
+        subprocess.run([sys.executable, "-m", "migrate"], cwd=API_DIR, env=self.env, stdout=output, stderr=output,
+                       check=True)
+
+        self.processes.append(subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(api_port),
+             "--workers", str(args.api_workers), "--log-level", "warning", "--no-access-log"],
+            cwd=API_DIR, env=self.env, stdout=output, stderr=output
+        ))
+        _wait_for(f"{self.base_url}/health")
+
+    def __exit__(self, *exc) -> None:
+        for process in reversed(self.processes):
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self.processes.clear()
+        if self.postgres is not None:
+            self.postgres.stop()
+            self.postgres = None
+
+
+# ============================================================================
+# Reporting
+# ============================================================================
+
+def _git_revision() -> Dict[str, Any]:
+    def git(*cmd: str) -> str:
+        return subprocess.run(["git", *cmd], cwd=API_DIR, capture_output=True, text=True).stdout.strip()
+    return {"commit": git("rev-parse", "--short", "HEAD"), "dirty": bool(git("status", "--porcelain", "--", "."))}
+
+
+def print_report(results: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    """Print per-route tables; with a baseline, add p50/p95/p99 change in percent"""
+
+    def delta(new: float, old: Optional[float]) -> str:
+        if not old:
+            return ""
+        return f"{(new - old) / old * 100:+.0f}%"
+
+    for name, scenario in results["scenarios"].items():
+        base_routes = ((baseline or {}).get("scenarios", {}).get(name) or {}).get("routes", {})
+        print(f"\n== {name}: {scenario['requests']} requests in {scenario['duration_s']:.2f}s "
+              f"({scenario['throughput_rps']:.1f} req/s), upstream calls {scenario.get('upstream_calls', {})}")
+        header = f"{'route':<52}{'n':>6}{'err':>5}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        if baseline:
+            header += f"{'Δp50':>7}{'Δp95':>7}{'Δp99':>7}"
+        print(header)
+        for route, stats in scenario["routes"].items():
+            line = (f"{route:<52}{stats['n']:>6}{stats['errors']:>5}{stats['throughput_rps']:>8.1f}"
+                    f"{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}")
+            if baseline:
+                old = base_routes.get(route, {})
+                line += "".join(f"{delta(stats[key], old.get(key)):>7}" for key in ("p50_ms", "p95_ms", "p99_ms"))
+            print(line)
+
+
+async def run_scenarios(base_url: str, names: List[str], scale: float, concurrency: int,
+                        ctx: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run the named scenarios in order against base_url
+
+    Args:
+        base_url: API root, e.g. http://127.0.0.1:5096
+        names: Keys of SCENARIOS
+        scale: Multiplier for the number of simulated users
+        concurrency: Maximum requests in flight
+        ctx: form_id, optional stub_url and env (for the outbox worker)
+
+    Returns:
+        Results per scenario, including per-route percentiles
+    """
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    results: Dict[str, Any] = {}
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        for name in names:
+            if ctx.get("stub_url"):
+                await client.delete(f"{ctx['stub_url']}/stats")
+
+            rec = Recorder(client, concurrency)
+            start = time.perf_counter()
+            await SCENARIOS[name](rec, scale, ctx)
+            duration = time.perf_counter() - start
+
+            requests = sum(len(samples) for samples in rec.samples.values())
+            results[name] = {
+                "duration_s": round(duration, 3),
+                "requests": requests,
+                "throughput_rps": round(requests / duration, 2),
+                "routes": rec.summary(duration),
+            }
+            if ctx.get("stub_url"):
+                results[name]["upstream_calls"] = (await client.get(f"{ctx['stub_url']}/stats")).json()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scripted load scenarios with per-route percentiles")
+    parser.add_argument("--scenarios", default="all",
+                        help=f"Comma-separated list of: {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier for simulated users")
+    parser.add_argument("--concurrency", type=int, default=200, help="Maximum requests in flight")
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--compare", help="Baseline results JSON to diff against")
+    parser.add_argument("--base-url", help="Benchmark an already running API instead of starting one")
+    parser.add_argument("--form-id", default="2215494")
+    local = parser.add_argument_group("local stack (ignored with --base-url)")
+    local.add_argument("--database-url", help="Use this database instead of a disposable one")
+    local.add_argument("--postgres-backend", choices=["docker", "pgserver"], default=None)
+    local.add_argument("--latency-ms", type=float, default=150.0, help="Healthie stub latency")
+    local.add_argument("--jitter-ms", type=float, default=50.0, help="Healthie stub latency jitter")
+    local.add_argument("--error-rate", type=float, default=0.0, help="Healthie stub GraphQL error rate")
+    local.add_argument("--api-workers", type=int, default=1, help="uvicorn worker processes")
+    local.add_argument("--verbose", action="store_true", help="Show stub and API output")
+    args = parser.parse_args()
+
+    names = list(SCENARIOS) if args.scenarios == "all" else [n.strip() for n in args.scenarios.split(",")]
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unknown scenario(s): {', '.join(unknown)}")
+
+    ctx: Dict[str, Any] = {"form_id": args.form_id}
+    config = {key: value for key, value in vars(args).items()
+              if key not in ("output", "compare", "database_url", "verbose")}
+
+    if args.base_url:
+        scenarios = asyncio.run(run_scenarios(args.base_url, names, args.scale, args.concurrency, ctx))
+    else:
+        with LocalStack(args) as stack:
+            ctx.update(stub_url=stack.stub_url, env=stack.env)
+            scenarios = asyncio.run(run_scenarios(stack.base_url, names, args.scale, args.concurrency, ctx))
+
+    results = {
+        **_git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": config,
+        "scenarios": scenarios,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"Comparing {results['commit']} against {baseline.get('commit')}")
+    print_report(results, baseline)
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+Local stand-in for the Healthie GraphQL API
+
+Answers the queries HealthieApiClient sends with canned data after a
+configurable delay, so the API can be benchmarked without touching
+Healthie staging. Form answer groups created through the stub are kept
+in memory and returned by formAnswerGroups / formAnswerGroup. Documents
+may select several (aliased) root fields, e.g. batched formAnswerGroup
+lookups; each one is resolved.
+
+Failure injection:
+    --error-rate       fraction of calls answered with a GraphQL error (HTTP 200)
+    --http-error-rate  fraction of calls answered with HTTP 503
+    --jitter-ms        uniform random extra delay on top of --latency-ms
+
+Automatic persisted queries (hash-only requests) are accepted unless
+--no-persisted-queries is given.
+
+GET /stats returns HTTP request and per-root-field call counts and is reset by
+DELETE /stats.
+
+Usage:
+    python -m benchmarks.stub_healthie --port 8765 --latency-ms 250
+    python -m benchmarks.stub_healthie --latency-ms 150 --jitter-ms 100 --error-rate 0.02
+    HEALTHIE_API_URL=http://127.0.0.1:8765/graphql uvicorn main:app --port 5096
+"""
+import argparse
+import asyncio
+import hashlib
+import itertools
+import random
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiohttp import web
+from graphql import parse, value_from_ast_untyped, OperationDefinitionNode, FieldNode
+
+
+def _root_fields(query: str, variables: Dict[str, Any],
+                 operation_name: Optional[str] = None) -> List[Tuple[str, str, Dict[str, Any]]]:
+    """Return (response key, field name, arguments) for each root field of a GraphQL document"""
+    document = parse(query)
+    for definition in document.definitions:
+        if not isinstance(definition, OperationDefinitionNode):
+            continue
+        if operation_name and definition.name and definition.name.value != operation_name:
+            continue
+        fields = [
+            (
+                (selection.alias or selection.name).value,
+                selection.name.value,
+                {arg.name.value: value_from_ast_untyped(arg.value, variables) for arg in selection.arguments},
+            )
+            for selection in definition.selection_set.selections
+            if isinstance(selection, FieldNode)
+        ]
+        if fields:
+            return fields
+    raise ValueError("No root field in document")
+
+
+_form_answer_group_ids = itertools.count(1)
+
+FORM_NAME = "Override App: Intake Form"
+
+
+def _user(user_id: str) -> Dict[str, Any]:
+    return {
+        "id": user_id,
+        "email": f"patient{user_id}@example.com",
+        "first_name": "John",
+        "last_name": "Doe",
+        "dob": "1990-01-01",
+    }
+
+
+def _custom_module(module_id: str) -> Dict[str, Any]:
+    return {"id": module_id, "label": f"Question {module_id}", "mod_type": "text"}
+
+
+class HealthieStub:
+    """In-memory Healthie state and resolvers, keyed by root field"""
+
+    def __init__(self):
+        self.form_answer_groups: Dict[str, Dict[str, Any]] = {}
+        self.groups_by_user: Dict[str, List[str]] = {}
+        self.calls: Counter = Counter()
+
+    def resolve(self, field: str, args: Dict[str, Any]) -> Any:
+        """Canned result for one root field, given its arguments"""
+        if field == "user":
+            return _user(args.get("id", "1"))
+        if field == "users":
+            return [_user(str(3642270 + i)) for i in range(5)]
+        if field == "customModuleForm":
+            return {
+                "id": args.get("id", "2215494"),
+                "name": FORM_NAME,
+                "custom_modules": [
+                    {"id": str(19056452 + i), "label": f"Question {i}", "mod_type": "text",
+                     "required": False, "options": None}
+                    for i in range(40)
+                ],
+            }
+        if field == "createFormAnswerGroup":
+            return {
+                "form_answer_group": self._create_group(args.get("input") or {}),
+                "messages": [],
+            }
+        if field == "formAnswerGroups":
+            group_ids = self.groups_by_user.get(str(args.get("user_id")), [])
+            return [
+                {key: self.form_answer_groups[group_id][key] for key in ("id", "custom_module_form", "created_at")}
+                for group_id in group_ids
+            ]
+        if field == "formAnswerGroup":
+            return self.form_answer_groups.get(str(args.get("id")))
+        if field == "deleteFormAnswerGroup":
+            group = self.form_answer_groups.pop(str((args.get("input") or {}).get("id")), None)
+            if group is not None:
+                self.groups_by_user.get(group["user_id"], []).remove(group["id"])
+            return {"messages": []}
+        raise KeyError(field)
+
+    def _create_group(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        group_id = str(next(_form_answer_group_ids))
+        user_id = str(input_data.get("user_id", ""))
+        group = {
+            "id": group_id,
+            "user_id": user_id,
+            "finished": bool(input_data.get("finished", True)),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "custom_module_form": {"id": str(input_data.get("custom_module_form_id", "")), "name": FORM_NAME},
+            "form_answers": [
+                {
+                    "id": f"{group_id}-{index}",
+                    "answer": answer.get("answer"),
+                    "displayed_answer": answer.get("answer"),
+                    "custom_module": _custom_module(str(answer.get("custom_module_id"))),
+                }
+                for index, answer in enumerate(input_data.get("form_answers") or [])
+            ],
+        }
+        self.form_answer_groups[group_id] = group
+        self.groups_by_user.setdefault(user_id, []).append(group_id)
+        return {"id": group_id, "finished": group["finished"]}
+
+
+def create_app(latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+               http_error_rate: float = 0.0, seed: Optional[int] = None,
+               persisted_queries: bool = True) -> web.Application:
+    """Build the stub application"""
+    stub = HealthieStub()
+    rng = random.Random(seed)
+    persisted: Dict[str, str] = {}
+
+    def resolve_query(payload: Dict[str, Any]) -> Optional[str]:
+        """Query text of a request, registering or looking up persisted queries (None if unknown)"""
+        apq = (payload.get("extensions") or {}).get("persistedQuery")
+        if not apq:
+            return payload["query"]
+        if not persisted_queries:
+            raise LookupError("PersistedQueryNotSupported")
+        query = payload.get("query")
+        if query is None:
+            stub.calls["persisted_miss" if apq["sha256Hash"] not in persisted else "persisted_hit"] += 1
+            return persisted.get(apq["sha256Hash"])
+        if hashlib.sha256(query.encode("utf-8")).hexdigest() != apq["sha256Hash"]:
+            raise LookupError("provided sha does not match query")
+        persisted[apq["sha256Hash"]] = query
+        return query
+
+    async def graphql(request: web.Request) -> web.Response:
+        payload = await request.json()
+        delay_ms = latency_ms + (rng.uniform(0, jitter_ms) if jitter_ms else 0.0)
+        if delay_ms:
+            await asyncio.sleep(delay_ms / 1000)
+
+        variables = payload.get("variables") or {}
+        try:
+            query = resolve_query(payload)
+        except LookupError as e:
+            return web.json_response({"errors": [{"message": str(e)}]})
+        if query is None:
+            return web.json_response({"errors": [{"message": "PersistedQueryNotFound",
+                                                  "extensions": {"code": "PERSISTED_QUERY_NOT_FOUND"}}]})
+        try:
+            fields = _root_fields(query, variables, payload.get("operationName"))
+        except (KeyError, ValueError) as e:
+            return web.json_response({"errors": [{"message": f"Unsupported: {e}"}]})
+        stub.calls["requests"] += 1
+        for _, field, _ in fields:
+            stub.calls[field] += 1
+
+        roll = rng.random()
+        if roll < http_error_rate:
+            stub.calls["http_error"] += 1
+            return web.json_response({"message": "Service Unavailable"}, status=503)
+        if roll < http_error_rate + error_rate:
+            stub.calls["graphql_error"] += 1
+            return web.json_response({"data": None, "errors": [{"message": "Injected stub error",
+                                                                "path": [fields[0][0]]}]})
+
+        try:
+            data = {key: stub.resolve(field, args) for key, field, args in fields}
+        except KeyError as e:
+            return web.json_response({"errors": [{"message": f"Unsupported: {e}"}]})
+        return web.json_response({"data": data})
+
+    async def get_stats(request: web.Request) -> web.Response:
+        return web.json_response(dict(stub.calls))
+
+    async def reset_stats(request: web.Request) -> web.Response:
+        stub.calls.clear()
+        return web.json_response({})
+
+    app = web.Application()
+    app.router.add_post("/graphql", graphql)
+    app.router.add_get("/stats", get_stats)
+    app.router.add_delete("/stats", reset_stats)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Healthie GraphQL stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=250.0,
+                        help="Delay added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0,
+                        help="Uniform random extra delay, 0..jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of calls answered with a GraphQL error")
+    parser.add_argument("--http-error-rate", type=float, default=0.0,
+                        help="Fraction of calls answered with HTTP 503")
+    parser.add_argument("--seed", type=int, help="Random seed for jitter and errors")
+    parser.add_argument("--no-persisted-queries", action="store_true",
+                        help="Answer hash-only requests with PersistedQueryNotSupported")
+    args = parser.parse_args()
+
+    app = create_app(args.latency_ms, args.jitter_ms, args.error_rate, args.http_error_rate, args.seed,
+                     persisted_queries=not args.no_persisted_queries)
+    web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
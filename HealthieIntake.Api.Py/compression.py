@@ -0,0 +1,315 @@
+"""
+HTTP response compression (gzip, plus brotli and zstd when installed)
+
+Form schemas and full intakes are large, repetitive JSON and compress
+5-10x. CompressionMiddleware negotiates Accept-Encoding per request and
+compresses JSON/text bodies above a minimum size, streaming responses
+(exports) included. Responses that already carry a Content-Encoding are
+passed through, so routes can serve bytes compressed ahead of time (see
+precompress) without paying the CPU cost per request.
+
+brotli and zstandard are optional packages; encodings whose package is
+not installed are skipped.
+"""
+import gzip
+import logging
+import zlib
+from typing import Callable, Dict, Iterable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Already-compressed formats (images, xlsx, parquet, blobs) are not worth another pass
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+class StreamCompressor:
+    """Incremental compressor for one streamed response body"""
+
+    def __init__(self, compress: Callable[[bytes], bytes], finish: Callable[[], bytes]):
+        self.compress = compress
+        self.finish = finish
+
+
+class Codec:
+    """One content-coding at a fixed level"""
+    name = ""
+    max_level = 0
+
+    def __init__(self, level: int):
+        """
+        Args:
+            level: Compression level (quality for brotli)
+        """
+        self.level = level
+
+    def compress(self, data: bytes, level: Optional[int] = None) -> bytes:
+        """Compress a whole body, at the configured level unless one is given"""
+        raise NotImplementedError
+
+    def stream(self) -> StreamCompressor:
+        """Start compressing a streamed body"""
+        raise NotImplementedError
+
+
+class GzipCodec(Codec):
+    name = "gzip"
+    max_level = 9
+
+    def compress(self, data: bytes, level: Optional[int] = None) -> bytes:
+        # mtime=0 keeps the output deterministic for identical bodies
+        return gzip.compress(data, compresslevel=self.level if level is None else level, mtime=0)
+
+    def stream(self) -> StreamCompressor:
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return StreamCompressor(compressor.compress, compressor.flush)
+
+
+class BrotliCodec(Codec):
+    name = "br"
+    max_level = 11
+
+    def __init__(self, level: int):
+        import brotli
+        super().__init__(level)
+        self._brotli = brotli
+
+    def compress(self, data: bytes, level: Optional[int] = None) -> bytes:
+        return self._brotli.compress(data, quality=self.level if level is None else level)
+
+    def stream(self) -> StreamCompressor:
+        compressor = self._brotli.Compressor(quality=self.level)
+        return StreamCompressor(compressor.process, compressor.finish)
+
+
+class ZstdCodec(Codec):
+    name = "zstd"
+    max_level = 19
+
+    def __init__(self, level: int):
+        import zstandard
+        super().__init__(level)
+        self._zstd = zstandard
+
+    def compress(self, data: bytes, level: Optional[int] = None) -> bytes:
+        return self._zstd.ZstdCompressor(level=self.level if level is None else level).compress(data)
+
+    def stream(self) -> StreamCompressor:
+        compressor = self._zstd.ZstdCompressor(level=self.level).compressobj()
+        return StreamCompressor(compressor.compress, compressor.flush)
+
+
+def create_codecs(settings) -> Dict[str, Codec]:
+    """
+    Create the configured codecs, in preference order
+
+    Encodings whose optional package is not installed are left out.
+
+    Args:
+        settings: config.Settings instance
+
+    Returns:
+        Codecs keyed by content-coding name; empty when compression is disabled
+    """
+    if not settings.compression_enabled:
+        return {}
+
+    factories = {
+        "br": lambda: BrotliCodec(settings.compression_brotli_quality),
+        "zstd": lambda: ZstdCodec(settings.compression_zstd_level),
+        "gzip": lambda: GzipCodec(settings.compression_gzip_level),
+    }
+    codecs: Dict[str, Codec] = {}
+    for name in (n.strip().lower() for n in settings.compression_encodings.split(",")):
+        if not name:
+            continue
+        if name not in factories:
+            raise ValueError(f"Unknown COMPRESSION_ENCODINGS entry: {name}")
+        try:
+            codecs[name] = factories[name]()
+        except ImportError:
+            logger.info(f"Compression encoding '{name}' is not installed; skipping")
+    return codecs
+
+
+def negotiate(accept_encoding: str, available: Iterable[str]) -> Optional[str]:
+    """
+    Pick a content-coding from an Accept-Encoding header
+
+    The client's highest q-value wins; ties go to the server's order.
+
+    Args:
+        accept_encoding: Request header value, e.g. "gzip, deflate, br;q=0.9"
+        available: Encodings the server can produce, most preferred first
+
+    Returns:
+        Encoding name, or None to send the body uncompressed
+    """
+    if not accept_encoding:
+        return None
+
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name:
+            weights[name] = q
+
+    best, best_q = None, 0.0
+    for name in available:
+        q = weights.get(name, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def precompress(data: bytes, codecs: Dict[str, Codec], min_size: int = 0) -> Dict[str, bytes]:
+    """
+    Compress a cached body once with every codec, at each codec's maximum level
+
+    Args:
+        data: Serialized body
+        codecs: Codecs from create_codecs
+        min_size: Return nothing for smaller bodies
+
+    Returns:
+        Compressed bodies keyed by encoding, in the codecs' preference order
+    """
+    if len(data) < min_size:
+        return {}
+    return {name: codec.compress(data, codec.max_level) for name, codec in codecs.items()}
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    """True for text, JSON and other formats that are not compressed already"""
+    if not content_type:
+        return False
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type.startswith("text/") or media_type.endswith("+json") or media_type in COMPRESSIBLE_TYPES
+
+
+def weak_etag(etag: str) -> str:
+    """Weak form of an ETag: the encoded bytes differ, the content does not"""
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+
+class CompressionMiddleware:
+    """
+    Compress response bodies with the client's preferred encoding
+
+    Skipped for bodies under min_size, non-compressible content types and
+    responses that already set Content-Encoding. Compressed responses get
+    Vary: Accept-Encoding and a weak ETag.
+    """
+
+    def __init__(self, app: ASGIApp, codecs: Dict[str, Codec], min_size: int = 1024):
+        """
+        Args:
+            app: Wrapped ASGI app
+            codecs: Codecs from create_codecs, most preferred first
+            min_size: Smallest body worth compressing, in bytes
+        """
+        self.app = app
+        self.codecs = codecs
+        self.min_size = min_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.codecs:
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.codecs)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, _CompressingSender(send, self.codecs[encoding], self.min_size))
+
+
+class _CompressingSender:
+    """ASGI send wrapper that holds back the response start until the first body chunk"""
+
+    def __init__(self, send: Send, codec: Codec, min_size: int):
+        self.send = send
+        self.codec = codec
+        self.min_size = min_size
+        self.start: Optional[Message] = None
+        self.stream: Optional[StreamCompressor] = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self._flush_start()
+            await self.send(message)
+            return
+
+        if self.passthrough:
+            await self.send(message)
+            return
+        if self.stream is not None:
+            await self._send_chunk(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        headers = MutableHeaders(raw=self.start["headers"])
+
+        if ("content-encoding" in headers
+                or self.start["status"] in (204, 206, 304)
+                or not is_compressible(headers.get("content-type"))
+                or (not more_body and len(body) < self.min_size)):
+            self.passthrough = True
+            await self._flush_start()
+            await self.send(message)
+            return
+
+        headers["Content-Encoding"] = self.codec.name
+        headers.add_vary_header("Accept-Encoding")
+        if "etag" in headers:
+            headers["ETag"] = weak_etag(headers["etag"])
+
+        if not more_body:
+            compressed = self.codec.compress(body)
+            headers["Content-Length"] = str(len(compressed))
+            await self._flush_start()
+            await self.send({"type": "http.response.body", "body": compressed})
+            return
+
+        # Streamed body: length is unknown until the end
+        del headers["Content-Length"]
+        self.stream = self.codec.stream()
+        await self._flush_start()
+        await self._send_chunk(message)
+
+    async def _send_chunk(self, message: Message) -> None:
+        more_body = message.get("more_body", False)
+        data = self.stream.compress(message.get("body", b""))
+        if not more_body:
+            data += self.stream.finish()
+        if data or not more_body:
+            await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    async def _flush_start(self) -> None:
+        if self.start is not None:
+            await self.send(self.start)
+            self.start = None
@@ -11,6 +11,106 @@ class Settings(BaseSettings):
     # Healthie API Configuration
     healthie_api_url: str = "https://staging-api.gethealthie.com/graphql"
     healthie_api_key: str = ""
+    healthie_intake_form_id: str = "2215494"  # Used when an intake has no form_id
+
+    # Healthie HTTP transport (one pooled async client per process)
+    healthie_timeout_seconds: float = 10.0  # Default per-call timeout
+    healthie_connect_timeout_seconds: float = 5.0
+    healthie_max_connections: int = 20
+    healthie_max_keepalive_connections: int = 10
+    healthie_keepalive_expiry_seconds: float = 30.0
+    healthie_connect_retries: int = 3  # Retries on connection failures only
+    healthie_http2: bool = False  # Requires the optional `h2` package
+    healthie_persisted_queries: bool = False  # Hash-only APQ requests; falls back if unsupported upstream
+
+    # Patient form history: groups fetched in aliased batches, a few batches at a time
+    healthie_history_max_groups: int = 200
+    healthie_history_batch_size: int = 25
+    healthie_history_max_concurrency: int = 4
+
+    # Healthie failure isolation (see services/resilience.py)
+    healthie_max_concurrent_calls: int = 10  # Bulkhead: in-flight Healthie calls across all requests
+    healthie_bulkhead_wait_seconds: float = 1.0  # Max queueing for a bulkhead slot before failing fast
+    healthie_breaker_failure_threshold: int = 5  # Consecutive failures that open an operation's breaker
+    healthie_breaker_recovery_seconds: float = 30.0  # Open time before a probe call is let through
+    request_deadline_seconds: float = 30.0  # Time budget per API request (0 disables); X-Request-Timeout can lower it
+
+    # Form structure cache (post-processed CustomModuleForm per form ID)
+    form_cache_ttl_seconds: float = 300.0
+    form_cache_stale_seconds: float = 3600.0  # Serve stale while refreshing in background
+
+    # Patient search results, keyed by normalized (first, last, dob); holds PHI, so keep TTLs short
+    patient_search_cache_ttl_seconds: float = 60.0
+    patient_search_negative_ttl_seconds: float = 10.0  # No-match results, so new patients appear quickly
+    patient_search_cache_max_entries: int = 1024
+
+    # form_data paths with an expression index (python -m services.form_data_indexes creates them)
+    form_data_indexed_paths: str = "emergency_contact.name,emergency_contact.phone"
+
+    # Admin intake listing: totals are cached per filter instead of count(*) per page
+    intake_count_cache_seconds: float = 30.0
+
+    # Admin patient search (pg_trgm, migrations/007)
+    admin_search_min_length: int = 2
+    admin_search_min_similarity: float = 0.3  # Word similarity (0-1); lower finds more typos, and more noise
+
+    # Draft autosave write-behind buffer (services/draft_buffer.py); per process, so keep a
+    # patient's requests on one worker (sticky sessions) when enabling it with several workers
+    draft_buffer_enabled: bool = False
+    draft_buffer_flush_interval_seconds: float = 2.0
+    draft_buffer_max_dirty: int = 2000  # Flush at once when this many drafts are waiting
+    draft_buffer_idle_seconds: float = 300.0  # Forget written drafts untouched for this long
+
+    # Multi-device draft sync: WebSocket push fanned out with LISTEN/NOTIFY (services/draft_sync.py)
+    draft_sync_enabled: bool = False
+    draft_sync_database_url: str = ""  # Direct PostgreSQL URL for LISTEN if DATABASE_URL goes through PgBouncer
+
+    # Healthie sync outbox (drained by `python -m workers.healthie_sync`)
+    outbox_enabled: bool = True  # Queue completed intakes for Healthie sync
+    outbox_batch_size: int = 20
+    outbox_concurrency: int = 4  # Max in-flight Healthie calls per worker
+    outbox_max_attempts: int = 8  # Dead-letter after this many failures
+    outbox_backoff_base_seconds: float = 5.0
+    outbox_backoff_max_seconds: float = 900.0
+    outbox_poll_interval_seconds: float = 2.0
+    outbox_lease_seconds: float = 300.0  # Reclaim 'processing' rows after this long
+
+    # Medication autocomplete: openFDA NDC export or compact index (see services/medication_index.py)
+    medication_index_path: str = ""
+    medication_search_min_length: int = 2  # Shorter queries match too much of the index to be useful
+    medication_search_max_results: int = 25
+    medication_openfda_fallback: bool = True  # Query the openFDA API (server-side) when no index is loaded
+    openfda_api_key: str = ""  # Optional; raises openFDA's daily rate limit
+    medication_openfda_cache_seconds: int = 3600
+
+    # Blob store for signatures and other large form values (form_data keeps "blob:sha256:<hex>" refs)
+    blob_store_backend: str = "local"  # "local" or "s3"
+    blob_store_path: str = "blob_store"
+    blob_s3_bucket: str = ""
+    blob_s3_prefix: str = "blobs/"
+    blob_s3_endpoint_url: str = ""  # For S3-compatible services (MinIO, R2, ...)
+    blob_s3_region: str = ""
+    blob_max_bytes: int = 5_000_000
+    blob_offload_min_bytes: int = 1024  # Smaller data URLs stay inline in form_data
+
+    # Response compression (brotli and zstd need the optional brotli / zstandard packages)
+    compression_enabled: bool = True
+    compression_encodings: str = "br,zstd,gzip"  # Preference order; uninstalled encodings are skipped
+    compression_min_bytes: int = 1024  # Smaller bodies are sent as-is
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    compression_zstd_level: int = 3
+
+    # Request timing: Server-Timing header, and cProfile captures of sampled slow requests
+    server_timing_enabled: bool = True
+    profile_slow_requests: bool = False
+    profile_sample_rate: float = 0.05  # Fraction of requests run under cProfile
+    profile_slow_threshold_ms: float = 1000.0  # Keep profiles of requests at least this slow
+    profile_output_dir: str = "profiles"
+
+    # HTTP caching (ETag revalidation); intakes hold PHI so never allow shared caches
+    form_cache_control: str = "public, max-age=60"
+    intake_cache_control: str = "private, no-cache"
 
     # Server Configuration
     host: str = "0.0.0.0"
@@ -19,6 +119,17 @@ class Settings(BaseSettings):
     # PostgreSQL Configuration
     database_url: str = "postgresql+asyncpg://corey@localhost:5432/override-intake"
 
+    # Connection pooling ("null" opens a connection per session, "queue" pools them)
+    database_pool_mode: str = "null"
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+    database_pool_timeout_seconds: float = 30.0  # Max wait for a pooled connection
+    database_pool_pre_ping: bool = True
+    database_pool_recycle_seconds: int = 1800  # -1 disables recycling
+    database_statement_cache_size: int = 100  # asyncpg prepared statement cache
+    database_pgbouncer_mode: bool = False  # Disable prepared statement caching for PgBouncer (transaction pooling)
+    database_migrate_on_startup: bool = False  # Apply migrations in each worker; otherwise run `python -m migrate` per deploy
+
     # CORS Configuration
     cors_origins: list = [
         "http://localhost:5000",
@@ -4,20 +4,103 @@ PostgreSQL database connection and session management
 Uses SQLAlchemy 2.0 async engine for FastAPI compatibility
 """
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.pool import NullPool
-from models.database import Base
-import os
+from sqlalchemy.pool import NullPool, AsyncAdaptedQueuePool
+from sqlalchemy import exc
+from typing import Any, Dict
+from uuid import uuid4
+import time
 from config import settings
+from migrate import SchemaOutdatedError, check_schema, migrate
+from observability import span
 
 # Database URL from environment
 DATABASE_URL = settings.database_url
 
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Connection pool that records checkout counts and wait times
+
+    The checkout time covers waiting for a free connection, opening a new
+    one (overflow) and the optional pre-ping.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.checkout_wait_total_ms = 0.0
+        self.checkout_wait_max_ms = 0.0
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            with span("db_connect", "checkout"):
+                return super().connect()
+        except exc.TimeoutError:
+            self.checkout_timeouts += 1
+            raise
+        finally:
+            waited_ms = (time.perf_counter() - start) * 1000
+            self.checkouts += 1
+            self.checkout_wait_total_ms += waited_ms
+            self.checkout_wait_max_ms = max(self.checkout_wait_max_ms, waited_ms)
+
+    def recreate(self):
+        # Keep counters when SQLAlchemy recreates the pool (e.g. on dispose)
+        pool = super().recreate()
+        pool.checkouts = self.checkouts
+        pool.checkout_timeouts = self.checkout_timeouts
+        pool.checkout_wait_total_ms = self.checkout_wait_total_ms
+        pool.checkout_wait_max_ms = self.checkout_wait_max_ms
+        return pool
+
+
+class TimedNullPool(NullPool):
+    """NullPool that reports the time to open each connection as a db_connect span"""
+
+    def connect(self):
+        with span("db_connect", "open"):
+            return super().connect()
+
+
+def _engine_options() -> Dict[str, Any]:
+    """Build create_async_engine() keyword arguments from settings"""
+    connect_args: Dict[str, Any] = {
+        "statement_cache_size": settings.database_statement_cache_size,
+    }
+    if settings.database_pgbouncer_mode:
+        # PgBouncer in transaction mode cannot keep prepared statements
+        # across transactions, so disable both caches and use unique names
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+
+    if settings.database_pool_mode == "null":
+        return {"poolclass": TimedNullPool, "connect_args": connect_args}
+
+    if settings.database_pool_mode != "queue":
+        raise ValueError(f"Unknown DATABASE_POOL_MODE: {settings.database_pool_mode}")
+
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.database_pool_size,
+        "max_overflow": settings.database_max_overflow,
+        "pool_timeout": settings.database_pool_timeout_seconds,
+        "pool_pre_ping": settings.database_pool_pre_ping,
+        "pool_recycle": settings.database_pool_recycle_seconds,
+        "connect_args": connect_args,
+    }
+
+
 # Create async engine
 engine = create_async_engine(
     DATABASE_URL,
     echo=False,  # Set to True to log SQL queries (useful for debugging)
     future=True,
-    poolclass=NullPool  # Disable connection pooling for development
+    **_engine_options()
 )
 
 # Async session factory
@@ -28,14 +111,59 @@ async_session_maker = async_sessionmaker(
 )
 
 
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Connection pool metrics for sizing the pool
+
+    Returns:
+        Dictionary with pool occupancy and checkout wait statistics
+    """
+    pool = engine.pool
+    if not isinstance(pool, InstrumentedQueuePool):
+        return {"mode": settings.database_pool_mode}
+
+    return {
+        "mode": settings.database_pool_mode,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": settings.database_max_overflow,
+        "checkouts": pool.checkouts,
+        "checkout_timeouts": pool.checkout_timeouts,
+        "checkout_wait_avg_ms": round(pool.checkout_wait_total_ms / pool.checkouts, 3) if pool.checkouts else 0.0,
+        "checkout_wait_max_ms": round(pool.checkout_wait_max_ms, 3),
+    }
+
+
 async def init_db():
     """
-    Create all database tables
+    Check that the schema is current (one query; migrations run separately)
+
+    Called on application startup. With DATABASE_MIGRATE_ON_STARTUP the
+    pending migrations are applied instead, under the migration lock.
+
+    Raises:
+        SchemaOutdatedError: The database is behind migrations/ (run `python -m migrate`)
+    """
+    if settings.database_migrate_on_startup:
+        await migrate(engine)
+        return
+
+    version, latest = await check_schema(engine)
+    if version < latest:
+        raise SchemaOutdatedError(
+            f"Database schema is at version {version}, code expects {latest}; run `python -m migrate`"
+        )
+
+
+async def close_db():
+    """
+    Close all pooled connections
 
-    Called on application startup
+    Called on application shutdown
     """
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
 
 
 async def get_session() -> AsyncSession:
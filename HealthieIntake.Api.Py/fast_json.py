@@ -0,0 +1,53 @@
+"""
+Fast JSON response helpers
+
+FastAPI runs returned dicts through jsonable_encoder, and re-validates
+returned Pydantic models against response_model before serializing them.
+For large form_data payloads that is most of the request's CPU time.
+
+Routes that return an ORJSONResponse or a model_response() directly skip
+both steps; response_model is still declared for the OpenAPI docs.
+"""
+from typing import Any, Dict, Optional, Sequence, Union
+
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+__all__ = ["ORJSONResponse", "JSONBytesResponse", "json_response", "model_json", "model_response"]
+
+
+class JSONBytesResponse(Response):
+    """Response for a body that is already encoded JSON"""
+    media_type = "application/json"
+
+
+def json_response(content: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> ORJSONResponse:
+    """
+    Serialize plain data (dicts, lists, datetimes, UUIDs) with orjson, skipping jsonable_encoder
+
+    Args:
+        content: JSON-compatible data; datetimes and UUIDs are encoded natively
+        status_code: HTTP status
+        headers: Extra response headers
+    """
+    return ORJSONResponse(content, status_code=status_code, headers=headers)
+
+
+def model_json(value: Union[BaseModel, Sequence[BaseModel]]) -> bytes:
+    """
+    Encode a model, or a list of models, by alias with pydantic-core
+
+    Same output as declaring the model as response_model, without FastAPI
+    validating the already-validated instance a second time.
+    """
+    if isinstance(value, BaseModel):
+        return value.__pydantic_serializer__.to_json(value, by_alias=True)
+    return b"[" + b",".join(item.__pydantic_serializer__.to_json(item, by_alias=True) for item in value) + b"]"
+
+
+def model_response(value: Union[BaseModel, Sequence[BaseModel]], status_code: int = 200,
+                   headers: Optional[Dict[str, str]] = None) -> JSONBytesResponse:
+    """Response for a model or list of models (see model_json)"""
+    return JSONBytesResponse(model_json(value), status_code=status_code, headers=headers)
+
@@ -0,0 +1,58 @@
+"""
+HTTP conditional request helpers (ETag / If-None-Match)
+
+Strong ETags let browsers and CDNs revalidate with a 304 instead of
+re-downloading unchanged form schemas and intake records.
+"""
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts: object) -> str:
+    """
+    Build a strong ETag from the given parts
+
+    Args:
+        parts: Values that together identify one version of a resource
+
+    Returns:
+        Quoted ETag string, e.g. '"3f2a..."'
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def form_etag(form_json: str) -> str:
+    """ETag for a form schema, from its serialized post-processed JSON"""
+    return make_etag("form", form_json)
+
+
+def intake_etag(intake_id: str, last_updated_at: Optional[str], variant: str = "") -> str:
+    """ETag for an intake record, from its ID, ISO last modification time and representation variant"""
+    return make_etag("intake", intake_id, last_updated_at or "", variant)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Check the request's If-None-Match header against an ETag
+
+    Uses weak comparison as required for If-None-Match (RFC 9110 13.1.2).
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+
+    candidates = [tag.strip() for tag in header.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    """Empty 304 response carrying the validator headers"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
@@ -2,18 +2,39 @@
 Healthie Intake API - Python FastAPI version
 Exact port of HealthieIntake.Api (.NET) to Python
 """
-from fastapi import FastAPI, HTTPException, status, Depends
+from fastapi import FastAPI, HTTPException, Depends, Header, Request, Response, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, NamedTuple
+from datetime import datetime
+import asyncio
+import hashlib
 import logging
+import math
+
+import httpx
+import orjson
 
 from config import settings
-from models import Patient, PatientSearchRequest, CustomModuleForm, FormAnswerGroupInput, IntakeSubmission
-from services import HealthieApiClient
-from repositories import IntakeRepository
-from database import get_session, init_db
+from models import (
+    Patient, PatientSearchRequest, CustomModuleForm, FormAnswerGroupInput, IntakeSubmission, DraftPatch,
+    PatientFormHistory
+)
+from services import HealthieApiClient, AsyncTTLCache, MedicationIndex, OpenFdaMedicationSearch
+from services.blob_store import (
+    ALLOWED_CONTENT_TYPES, create_blob_store, is_valid_sha256, offload_data_urls, hydrate_blob_refs
+)
+from repositories import IntakeRepository, OutboxRepository
+from database import get_session, init_db, close_db, get_pool_stats, async_session_maker
+from http_cache import form_etag, intake_etag, etag_matches, not_modified
+from fast_json import ORJSONResponse, JSONBytesResponse, json_response, model_json, model_response
+from compression import CompressionMiddleware, create_codecs, negotiate, precompress, weak_etag
+from observability import TimingMiddleware, SlowRequestProfiler, generate_latest, CONTENT_TYPE_LATEST
+from services.resilience import DeadlineMiddleware, UpstreamUnavailableError
+from services.draft_buffer import DraftWriteBuffer
+from services.draft_sync import DraftSyncHub, draft_event, listen_dsn, version_key
 
 # Configure logging
 logging.basicConfig(
@@ -26,7 +47,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Healthie Intake API (Python)",
     description="Python FastAPI port of HealthieIntake.Api (.NET)",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS (matching .NET API configuration)
@@ -38,19 +60,107 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request time budget; Healthie call timeouts are clamped to what is left of it
+app.add_middleware(DeadlineMiddleware, default_seconds=settings.request_deadline_seconds)
+
+# gzip (plus brotli/zstd when installed) for JSON bodies; cached forms are compressed ahead of time
+compression_codecs = create_codecs(settings)
+app.add_middleware(CompressionMiddleware, codecs=compression_codecs, min_size=settings.compression_min_bytes)
+
+# Outermost: request/span timing for /metrics and the Server-Timing header
+app.add_middleware(
+    TimingMiddleware,
+    server_timing=settings.server_timing_enabled,
+    profiler=SlowRequestProfiler(
+        sample_rate=settings.profile_sample_rate,
+        threshold_ms=settings.profile_slow_threshold_ms,
+        output_dir=settings.profile_output_dir
+    ) if settings.profile_slow_requests else None
+)
+
 # Initialize Healthie API client
-healthie_client = HealthieApiClient(
-    api_url=settings.healthie_api_url,
-    api_key=settings.healthie_api_key
+healthie_client = HealthieApiClient.from_settings(settings)
+
+# Content-addressed storage for signature images referenced from form_data
+blob_store = create_blob_store(settings)
+
+# Post-processed form structures, keyed by form ID
+form_cache = AsyncTTLCache(
+    ttl=settings.form_cache_ttl_seconds,
+    stale_ttl=settings.form_cache_stale_seconds
+)
+
+# Patient search results, keyed by patient_search_key()
+patient_search_cache = AsyncTTLCache(
+    ttl=settings.patient_search_cache_ttl_seconds,
+    negative_ttl=settings.patient_search_negative_ttl_seconds,
+    max_entries=settings.patient_search_cache_max_entries
+)
+
+# Intake totals for the admin listing, keyed by filter
+intake_count_cache = AsyncTTLCache(
+    ttl=settings.intake_count_cache_seconds,
+    max_entries=256
 )
 
+# Latest draft per patient, written to PostgreSQL in batches (DRAFT_BUFFER_ENABLED)
+draft_buffer: Optional[DraftWriteBuffer] = DraftWriteBuffer(
+    async_session_maker,
+    flush_interval=settings.draft_buffer_flush_interval_seconds,
+    max_dirty=settings.draft_buffer_max_dirty,
+    idle_seconds=settings.draft_buffer_idle_seconds
+) if settings.draft_buffer_enabled else None
+
+# Pushes draft changes to the patient's other devices (DRAFT_SYNC_ENABLED)
+draft_sync: Optional[DraftSyncHub] = DraftSyncHub(
+    listen_dsn(settings.draft_sync_database_url or settings.database_url)
+) if settings.draft_sync_enabled else None
+
+# Medication name index, loaded at startup when MEDICATION_INDEX_PATH is set
+medication_index: Optional[MedicationIndex] = None
+
+# Server-side openFDA search, used while no index is loaded
+medication_fallback: Optional[OpenFdaMedicationSearch] = OpenFdaMedicationSearch(
+    api_key=settings.openfda_api_key,
+    cache_seconds=settings.medication_openfda_cache_seconds
+) if settings.medication_openfda_fallback else None
+
 
-# Startup event to initialize database tables
+# Startup event to check the database schema
 @app.on_event("startup")
 async def startup():
-    """Initialize PostgreSQL database tables on startup"""
+    """Check the PostgreSQL schema version on startup"""
     await init_db()
-    logger.info("PostgreSQL database initialized")
+    logger.info("PostgreSQL schema is current")
+    await healthie_client.connect()
+    logger.info("Healthie API client connected")
+    await load_medication_index()
+    if draft_buffer is not None:
+        draft_buffer.start()
+        logger.info(f"Draft write-behind buffer enabled ({settings.draft_buffer_flush_interval_seconds}s flush interval)")
+    if draft_sync is not None:
+        await draft_sync.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Drain buffered drafts, then release draft sync and the shared Healthie and PostgreSQL connections"""
+    if draft_buffer is not None:
+        await draft_buffer.close()
+    if draft_sync is not None:
+        await draft_sync.close()
+    if medication_fallback is not None:
+        await medication_fallback.close()
+    await healthie_client.close()
+    await close_db()
+
+
+@app.exception_handler(UpstreamUnavailableError)
+async def upstream_unavailable_handler(request: Request, exc: UpstreamUnavailableError):
+    """Healthie breaker open, bulkhead full or deadline exceeded: 503 so clients back off"""
+    logger.warning(f"Healthie unavailable for {request.method} {request.url.path}: {exc}")
+    headers = {"Retry-After": str(math.ceil(exc.retry_after))} if exc.retry_after else None
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers=headers)
 
 
 @app.get("/")
@@ -74,57 +184,119 @@ async def get_patient(patient_id: str):
         patient = await healthie_client.get_patient_async(patient_id)
         if not patient:
             raise HTTPException(status_code=404, detail="Patient not found")
-        return patient
+        return model_response(patient)
+    except UpstreamUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error fetching patient {patient_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def patient_search_key(first_name: str, last_name: str, dob: str) -> tuple:
+    """Cache key for a patient search: case- and whitespace-insensitive names plus DOB"""
+    return (
+        " ".join(first_name.split()).casefold(),
+        " ".join(last_name.split()).casefold(),
+        dob.strip()
+    )
+
+
 @app.post("/api/healthie/patients/search", response_model=List[Patient])
 async def search_patients(request: PatientSearchRequest):
     """
     Search for patients by name and date of birth
 
-    Returns list of matching patients from Healthie.
+    Returns list of matching patients from Healthie. Results are cached
+    briefly per (first, last, dob), no-match results for a shorter time,
+    and identical concurrent searches share one Healthie call.
     """
     try:
-        patients = await healthie_client.search_patients_async(
-            first_name=request.first_name,
-            last_name=request.last_name,
-            dob=request.dob
-        )
-        return patients
+        async def search():
+            return await healthie_client.search_patients_async(
+                first_name=request.first_name.strip(),
+                last_name=request.last_name.strip(),
+                dob=request.dob.strip()
+            )
+
+        key = patient_search_key(request.first_name, request.last_name, request.dob)
+        return model_response(await patient_search_cache.get_or_load(key, search))
+    except UpstreamUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error searching patients: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+class CachedForm(NamedTuple):
+    """Post-processed form, its serialized JSON body, ETag and compressed bodies, as stored in form_cache"""
+    form: CustomModuleForm
+    body: bytes
+    etag: str
+    encoded: Dict[str, bytes]
+
+
+async def load_form(form_id: str) -> Optional[CachedForm]:
+    """
+    Fetch a form from Healthie and apply UI post-processing
+
+    Result is cached in form_cache, so this runs once per TTL per form.
+    """
+    form = await healthie_client.get_custom_form_async(form_id)
+    if not form:
+        return None
+
+    # Post-process: Convert specific questions from 10-point scale to Yes/No
+    # (Matching .NET logic in HealthieController.cs lines 42-56)
+    if form.custom_modules:
+        for module in form.custom_modules:
+            if module.label and (
+                "Do you have any surgery upcoming" in module.label or
+                "Are you currently taking an opioid medication" in module.label or
+                "Are you currently seeing a therapist or counselor" in module.label or
+                "unhealthy relationship with alcohol, drugs, or prescription medications" in module.label
+            ):
+                # Change from 10-point scale to Yes/No
+                module.options = ["Yes", "No"]
+
+    body = model_json(form)
+    return CachedForm(
+        form=form,
+        body=body,
+        etag=form_etag(body.decode("utf-8")),
+        encoded=precompress(body, compression_codecs, settings.compression_min_bytes)
+    )
+
+
 @app.get("/api/healthie/forms/{form_id}", response_model=CustomModuleForm)
-async def get_form(form_id: str):
+async def get_form(form_id: str, request: Request):
     """
     Get form structure by ID
 
     Port of: [HttpGet("forms/{formId}")]
+    Served from form_cache as pre-serialized (and pre-compressed) JSON;
+    concurrent misses share one Healthie call. Supports If-None-Match
+    revalidation (304).
     """
     try:
-        form = await healthie_client.get_custom_form_async(form_id)
-        if not form:
+        cached = await form_cache.get_or_load(form_id, lambda: load_form(form_id))
+        if not cached:
             raise HTTPException(status_code=404, detail="Form not found")
 
-        # Post-process: Convert specific questions from 10-point scale to Yes/No
-        # (Matching .NET logic in HealthieController.cs lines 42-56)
-        if form.custom_modules:
-            for module in form.custom_modules:
-                if module.label and (
-                    "Do you have any surgery upcoming" in module.label or
-                    "Are you currently taking an opioid medication" in module.label or
-                    "Are you currently seeing a therapist or counselor" in module.label or
-                    "unhealthy relationship with alcohol, drugs, or prescription medications" in module.label
-                ):
-                    # Change from 10-point scale to Yes/No
-                    module.options = ["Yes", "No"]
-
-        return form
+        if etag_matches(request, cached.etag):
+            return not_modified(cached.etag, settings.form_cache_control)
+
+        headers = {"ETag": cached.etag, "Cache-Control": settings.form_cache_control, "Vary": "Accept-Encoding"}
+        encoding = negotiate(request.headers.get("accept-encoding", ""), cached.encoded)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+            headers["ETag"] = weak_etag(cached.etag)
+            return JSONBytesResponse(cached.encoded[encoding], headers=headers)
+
+        return JSONBytesResponse(cached.body, headers=headers)
+    except HTTPException:
+        raise
+    except UpstreamUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error fetching form {form_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -143,6 +315,8 @@ async def submit_form(input_data: FormAnswerGroupInput):
             "formAnswerGroupId": form_answer_group_id,
             "success": True
         }
+    except UpstreamUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error submitting form: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -158,11 +332,45 @@ async def get_patient_forms(patient_id: str):
     try:
         forms = await healthie_client.get_form_answer_groups_for_patient_async(patient_id)
         return forms
+    except UpstreamUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error fetching forms for patient {patient_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/healthie/patients/{patient_id}/forms/history", response_model=PatientFormHistory)
+async def get_patient_form_history(patient_id: str, limit: Optional[int] = None):
+    """
+    Get a patient's form answer groups with all answers
+
+    Replaces listing IDs and fetching details per ID: groups are fetched
+    in aliased batches with bounded concurrency (see
+    HealthieApiClient.get_form_history_async).
+
+    Args:
+        patient_id: Healthie patient ID
+        limit: Maximum groups to return (capped at HEALTHIE_HISTORY_MAX_GROUPS)
+    """
+    if limit is not None and limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be at least 1")
+
+    try:
+        max_groups = min(limit or settings.healthie_history_max_groups, settings.healthie_history_max_groups)
+        history = await healthie_client.get_form_history_async(
+            patient_id,
+            max_groups=max_groups,
+            batch_size=settings.healthie_history_batch_size,
+            max_concurrency=settings.healthie_history_max_concurrency
+        )
+        return model_response(history)
+    except UpstreamUnavailableError:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching form history for patient {patient_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/api/healthie/forms/details/{form_answer_group_id}")
 async def get_form_details(form_answer_group_id: str):
     """
@@ -173,6 +381,8 @@ async def get_form_details(form_answer_group_id: str):
     try:
         details = await healthie_client.get_form_answer_group_details_async(form_answer_group_id)
         return details
+    except UpstreamUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error fetching form details {form_answer_group_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -188,31 +398,226 @@ async def delete_form(form_answer_group_id: str):
     try:
         await healthie_client.delete_form_answer_group_async(form_answer_group_id)
         return {"success": True}
+    except UpstreamUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error deleting form {form_answer_group_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ============================================================================
+# Medication Search
+# ============================================================================
+
+async def load_medication_index():
+    """Load the medication index from settings.medication_index_path, if configured"""
+    global medication_index
+    if not settings.medication_index_path:
+        if medication_fallback is not None:
+            logger.info("MEDICATION_INDEX_PATH not set; /api/medications/search queries the openFDA API")
+        else:
+            logger.info("MEDICATION_INDEX_PATH not set; /api/medications/search is disabled")
+        return
+    try:
+        medication_index = await asyncio.to_thread(MedicationIndex.from_file, settings.medication_index_path)
+        logger.info(f"Medication index loaded: {len(medication_index)} names")
+    except Exception as e:
+        logger.error(f"Error loading medication index from {settings.medication_index_path}: {str(e)}")
+
+
+@app.get("/api/medications/search", response_model=List[str])
+async def search_medications(q: str, limit: int = 10):
+    """
+    Medication name autocomplete
+
+    Prefix search over openFDA brand and generic names, served from memory
+    with no external calls. Names starting with the query rank first, then
+    names with a later word starting with it, then by NDC product count.
+    Without a loaded index the openFDA API is queried instead (cached per
+    query) unless MEDICATION_OPENFDA_FALLBACK is off.
+    """
+    if medication_index is None and medication_fallback is None:
+        raise HTTPException(status_code=503, detail="Medication index is not loaded")
+    if len(q.strip()) < settings.medication_search_min_length:
+        return []
+    limit = max(1, min(limit, settings.medication_search_max_results))
+    if medication_index is not None:
+        return medication_index.search(q, limit)
+    try:
+        return await medication_fallback.search(q, limit)
+    except httpx.HTTPError as e:
+        logger.error(f"openFDA medication search failed: {str(e)}")
+        raise HTTPException(status_code=503, detail="Medication search is unavailable")
+
+
+# ============================================================================
+# Blob Storage (signature images)
+# ============================================================================
+
+@app.post("/api/blobs", status_code=201)
+async def upload_blob(request: Request):
+    """
+    Upload a blob (raw request body) and get a reference for form_data
+
+    The Content-Type header is stored with the blob. Uploads are
+    content-addressed, so repeating an upload is cheap and idempotent.
+
+    Returns:
+        {"ref": "blob:sha256:<hex>", "sha256", "size", "content_type"}
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type not in ALLOWED_CONTENT_TYPES:
+        raise HTTPException(status_code=415, detail=f"Content-Type must be one of: {', '.join(ALLOWED_CONTENT_TYPES)}")
+
+    declared_length = request.headers.get("content-length")
+    if declared_length and declared_length.isdigit() and int(declared_length) > settings.blob_max_bytes:
+        raise HTTPException(status_code=413, detail=f"Blob exceeds {settings.blob_max_bytes} bytes")
+
+    try:
+        data = bytearray()
+        async for chunk in request.stream():
+            data.extend(chunk)
+            if len(data) > settings.blob_max_bytes:
+                raise HTTPException(status_code=413, detail=f"Blob exceeds {settings.blob_max_bytes} bytes")
+        if not data:
+            raise HTTPException(status_code=400, detail="Empty body")
+
+        info = await blob_store.put(bytes(data), content_type)
+        return {"ref": info.ref, "sha256": info.sha256, "size": info.size, "content_type": info.content_type}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error storing blob: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/blobs/{sha256}")
+async def get_blob(sha256: str, request: Request):
+    """
+    Download a blob by SHA-256
+
+    Blobs never change, so responses are cacheable forever and the digest
+    doubles as the ETag.
+    """
+    if not is_valid_sha256(sha256):
+        raise HTTPException(status_code=404, detail="Blob not found")
+
+    etag = f'"{sha256}"'
+    cache_control = "private, max-age=31536000, immutable"
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+
+    try:
+        blob = await blob_store.get(sha256)
+    except Exception as e:
+        logger.error(f"Error reading blob {sha256}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if blob is None:
+        raise HTTPException(status_code=404, detail="Blob not found")
+
+    data, content_type = blob
+    return Response(
+        content=data,
+        media_type=content_type,
+        headers={"ETag": etag, "Cache-Control": cache_control, "X-Content-Type-Options": "nosniff"}
+    )
+
+
 # ============================================================================
 # NEW: PostgreSQL Intake Endpoints with Draft Support
 # ============================================================================
 
+def publish_draft_event(event_type: str, healthie_id: str, origin: Optional[str], **fields) -> None:
+    """Tell the patient's other devices about a draft change (queued; no-op with draft sync off)"""
+    if draft_sync is not None:
+        draft_sync.publish(draft_event(event_type, healthie_id, origin=origin, **fields))
+
+
+@app.websocket("/api/intake/draft/{healthie_id}/ws")
+async def draft_sync_socket(websocket: WebSocket, healthie_id: str, client_id: Optional[str] = None):
+    """
+    Push changes to a patient's draft made on other devices
+
+    Replaces polling GET /api/intake/draft/{healthie_id}. The first message
+    is {"type": "subscribed", "last_updated_at": ...} with the current
+    version; then one message per change (format in services/draft_sync.py).
+    client_id should match the X-Draft-Client-Id header the device sends
+    on saves, so its own changes are not echoed back. Incoming messages
+    are ignored.
+    """
+    if draft_sync is None:
+        await websocket.close(code=1008, reason="Draft sync is disabled")
+        return
+
+    await websocket.accept()
+    # Subscribe before reading the version so no change falls in between
+    subscription = draft_sync.subscribe(healthie_id, client_id)
+
+    client_gone = asyncio.Event()
+
+    async def watch_disconnect():
+        try:
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        except Exception:
+            pass
+        client_gone.set()
+        subscription.close()
+
+    watcher = asyncio.create_task(watch_disconnect())
+    try:
+        # Once other workers know about this socket they publish its patient's changes
+        await draft_sync.announced(subscription)
+        if draft_buffer is not None and draft_buffer.current_version(healthie_id):
+            current_version = draft_buffer.current_version(healthie_id)
+        else:
+            async with async_session_maker() as session:
+                current_version = await IntakeRepository(session).get_draft_last_updated_at(healthie_id)
+        await websocket.send_text(orjson.dumps({
+            "type": "subscribed",
+            "patient_healthie_id": healthie_id,
+            "last_updated_at": version_key(current_version)
+        }).decode())
+
+        while (message := await subscription.get()) is not None:
+            await websocket.send_text(message)
+    except Exception as e:
+        # Client went away mid-send
+        logger.debug(f"Draft sync socket for {healthie_id} ended: {str(e)}")
+    finally:
+        watcher.cancel()
+        draft_sync.unsubscribe(subscription)
+        if not client_gone.is_set():
+            # Server shutting down: ask the client to reconnect
+            try:
+                await websocket.close(code=1012)
+            except Exception:
+                pass
+
+
 @app.get("/api/intake/draft/{healthie_id}")
 async def get_draft(
     healthie_id: str,
+    hydrate_blobs: bool = False,
     session: AsyncSession = Depends(get_session)
 ):
     """
     Get draft progress for a patient by Healthie ID
 
-    Returns most recent draft if exists, otherwise 404.
+    Returns most recent draft if exists, otherwise 404. Blob references in
+    form_data are inlined as data URLs only when hydrate_blobs=true.
     """
     try:
+        if draft_buffer is not None:
+            # Read-your-writes: buffered saves reach the table first
+            await draft_buffer.flush_patient(healthie_id)
         repo = IntakeRepository(session)
         draft = await repo.get_draft_by_healthie_id(healthie_id)
         if not draft:
             raise HTTPException(status_code=404, detail="No draft found for this patient")
-        return draft
+        if hydrate_blobs:
+            draft["form_data"] = await hydrate_blob_refs(draft["form_data"], blob_store)
+        return json_response(draft)
     except HTTPException:
         raise
     except Exception as e:
@@ -243,8 +648,9 @@ async def check_completed_intake(
             .where(IntakeRecord.patient_healthie_id == healthie_id)
             .where(IntakeRecord.status == 'completed')
             .order_by(IntakeRecord.submitted_at.desc())
+            .limit(1)
         )
-        completed_intake = result.scalar_one_or_none()
+        completed_intake = result.scalars().first()
 
         if not completed_intake:
             raise HTTPException(status_code=404, detail="No completed intake found")
@@ -265,37 +671,117 @@ async def check_completed_intake(
 @app.post("/api/intake/draft")
 async def save_draft(
     intake: IntakeSubmission,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_session),
+    draft_client_id: Optional[str] = Header(None, alias="X-Draft-Client-Id")
 ):
     """
     Save draft progress
 
-    Creates new draft or updates existing draft for this patient.
+    Creates new draft or updates existing draft for this patient. With the
+    draft buffer enabled the save is acknowledged from memory ("buffered":
+    true, draft_id null until first written) and reaches PostgreSQL on the
+    next flush.
     """
     try:
         repo = IntakeRepository(session)
 
         # Ensure status is draft
         intake.status = "draft"
+        intake.form_data = await offload_data_urls(intake.form_data, blob_store, settings.blob_offload_min_bytes)
 
-        draft_id = await repo.save_draft(intake)
-        logger.info(f"Draft saved: {draft_id} for healthie_id {intake.patient_healthie_id}")
+        if draft_buffer is not None:
+            draft_id = await draft_buffer.save(intake)
+        else:
+            draft_id = await repo.save_draft(intake)
+            logger.info(f"Draft saved: {draft_id} for healthie_id {intake.patient_healthie_id}")
+        publish_draft_event("saved", intake.patient_healthie_id, draft_client_id,
+                            last_updated_at=intake.last_updated_at)
 
         return {
             "draft_id": draft_id,
             "status": "success",
             "message": "Draft saved successfully",
-            "last_updated_at": intake.last_updated_at.isoformat() if intake.last_updated_at else None
+            "last_updated_at": intake.last_updated_at.isoformat() if intake.last_updated_at else None,
+            "buffered": draft_buffer is not None
         }
     except Exception as e:
         logger.error(f"Error saving draft: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.patch("/api/intake/draft/{healthie_id}")
+async def patch_draft(
+    healthie_id: str,
+    patch: DraftPatch,
+    session: AsyncSession = Depends(get_session),
+    draft_client_id: Optional[str] = Header(None, alias="X-Draft-Client-Id")
+):
+    """
+    Apply an incremental update to a draft
+
+    Accepts an RFC 7396 merge patch or RFC 6902 JSON Patch for form_data,
+    applied server-side. Returns 409 with the current version if the draft
+    changed since `last_updated_at`; the client should then do a full save.
+    """
+    try:
+        repo = IntakeRepository(session)
+        if patch.merge_patch is not None:
+            patch.merge_patch = await offload_data_urls(patch.merge_patch, blob_store, settings.blob_offload_min_bytes)
+        for operation in patch.json_patch or []:
+            operation.value = await offload_data_urls(operation.value, blob_store, settings.blob_offload_min_bytes)
+
+        buffered = draft_buffer is not None and not patch.json_patch
+        if buffered:
+            updated = await draft_buffer.patch(healthie_id, patch)
+        else:
+            if draft_buffer is not None:
+                # JSON Patch is applied in SQL, on the latest written draft
+                await draft_buffer.release(healthie_id)
+            updated = await repo.patch_draft(healthie_id, patch)
+
+        if not updated:
+            current_version = draft_buffer.current_version(healthie_id) if buffered else None
+            current_version = current_version or await repo.get_draft_last_updated_at(healthie_id)
+            if not current_version:
+                raise HTTPException(status_code=404, detail="No draft found for this patient")
+            return JSONResponse(
+                status_code=409,
+                content={
+                    "detail": "Draft was modified since the given last_updated_at",
+                    "last_updated_at": current_version
+                }
+            )
+
+        if not buffered:
+            logger.info(f"Draft patched: {updated['id']} for healthie_id {healthie_id}")
+        # Other devices apply merge patches themselves; for JSON Patch they re-read the draft
+        delta = None
+        if not patch.json_patch:
+            delta = {key: value for key, value in patch.model_dump(exclude={"last_updated_at", "json_patch"}).items()
+                     if value is not None}
+        publish_draft_event("patched", healthie_id, draft_client_id, last_updated_at=updated["last_updated_at"],
+                            base=patch.last_updated_at, patch=delta)
+        return {
+            "draft_id": updated["id"],
+            "status": "success",
+            "message": "Draft updated successfully",
+            "last_updated_at": updated["last_updated_at"],
+            "buffered": buffered
+        }
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error patching draft for {healthie_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.delete("/api/intake/draft/{healthie_id}")
 async def delete_draft(
     healthie_id: str,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_session),
+    draft_client_id: Optional[str] = Header(None, alias="X-Draft-Client-Id")
 ):
     """
     Delete draft for a patient by Healthie ID
@@ -306,6 +792,8 @@ async def delete_draft(
         from sqlalchemy import delete
         from models.database import IntakeRecord
 
+        if draft_buffer is not None:
+            await draft_buffer.discard(healthie_id)
         result = await session.execute(
             delete(IntakeRecord)
             .where(IntakeRecord.patient_healthie_id == healthie_id)
@@ -315,6 +803,8 @@ async def delete_draft(
 
         deleted_count = result.rowcount
         logger.info(f"Deleted {deleted_count} draft(s) for healthie_id {healthie_id}")
+        if deleted_count:
+            publish_draft_event("deleted", healthie_id, draft_client_id)
 
         return {
             "success": True,
@@ -326,63 +816,96 @@ async def delete_draft(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def idempotent_replay(stored, request_hash: str) -> ORJSONResponse:
+    """
+    Response for a retried submit: the stored result, or 422 if the body changed
+
+    Args:
+        stored: IntakeIdempotencyKey row for the request's key
+        request_hash: SHA-256 of the retried request body
+    """
+    if stored.request_hash != request_hash:
+        raise HTTPException(
+            status_code=422,
+            detail="Idempotency-Key was already used with a different request body"
+        )
+    return json_response(stored.response, status_code=stored.status_code, headers={"Idempotent-Replayed": "true"})
+
+
 @app.post("/api/intake/submit")
 async def submit_intake(
     intake: IntakeSubmission,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_session),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    draft_client_id: Optional[str] = Header(None, alias="X-Draft-Client-Id")
 ):
     """
     Submit intake form to PostgreSQL
 
     Updates existing draft to 'completed' status or creates new completed record.
-    Healthie sync will be handled by AWS Lambda later.
+    Healthie sync is queued in the same statement (healthie_sync_outbox) and
+    performed by the background worker, so this never waits on Healthie.
+
+    With an Idempotency-Key header, a retry (double-click, mobile resend)
+    returns the stored result of the first submit with
+    Idempotent-Replayed: true instead of creating another completed intake.
+    Reusing a key with a different body is rejected with 422.
     """
     try:
         repo = IntakeRepository(session)
 
+        request_hash = None
+        if idempotency_key is not None:
+            if not 0 < len(idempotency_key) <= 255:
+                raise HTTPException(status_code=400, detail="Idempotency-Key must be 1-255 characters")
+            # Timestamps default to the receive time, so they are left out of the hash
+            request_hash = hashlib.sha256(orjson.dumps(
+                intake.model_dump(mode="json", exclude={"created_at", "last_updated_at", "submitted_at"}),
+                option=orjson.OPT_SORT_KEYS
+            )).hexdigest()
+            stored = await repo.get_idempotency_record(idempotency_key)
+            if stored is not None:
+                return idempotent_replay(stored, request_hash)
+
         # Set status to completed and add submitted_at timestamp
         intake.status = "completed"
         from datetime import datetime
         intake.submitted_at = datetime.utcnow()
+        intake.form_data = await offload_data_urls(intake.form_data, blob_store, settings.blob_offload_min_bytes)
 
-        # Check if draft exists
-        draft = await repo.get_draft_by_healthie_id(intake.patient_healthie_id)
-
-        if draft:
-            # Update existing draft with all final submission data in one operation
-            from sqlalchemy import update
-            from models.database import IntakeRecord
-            from uuid import UUID
-
-            await session.execute(
-                update(IntakeRecord)
-                .where(IntakeRecord.id == UUID(draft['id']))
-                .values(
-                    status='completed',
-                    submitted_at=datetime.utcnow(),
-                    last_updated_at=datetime.utcnow(),
-                    first_name=intake.first_name,
-                    last_name=intake.last_name,
-                    email=intake.email,
-                    date_of_birth=intake.date_of_birth,
-                    phone=intake.phone,
-                    form_data=intake.form_data
-                )
-            )
-            await session.commit()
+        if draft_buffer is not None:
+            # Submit completes the stored draft row, so write the buffered copy first
+            await draft_buffer.release(intake.patient_healthie_id)
 
-            intake_id = draft['id']
-            logger.info(f"Draft updated to completed: {intake_id} for {intake.email}")
-        else:
-            # No draft exists, create new completed record
-            intake_id = await repo.save(intake)
-            logger.info(f"New intake submitted: {intake_id} for {intake.email}")
+        sync_payload = None
+        if settings.outbox_enabled:
+            sync_payload = intake.to_form_answer_group_input(settings.healthie_intake_form_id).model_dump()
 
-        return {
-            "intake_id": intake_id,
+        response_body = {
             "status": "success",
             "message": "Intake submission saved successfully"
         }
+        try:
+            intake_id = await repo.submit(
+                intake,
+                sync_payload=sync_payload,
+                idempotency_key=idempotency_key,
+                request_hash=request_hash,
+                response_body=response_body
+            )
+        except IntegrityError:
+            # A concurrent request with the same key won; replay its result
+            await session.rollback()
+            stored = await repo.get_idempotency_record(idempotency_key) if idempotency_key else None
+            if stored is None:
+                raise
+            return idempotent_replay(stored, request_hash)
+        logger.info(f"Intake submitted: {intake_id} for {intake.email}")
+        publish_draft_event("submitted", intake.patient_healthie_id, draft_client_id)
+
+        return {"intake_id": intake_id, **response_body}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error saving intake: {str(e)}")
         logger.exception("Full traceback:")
@@ -404,11 +927,11 @@ async def list_intakes(
         intakes = await repo.find_all(limit=limit)
         count = await repo.count()
 
-        return {
+        return json_response({
             "total_count": count,
             "returned_count": len(intakes),
             "intakes": intakes
-        }
+        })
     except Exception as e:
         logger.error(f"Error listing intakes: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -417,19 +940,40 @@ async def list_intakes(
 @app.get("/api/intake/{intake_id}")
 async def get_intake(
     intake_id: str,
+    request: Request,
+    hydrate_blobs: bool = False,
     session: AsyncSession = Depends(get_session)
 ):
     """
     Get intake submission by ID
 
     Returns the complete intake record from PostgreSQL.
+    Supports If-None-Match revalidation (304) without loading form_data.
+    Signature images are returned as blob references (fetch them from
+    /api/blobs/{sha256}) unless hydrate_blobs=true.
     """
     try:
         repo = IntakeRepository(session)
+        variant = "hydrated" if hydrate_blobs else ""
+
+        # Conditional request: compare against the version column only
+        if request.headers.get("if-none-match"):
+            last_updated_at = await repo.get_last_updated_at(intake_id)
+            if last_updated_at:
+                etag = intake_etag(intake_id, last_updated_at, variant)
+                if etag_matches(request, etag):
+                    return not_modified(etag, settings.intake_cache_control)
+
         intake = await repo.find_by_id(intake_id)
         if not intake:
             raise HTTPException(status_code=404, detail="Intake not found")
-        return intake
+        if hydrate_blobs:
+            intake["form_data"] = await hydrate_blob_refs(intake["form_data"], blob_store)
+
+        return json_response(intake, headers={
+            "ETag": intake_etag(intake_id, intake["last_updated_at"], variant),
+            "Cache-Control": settings.intake_cache_control
+        })
     except HTTPException:
         raise
     except Exception as e:
@@ -451,11 +995,11 @@ async def get_patient_intakes(
         repo = IntakeRepository(session)
         intakes = await repo.find_by_email(email)
 
-        return {
+        return json_response({
             "email": email,
             "count": len(intakes),
             "intakes": intakes
-        }
+        })
     except Exception as e:
         logger.error(f"Error fetching intakes for {email}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -507,12 +1051,371 @@ async def delete_intake(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ============================================================================
+# Admin: Intake Listing
+# ============================================================================
+
+def encode_cursor(after) -> str:
+    """Encode a (created_at, id) keyset position as an opaque cursor"""
+    import base64
+    created_at, intake_id = after
+    raw = f"{created_at.isoformat()}|{intake_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Decode a cursor from encode_cursor(); raises ValueError if malformed"""
+    import base64
+    from uuid import UUID
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, intake_id = raw.split("|")
+        return datetime.fromisoformat(created_at), UUID(intake_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+@app.get("/api/admin/intakes")
+async def list_intake_summaries(
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    List intake summaries for the admin dashboard
+
+    Keyset-paginated on (created_at, id), newest first, without form_data.
+    Pass `next_cursor` from the previous page as `cursor`. total_count is
+    cached per filter for a short time, so it may lag slightly.
+    """
+    try:
+        limit = max(1, min(limit, 200))
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        repo = IntakeRepository(session)
+        intakes, next_after = await repo.list_summaries(
+            limit=limit,
+            after=after,
+            status=status,
+            created_from=created_from,
+            created_to=created_to
+        )
+
+        async def count_intakes():
+            async with async_session_maker() as count_session:
+                return await IntakeRepository(count_session).count_filtered(status, created_from, created_to)
+
+        total = await intake_count_cache.get_or_load((status, created_from, created_to), count_intakes)
+
+        return json_response({
+            "total_count": total,
+            "total_is_cached": True,
+            "returned_count": len(intakes),
+            "next_cursor": encode_cursor(next_after) if next_after else None,
+            "intakes": intakes
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error listing intake summaries: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def encode_search_cursor(after) -> str:
+    """Encode a (similarity, id) keyset position as an opaque cursor"""
+    import base64
+    similarity, intake_id = after
+    raw = f"{similarity!r}|{intake_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str):
+    """Decode a cursor from encode_search_cursor(); raises ValueError if malformed"""
+    import base64
+    from uuid import UUID
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        similarity, intake_id = raw.split("|")
+        return float(similarity), UUID(intake_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+@app.get("/api/admin/intakes/search")
+async def search_intakes(
+    q: str,
+    limit: int = 25,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Fuzzy patient search for the admin dashboard
+
+    Matches name, email and phone with trigram similarity, so partial
+    input and typos ("jon smth", "smith@exa", "555 0134") still find the
+    patient. Results are ranked by similarity (returned per row) and
+    keyset-paginated: pass `next_cursor` from the previous page as `cursor`.
+    """
+    try:
+        if len(q.strip()) < settings.admin_search_min_length:
+            raise HTTPException(
+                status_code=400,
+                detail=f"q must be at least {settings.admin_search_min_length} characters"
+            )
+        limit = max(1, min(limit, 100))
+        try:
+            after = decode_search_cursor(cursor) if cursor else None
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        repo = IntakeRepository(session)
+        intakes, next_after = await repo.search_summaries(
+            q,
+            limit=limit,
+            after=after,
+            status=status,
+            min_similarity=settings.admin_search_min_similarity
+        )
+
+        return json_response({
+            "query": q,
+            "returned_count": len(intakes),
+            "next_cursor": encode_search_cursor(next_after) if next_after else None,
+            "intakes": intakes
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error searching intakes: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/admin/intakes/export")
+async def export_intakes(
+    format: str = "ndjson",
+    fields: Optional[str] = None,
+    include_form_data: bool = False,
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    batch_size: int = 1000
+):
+    """
+    Export intakes as NDJSON, CSV, XLSX or Parquet
+
+    Rows are read with a server-side cursor in batches of batch_size.
+    NDJSON and CSV are streamed to the client as they are produced; XLSX
+    and Parquet are written to a temporary file first because both
+    formats are finalized at the end.
+
+    Args:
+        format: ndjson, csv, xlsx or parquet
+        fields: Comma-separated dotted form_data paths flattened into columns,
+            e.g. "emergency_contact.name,answers.19056452"
+        include_form_data: Also add the whole form_data document as a column
+    """
+    import os
+    import tempfile
+    from fastapi.responses import StreamingResponse, FileResponse
+    from starlette.background import BackgroundTask
+    from services.intake_export import (
+        EXPORT_FORMATS, STREAMING_FORMATS, MEDIA_TYPES, export_columns, parse_field_paths, stream_text, write_export
+    )
+
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+
+    field_paths = parse_field_paths(fields)
+    columns = export_columns(field_paths, include_form_data)
+    batch_size = max(100, min(batch_size, 10000))
+    filename = f"intakes-{datetime.utcnow():%Y%m%d-%H%M%S}.{format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+    async def batches(session: AsyncSession):
+        async for batch in IntakeRepository(session).stream_for_export(
+            field_paths=field_paths,
+            include_form_data=include_form_data,
+            status=status,
+            created_from=created_from,
+            created_to=created_to,
+            batch_size=batch_size
+        ):
+            yield batch
+
+    if format in STREAMING_FORMATS:
+        # The request-scoped session is closed before the body is sent,
+        # so the stream holds its own session for the cursor's lifetime
+        async def body():
+            async with async_session_maker() as session:
+                async for chunk in stream_text(batches(session), format, columns):
+                    yield chunk
+
+        return StreamingResponse(body(), media_type=MEDIA_TYPES[format], headers=headers)
+
+    fd, path = tempfile.mkstemp(suffix=f".{format}")
+    try:
+        with os.fdopen(fd, "wb") as fileobj:
+            async with async_session_maker() as session:
+                await write_export(batches(session), format, columns, fileobj)
+    except ValueError as e:
+        os.unlink(path)
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        os.unlink(path)
+        logger.error(f"Error exporting intakes: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return FileResponse(
+        path,
+        media_type=MEDIA_TYPES[format],
+        filename=filename,
+        background=BackgroundTask(os.unlink, path)
+    )
+
+
+# ============================================================================
+# Admin: Cache Management
+# ============================================================================
+
+@app.get("/api/admin/cache/forms")
+async def get_form_cache_stats():
+    """
+    Form cache statistics
+
+    Returns hit/miss counters for the form structure cache.
+    """
+    return form_cache.stats()
+
+
+@app.delete("/api/admin/cache/forms")
+async def invalidate_form_cache():
+    """
+    Invalidate all cached form structures
+
+    Use after editing a form in Healthie so patients get the new version.
+    """
+    removed = form_cache.invalidate()
+    logger.info(f"Form cache cleared ({removed} entries)")
+    return {"success": True, "removed_count": removed}
+
+
+@app.delete("/api/admin/cache/forms/{form_id}")
+async def invalidate_cached_form(form_id: str):
+    """
+    Invalidate one cached form structure
+    """
+    removed = form_cache.invalidate(form_id)
+    logger.info(f"Form cache entry for {form_id} cleared")
+    return {"success": True, "removed_count": removed}
+
+
+@app.get("/api/admin/cache/patient-search")
+async def get_patient_search_cache_stats():
+    """
+    Patient search cache statistics
+
+    Returns cache hit rates plus upstream row counts: discarded_rows are
+    name matches from Healthie dropped by the DOB filter.
+    """
+    upstream = dict(healthie_client.search_stats)
+    searches = upstream["searches"]
+    upstream["avg_upstream_rows"] = round(upstream["upstream_rows"] / searches, 2) if searches else None
+    upstream["avg_discarded_rows"] = round(upstream["discarded_rows"] / searches, 2) if searches else None
+    return {"cache": patient_search_cache.stats(), "upstream": upstream}
+
+
+@app.delete("/api/admin/cache/patient-search")
+async def invalidate_patient_search_cache():
+    """
+    Invalidate all cached patient search results
+
+    Use after creating or editing patients in Healthie.
+    """
+    removed = patient_search_cache.invalidate()
+    logger.info(f"Patient search cache cleared ({removed} entries)")
+    return {"success": True, "removed_count": removed}
+
+
+# ============================================================================
+# Admin: Healthie Sync Outbox
+# ============================================================================
+
+@app.get("/api/admin/outbox")
+async def get_outbox_status(
+    limit: int = 50,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Healthie sync outbox status
+
+    Returns row counts per status and the most recent dead-lettered rows.
+    """
+    try:
+        repo = OutboxRepository(session)
+        return {
+            "counts": await repo.count_by_status(),
+            "dead": await repo.find_dead(limit=limit)
+        }
+    except Exception as e:
+        logger.error(f"Error fetching outbox status: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/admin/outbox/{outbox_id}/retry")
+async def retry_outbox_entry(
+    outbox_id: str,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Requeue a dead-lettered Healthie sync for immediate retry
+    """
+    try:
+        from uuid import UUID
+
+        # Validate UUID format
+        try:
+            UUID(outbox_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid outbox ID format")
+
+        repo = OutboxRepository(session)
+        if not await repo.retry(outbox_id):
+            raise HTTPException(status_code=404, detail="Dead-lettered outbox entry not found")
+
+        logger.info(f"Requeued outbox entry {outbox_id}")
+        return {"success": True, "message": "Outbox entry requeued"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrying outbox entry {outbox_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus metrics: request and span duration histograms
+
+    Each worker process exports its own counters; scrape every worker or
+    run a single worker per container.
+    """
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/health")
 async def health_check(session: AsyncSession = Depends(get_session)):
     """
     Health check endpoint for monitoring
 
     Returns status of both Healthie connection and PostgreSQL database.
+    Status is "degraded" while any Healthie circuit breaker is not closed.
     """
     db_status = "unknown"
     try:
@@ -522,15 +1425,23 @@ async def health_check(session: AsyncSession = Depends(get_session)):
     except Exception as e:
         db_status = f"error: {str(e)}"
 
+    resilience = healthie_client.resilience_stats()
+    breakers_open = [name for name, stats in resilience["circuit_breakers"].items() if stats["state"] != "closed"]
+
     return {
-        "status": "healthy",
+        "status": "degraded" if breakers_open else "healthy",
         "database": {
             "type": "postgresql",
-            "status": db_status
+            "status": db_status,
+            "pool": get_pool_stats(),
+            "draft_buffer": draft_buffer.stats() if draft_buffer is not None else None,
+            "draft_sync": draft_sync.stats() if draft_sync is not None else None
         },
         "healthie_api": {
             "url": settings.healthie_api_url,
-            "configured": bool(settings.healthie_api_key)
+            "configured": bool(settings.healthie_api_key),
+            "breakers_open": breakers_open,
+            **resilience
         }
     }
 
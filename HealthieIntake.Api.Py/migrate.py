@@ -0,0 +1,268 @@
+"""
+Versioned schema migrations (migrations/NNN_name.sql)
+
+Each file runs once, in version order, inside its own transaction, and is
+recorded in the schema_migrations table. A PostgreSQL advisory lock
+serializes runners, so containers started together during a deploy apply
+pending migrations once; the others wait, then find nothing to do.
+
+A file containing the line "-- migrate: no-transaction" runs outside a
+transaction instead, one ;-terminated statement at a time, for CREATE
+INDEX CONCURRENTLY. Semicolons inside quoted literals and dollar-quoted
+bodies (DO blocks) do not end a statement. An index
+such a file builds concurrently that an interrupted earlier run left
+INVALID is dropped first, since IF NOT EXISTS would otherwise skip it.
+
+Run it once per deploy, before the API starts:
+    python -m migrate              # apply pending migrations
+    python -m migrate --status     # list applied and pending migrations
+
+API workers only compare the recorded version with the newest file at
+startup (one query) and refuse to start on an outdated schema, unless
+DATABASE_MIGRATE_ON_STARTUP=true makes them migrate themselves.
+"""
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+VERSION_TABLE = "schema_migrations"
+LOCK_KEY = "healthie_intake.schema_migrations"
+
+# Seconds between attempts to take the advisory lock
+LOCK_POLL_SECONDS = 1.0
+
+_FILENAME = re.compile(r"^(\d+)_([A-Za-z0-9_]+)\.sql$")
+_NO_TRANSACTION = re.compile(r"^--\s*migrate:\s*no-transaction\b", re.MULTILINE)
+# Single-quoted literals, dollar-quoted bodies ($$...$$, $tag$...$tag$) and statement ends
+_STATEMENT_TOKEN = re.compile(r"'(?:[^']|'')*'|(\$\w*\$)|;")
+_CONCURRENT_INDEX = re.compile(
+    r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)", re.IGNORECASE
+)
+
+
+class SchemaOutdatedError(RuntimeError):
+    """The database is behind the migrations shipped with this code"""
+
+
+class Migration(NamedTuple):
+    """One migration file"""
+    version: int
+    name: str
+    path: str
+
+    def sql(self) -> str:
+        with open(self.path, encoding="utf-8") as f:
+            return f.read()
+
+    def checksum(self) -> str:
+        with open(self.path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def transactional(self) -> bool:
+        """False for files marked with the "-- migrate: no-transaction" line"""
+        return not _NO_TRANSACTION.search(self.sql())
+
+    def statements(self) -> List[str]:
+        """The file's statements, without comment lines, for running one at a time"""
+        sql = "\n".join(line for line in self.sql().splitlines() if not line.lstrip().startswith("--"))
+        statements, start, position = [], 0, 0
+        while True:
+            token = _STATEMENT_TOKEN.search(sql, position)
+            if token is None:
+                break
+            position = token.end()
+            if token.group(1):
+                # Skip to the matching closing tag
+                closing = sql.find(token.group(1), position)
+                position = len(sql) if closing < 0 else closing + len(token.group(1))
+            elif token.group() == ";":
+                statements.append(sql[start:token.start()])
+                start = position
+        statements.append(sql[start:])
+        return [statement.strip() for statement in statements if statement.strip()]
+
+
+def discover(directory: str = MIGRATIONS_DIR) -> List[Migration]:
+    """
+    Migration files in version order
+
+    Raises:
+        ValueError: Two files share a version number
+    """
+    migrations: Dict[int, Migration] = {}
+    for filename in os.listdir(directory):
+        match = _FILENAME.match(filename)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise ValueError(f"Duplicate migration version {version}: {migrations[version].path}, {filename}")
+        migrations[version] = Migration(version, match.group(2), os.path.join(directory, filename))
+    return [migrations[version] for version in sorted(migrations)]
+
+
+async def current_version(conn: AsyncConnection) -> int:
+    """Highest applied version, 0 for a database that was never migrated"""
+    try:
+        result = await conn.execute(text(f"SELECT coalesce(max(version), 0) FROM {VERSION_TABLE}"))
+        return result.scalar_one()
+    except exc.ProgrammingError:
+        # Version table does not exist yet
+        return 0
+
+
+async def check_schema(engine: AsyncEngine, directory: str = MIGRATIONS_DIR) -> Tuple[int, int]:
+    """
+    Compare the database's schema version with the newest migration
+
+    Returns:
+        (applied version, latest available version)
+    """
+    migrations = discover(directory)
+    latest = migrations[-1].version if migrations else 0
+    async with engine.connect() as conn:
+        return await current_version(conn), latest
+
+
+async def _lock(driver) -> None:
+    """
+    Take the advisory lock, polling instead of blocking in pg_advisory_lock
+
+    A runner blocked in that call holds a snapshot, and CREATE INDEX
+    CONCURRENTLY in the runner holding the lock waits for every older
+    snapshot to end.
+    """
+    while not await driver.fetchval(f"SELECT pg_try_advisory_lock(hashtext('{LOCK_KEY}'))"):
+        await asyncio.sleep(LOCK_POLL_SECONDS)
+
+
+async def _run_outside_transaction(driver, migration: Migration) -> None:
+    """Run a no-transaction migration statement by statement"""
+    for index_name in _CONCURRENT_INDEX.findall(migration.sql()):
+        invalid = await driver.fetchval(
+            "SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass($1)", index_name
+        )
+        if invalid:
+            logger.warning(f"Dropping invalid index {index_name} left by an interrupted build")
+            await driver.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
+    for statement in migration.statements():
+        await driver.execute(statement)
+
+
+def _log_server_message(connection, message) -> None:
+    """Relay RAISE WARNING / NOTICE output of migration files"""
+    level = logging.WARNING if message.severity == "WARNING" else logging.INFO
+    logger.log(level, message.message)
+
+
+async def migrate(engine: AsyncEngine, directory: str = MIGRATIONS_DIR,
+                  target: Optional[int] = None) -> List[Migration]:
+    """
+    Apply pending migrations under the advisory lock
+
+    Args:
+        engine: Async engine for the target database
+        directory: Folder of NNN_name.sql files
+        target: Stop after this version (default: all)
+
+    Returns:
+        Migrations applied by this call (empty when another runner did them)
+    """
+    migrations = [m for m in discover(directory) if target is None or m.version <= target]
+    applied: List[Migration] = []
+
+    async with engine.connect() as conn:
+        # Migration files hold several statements, which only the simple query protocol runs
+        raw = await conn.get_raw_connection()
+        driver = raw.driver_connection
+        driver.add_log_listener(_log_server_message)
+
+        await _lock(driver)
+        try:
+            await driver.execute(f"""
+                CREATE TABLE IF NOT EXISTS {VERSION_TABLE} (
+                    version INTEGER PRIMARY KEY,
+                    name VARCHAR(255) NOT NULL,
+                    checksum VARCHAR(64) NOT NULL,
+                    applied_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+                    execution_ms INTEGER NOT NULL
+                )
+            """)
+            recorded = {row["version"]: row["checksum"]
+                        for row in await driver.fetch(f"SELECT version, checksum FROM {VERSION_TABLE}")}
+
+            for migration in migrations:
+                if migration.version in recorded:
+                    if recorded[migration.version] != migration.checksum():
+                        logger.warning(f"Migration {migration.version}_{migration.name} changed after it was applied")
+                    continue
+
+                logger.info(f"Applying migration {migration.version}_{migration.name}")
+                start = time.perf_counter()
+                record = (
+                    f"INSERT INTO {VERSION_TABLE} (version, name, checksum, execution_ms) VALUES ($1, $2, $3, $4)"
+                )
+                if migration.transactional():
+                    async with driver.transaction():
+                        await driver.execute(migration.sql())
+                        await driver.execute(record, migration.version, migration.name, migration.checksum(),
+                                             round((time.perf_counter() - start) * 1000))
+                else:
+                    # Statements are idempotent, so a run interrupted before the record is safe to repeat
+                    await _run_outside_transaction(driver, migration)
+                    await driver.execute(record, migration.version, migration.name, migration.checksum(),
+                                         round((time.perf_counter() - start) * 1000))
+                applied.append(migration)
+        finally:
+            await driver.execute(f"SELECT pg_advisory_unlock(hashtext('{LOCK_KEY}'))")
+
+    return applied
+
+
+async def status(engine: AsyncEngine, directory: str = MIGRATIONS_DIR) -> None:
+    """Print each migration with its applied time, or 'pending'"""
+    async with engine.connect() as conn:
+        try:
+            result = await conn.execute(text(f"SELECT version, applied_at, execution_ms FROM {VERSION_TABLE}"))
+            recorded = {row.version: row for row in result}
+        except exc.ProgrammingError:
+            recorded = {}
+
+    for migration in discover(directory):
+        row = recorded.get(migration.version)
+        state = f"applied {row.applied_at:%Y-%m-%d %H:%M:%S} ({row.execution_ms} ms)" if row else "pending"
+        print(f"{migration.version:03d}_{migration.name:<40} {state}")
+
+
+async def main(args: argparse.Namespace) -> None:
+    from database import engine, close_db
+
+    try:
+        if args.status:
+            await status(engine)
+            return
+        applied = await migrate(engine, target=args.target)
+        version, latest = await check_schema(engine)
+        print(f"Applied {len(applied)} migration(s); schema version {version} (latest {latest})")
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Apply database migrations")
+    parser.add_argument("--status", action="store_true", help="List applied and pending migrations")
+    parser.add_argument("--target", type=int, default=None, help="Apply migrations up to this version only")
+    main_args = parser.parse_args()
+    asyncio.run(main(main_args))
@@ -0,0 +1,31 @@
+-- Migration: Base intakes table
+-- Purpose: Baseline schema, previously created by Base.metadata.create_all at
+--          startup. A no-op on databases that already have the table; later
+--          migrations add to it
+-- Date: 2026-10-17
+
+CREATE TABLE IF NOT EXISTS intakes (
+    id UUID PRIMARY KEY,
+    patient_healthie_id VARCHAR(50) NOT NULL,
+    first_name VARCHAR(100) NOT NULL,
+    last_name VARCHAR(100) NOT NULL,
+    email VARCHAR(255) NOT NULL,
+    date_of_birth VARCHAR(10) NOT NULL,
+    phone VARCHAR(20),
+    schema_version VARCHAR(20) NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    current_step VARCHAR(10),
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE,
+    last_updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    submitted_at TIMESTAMP WITH TIME ZONE,
+    form_data JSONB NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_intakes_patient_healthie_id ON intakes(patient_healthie_id);
+CREATE INDEX IF NOT EXISTS ix_intakes_first_name ON intakes(first_name);
+CREATE INDEX IF NOT EXISTS ix_intakes_last_name ON intakes(last_name);
+CREATE INDEX IF NOT EXISTS ix_intakes_email ON intakes(email);
+CREATE INDEX IF NOT EXISTS ix_intakes_schema_version ON intakes(schema_version);
+CREATE INDEX IF NOT EXISTS ix_intakes_status ON intakes(status);
+CREATE INDEX IF NOT EXISTS ix_intakes_created_at ON intakes(created_at);
@@ -0,0 +1,27 @@
+-- Migration: Add transactional outbox for Healthie sync
+-- Purpose: Completed intakes are queued in the same transaction and pushed
+--          to Healthie by the background worker (workers/healthie_sync.py)
+-- Date: 2026-10-17
+
+CREATE TABLE IF NOT EXISTS healthie_sync_outbox (
+    id UUID PRIMARY KEY,
+    intake_id UUID REFERENCES intakes(id) ON DELETE CASCADE,
+    operation VARCHAR(50) NOT NULL,
+    payload JSONB NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    locked_until TIMESTAMP WITH TIME ZONE,
+    last_error TEXT,
+    result JSONB,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    processed_at TIMESTAMP WITH TIME ZONE
+);
+
+-- Worker claims due rows by status and next_attempt_at
+CREATE INDEX IF NOT EXISTS idx_outbox_status_next_attempt
+ON healthie_sync_outbox(status, next_attempt_at);
+
+COMMENT ON TABLE healthie_sync_outbox IS 'Pending Healthie writes, drained by the sync worker';
+COMMENT ON COLUMN healthie_sync_outbox.status IS 'pending, processing, done, or dead (dead-lettered after max attempts)';
+COMMENT ON COLUMN healthie_sync_outbox.locked_until IS 'Lease expiry for processing rows; expired leases are reclaimed';
@@ -0,0 +1,17 @@
+-- Migration: Enforce one draft per patient
+-- Purpose: Draft saves become a single INSERT ... ON CONFLICT DO UPDATE,
+--          which needs a unique index on patient_healthie_id for drafts
+-- Date: 2026-10-17
+
+-- Remove duplicate drafts created by concurrent saves, keeping the newest
+DELETE FROM intakes older
+USING intakes newer
+WHERE older.status = 'draft'
+  AND newer.status = 'draft'
+  AND older.patient_healthie_id = newer.patient_healthie_id
+  AND (older.last_updated_at, older.id) < (newer.last_updated_at, newer.id);
+
+-- Partial unique index used as the ON CONFLICT target
+CREATE UNIQUE INDEX IF NOT EXISTS uq_intakes_one_draft_per_patient
+ON intakes(patient_healthie_id)
+WHERE status = 'draft';
@@ -0,0 +1,18 @@
+-- Migration: Idempotency keys for intake submission
+-- Purpose: POST /api/intake/submit with an Idempotency-Key header stores its
+--          response here in the same statement that completes the intake, so
+--          double-clicks and mobile retries replay the result instead of
+--          creating duplicate completed intakes
+-- Date: 2026-10-17
+
+CREATE TABLE IF NOT EXISTS intake_idempotency_keys (
+    key VARCHAR(255) PRIMARY KEY,
+    request_hash VARCHAR(64) NOT NULL,
+    intake_id UUID NOT NULL REFERENCES intakes(id) ON DELETE CASCADE,
+    status_code INTEGER NOT NULL DEFAULT 200,
+    response JSONB NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+COMMENT ON TABLE intake_idempotency_keys IS 'Stored submit responses by Idempotency-Key; retries replay them';
+COMMENT ON COLUMN intake_idempotency_keys.request_hash IS 'SHA-256 of the request body; a key reused with a different body is rejected (422)';
@@ -0,0 +1,28 @@
+-- Migration: Indexes for form_data queries
+-- Purpose: find_by_form_field / find_by_form_data used to scan every intake
+--          and detoast its form_data. Containment queries (form_data @> ...)
+--          use the GIN index; hot paths get expression indexes that match
+--          form_data #> '{path}' = value
+-- Date: 2026-10-17
+--
+-- Built with CREATE INDEX CONCURRENTLY so intakes stay writable while they
+-- build; the runner executes this file outside a transaction, one statement
+-- at a time. Indexes for paths added to FORM_DATA_INDEXED_PATHS later are
+-- built the same way by:
+--     python -m services.form_data_indexes
+--
+-- migrate: no-transaction
+
+-- Any containment query; jsonb_path_ops is smaller and faster than the default
+-- jsonb_ops but only supports @>, @? and @@
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_intakes_form_data_path_ops
+ON intakes USING GIN (form_data jsonb_path_ops);
+
+-- Default FORM_DATA_INDEXED_PATHS
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_intakes_fd_emergency_contact_name
+ON intakes ((form_data #> '{emergency_contact,name}'::text[]));
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_intakes_fd_emergency_contact_phone
+ON intakes ((form_data #> '{emergency_contact,phone}'::text[]));
+
+ANALYZE intakes;
@@ -0,0 +1,33 @@
+-- Migration: Trigram search over patient name, email and phone
+-- Purpose: GET /api/admin/intakes/search matches typos and partial input
+--          (pg_trgm word similarity). The B-tree indexes on first_name /
+--          last_name / email only serve exact or prefix lookups
+-- Date: 2026-10-17
+--
+-- pg_trgm ships with PostgreSQL's contrib modules. Where it is not installed
+-- this migration fails and stays pending (so does every later one): install
+-- the contrib package (e.g. postgresql16-contrib) and run python -m migrate again.
+--
+-- The index is built with CREATE INDEX CONCURRENTLY so intakes stay writable
+-- (draft autosaves, submits) while it builds; the runner executes this file
+-- outside a transaction, one statement at a time.
+--
+-- migrate: no-transaction
+
+DO $$
+BEGIN
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+EXCEPTION WHEN feature_not_supported OR undefined_file THEN
+    RAISE EXCEPTION 'pg_trgm is not available: %', SQLERRM
+        USING HINT = 'Install the PostgreSQL contrib package on the database server, then run python -m migrate again';
+END $$;
+
+-- The expression must match SEARCH_TEXT_SQL in repositories/intake_repository.py
+-- exactly, or the planner cannot use the index
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_intakes_search_trgm
+ON intakes USING GIN ((
+    lower(first_name || ' ' || last_name || ' ' || email || ' ' ||
+          coalesce(regexp_replace(phone, '[^0-9]', '', 'g'), ''))
+) gin_trgm_ops);
+
+ANALYZE intakes;
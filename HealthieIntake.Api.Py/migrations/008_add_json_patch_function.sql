@@ -0,0 +1,97 @@
+-- Migration: RFC 6902 JSON Patch for draft form_data
+-- Purpose: PATCH /api/intake/draft/{id} with json_patch is applied in the
+--          UPDATE itself. Chained jsonb_set calls could not express RFC 6902:
+--          'add' at an array index replaced the element instead of inserting
+--          it, and 'replace' / 'remove' on a missing path silently did nothing
+-- Date: 2026-10-18
+--
+-- intake_json_patch(doc, operations) applies the operations in order and
+-- raises SQLSTATE 22023 (invalid_parameter_value) when one cannot apply;
+-- IntakeRepository.patch_draft turns that into a 422. Each operation is
+-- {"op": "add" | "replace" | "remove", "path": "<JSON Pointer>",
+-- "tokens": [...], "value": ...}, with the pointer already split into tokens
+-- (repositories/jsonb_patch.py); "path" is only used in error messages.
+
+CREATE OR REPLACE FUNCTION intake_json_patch(doc JSONB, operations JSONB)
+RETURNS JSONB
+LANGUAGE plpgsql
+IMMUTABLE
+AS $$
+DECLARE
+    operation JSONB;
+    op TEXT;
+    tokens TEXT[];
+    parent_path TEXT[];
+    key TEXT;
+    value JSONB;
+    parent JSONB;
+    parent_type TEXT;
+    position INTEGER;
+    length INTEGER;
+BEGIN
+    FOR operation IN SELECT jsonb_array_elements(operations) LOOP
+        op := operation ->> 'op';
+        tokens := ARRAY(SELECT jsonb_array_elements_text(operation -> 'tokens'));
+        value := operation -> 'value';
+
+        IF cardinality(tokens) = 0 THEN
+            IF op = 'remove' OR jsonb_typeof(value) IS DISTINCT FROM 'object' THEN
+                RAISE EXCEPTION 'The form_data root can only be replaced with an object'
+                    USING ERRCODE = 'invalid_parameter_value';
+            END IF;
+            doc := value;
+            CONTINUE;
+        END IF;
+
+        parent_path := tokens[1:cardinality(tokens) - 1];
+        key := tokens[cardinality(tokens)];
+        parent := doc #> parent_path;
+        parent_type := jsonb_typeof(parent);
+
+        IF parent_type = 'object' THEN
+            IF op <> 'add' AND NOT parent ? key THEN
+                RAISE EXCEPTION 'Cannot % %: path does not exist', op, operation ->> 'path'
+                    USING ERRCODE = 'invalid_parameter_value';
+            END IF;
+            IF op = 'remove' THEN
+                doc := doc #- tokens;
+            ELSE
+                doc := jsonb_set(doc, tokens, value, true);
+            END IF;
+
+        ELSIF parent_type = 'array' THEN
+            length := jsonb_array_length(parent);
+            IF op = 'add' AND key = '-' THEN
+                position := length;
+            ELSIF key ~ '^(0|[1-9][0-9]{0,8})$' THEN
+                position := key::INTEGER;
+            ELSE
+                RAISE EXCEPTION 'Cannot % %: % is not an array index', op, operation ->> 'path', key
+                    USING ERRCODE = 'invalid_parameter_value';
+            END IF;
+            IF position > length OR (op <> 'add' AND position = length) THEN
+                RAISE EXCEPTION 'Cannot % %: index % is out of bounds', op, operation ->> 'path', key
+                    USING ERRCODE = 'invalid_parameter_value';
+            END IF;
+
+            IF op = 'add' AND position = length THEN
+                doc := jsonb_set(doc, parent_path, parent || jsonb_build_array(value));
+            ELSIF op = 'add' THEN
+                -- Insert before the element at position, shifting the rest
+                doc := jsonb_insert(doc, tokens, value);
+            ELSIF op = 'replace' THEN
+                doc := jsonb_set(doc, tokens, value, false);
+            ELSE
+                doc := doc #- tokens;
+            END IF;
+
+        ELSE
+            RAISE EXCEPTION 'Cannot % %: parent path does not exist', op, operation ->> 'path'
+                USING ERRCODE = 'invalid_parameter_value';
+        END IF;
+    END LOOP;
+    RETURN doc;
+END
+$$;
+
+COMMENT ON FUNCTION intake_json_patch(JSONB, JSONB) IS 'Apply RFC 6902 add/replace/remove operations (paths pre-split into tokens); raises 22023 when an operation cannot apply';
@@ -1,7 +1,9 @@
 from .patient import Patient, PatientSearchRequest
 from .custom_module import CustomModule, CustomModuleForm
-from .form_answer import FormAnswerInput, FormAnswerGroupInput
-from .intake import IntakeSubmission
+from .form_answer import (
+    FormAnswerInput, FormAnswerGroupInput, FormAnswerDetail, FormAnswerGroupDetail, PatientFormHistory
+)
+from .intake import IntakeSubmission, DraftPatch, JsonPatchOperation
 
 __all__ = [
     'Patient',
@@ -10,5 +12,10 @@ __all__ = [
     'CustomModuleForm',
     'FormAnswerInput',
     'FormAnswerGroupInput',
+    'FormAnswerDetail',
+    'FormAnswerGroupDetail',
+    'PatientFormHistory',
     'IntakeSubmission',  # New MongoDB model
+    'DraftPatch',
+    'JsonPatchOperation',
 ]
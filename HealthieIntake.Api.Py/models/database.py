@@ -3,11 +3,12 @@ SQLAlchemy database models for PostgreSQL
 
 Uses JSONB for flexible form_data storage (MongoDB-like flexibility)
 """
-from sqlalchemy import Column, String, DateTime, Text
+from sqlalchemy import Column, String, DateTime, Text, Integer, ForeignKey, Index, text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.sql import func
 import uuid
+from observability import traced
 
 Base = declarative_base()
 
@@ -45,6 +46,24 @@ class IntakeRecord(Base):
     # Can store nested objects, arrays, etc. just like MongoDB
     form_data = Column(JSONB, nullable=False, default=dict)
 
+    __table_args__ = (
+        # At most one draft per patient; target of the draft upsert (ON CONFLICT)
+        Index(
+            "uq_intakes_one_draft_per_patient",
+            "patient_healthie_id",
+            unique=True,
+            postgresql_where=text("status = 'draft'")
+        ),
+        # Containment queries on form_data (form_data @> '{...}'); see repositories/form_data_query.py
+        Index(
+            "ix_intakes_form_data_path_ops",
+            "form_data",
+            postgresql_using="gin",
+            postgresql_ops={"form_data": "jsonb_path_ops"}
+        ),
+    )
+
+    @traced("serialize", "IntakeRecord.to_dict")
     def to_dict(self):
         """Convert to dictionary for API responses"""
         return {
@@ -64,3 +83,65 @@ class IntakeRecord(Base):
             "submitted_at": self.submitted_at.isoformat() if self.submitted_at else None,
             "form_data": self.form_data
         }
+
+
+class IntakeIdempotencyKey(Base):
+    """
+    Stored results of POST /api/intake/submit, keyed by the Idempotency-Key header
+
+    Written in the same statement as the completed intake, so a retried
+    submit either finds its stored response or was never applied.
+    """
+    __tablename__ = "intake_idempotency_keys"
+
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)  # SHA-256 of the request body; reuse with another body is rejected
+    intake_id = Column(UUID(as_uuid=True), ForeignKey("intakes.id", ondelete="CASCADE"), nullable=False)
+    status_code = Column(Integer, nullable=False, default=200)
+    response = Column(JSONB, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class HealthieSyncOutbox(Base):
+    """
+    Transactional outbox for pushing completed intakes to Healthie
+
+    Rows are written in the same transaction as the completed IntakeRecord
+    and drained by the background worker in workers/healthie_sync.py.
+    """
+    __tablename__ = "healthie_sync_outbox"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    intake_id = Column(UUID(as_uuid=True), ForeignKey("intakes.id", ondelete="CASCADE"), nullable=True)
+    operation = Column(String(50), nullable=False)  # e.g. 'create_form_answer_group'
+    payload = Column(JSONB, nullable=False)
+
+    # 'pending' -> 'processing' -> 'done', or 'dead' after max attempts
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    locked_until = Column(DateTime(timezone=True), nullable=True)  # Lease for 'processing' rows
+    last_error = Column(Text, nullable=True)
+    result = Column(JSONB, nullable=True)  # e.g. {"form_answer_group_id": "..."}
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("idx_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    def to_dict(self):
+        """Convert to dictionary for API responses"""
+        return {
+            "id": str(self.id),
+            "intake_id": str(self.intake_id) if self.intake_id else None,
+            "operation": self.operation,
+            "status": self.status,
+            "attempts": self.attempts,
+            "next_attempt_at": self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            "last_error": self.last_error,
+            "result": self.result,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "processed_at": self.processed_at.isoformat() if self.processed_at else None
+        }
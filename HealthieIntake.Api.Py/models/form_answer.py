@@ -18,6 +18,69 @@ class FormAnswerInput(BaseModel):
         }
 
 
+class FormAnswerDetail(BaseModel):
+    """One submitted answer, flattened from Healthie's form_answers"""
+    id: str = Field(default="", alias="id")
+    custom_module_id: str = Field(default="", alias="customModuleId")
+    label: str = Field(default="", alias="label")
+    mod_type: str = Field(default="", alias="modType")
+    answer: Optional[str] = Field(default=None, alias="answer")
+    displayed_answer: Optional[str] = Field(default=None, alias="displayedAnswer")
+
+    class Config:
+        populate_by_name = True
+
+
+class FormAnswerGroupDetail(BaseModel):
+    """A submitted form with its answers"""
+    id: str = Field(default="", alias="id")
+    form_id: str = Field(default="", alias="formId")
+    form_name: str = Field(default="", alias="formName")
+    finished: bool = Field(default=False, alias="finished")
+    created_at: Optional[str] = Field(default=None, alias="createdAt")
+    answers: List[FormAnswerDetail] = Field(default_factory=list, alias="answers")
+
+    class Config:
+        populate_by_name = True
+
+
+class PatientFormHistory(BaseModel):
+    """A patient's form answer groups with their answers"""
+    patient_id: str = Field(..., alias="patientId")
+    total_count: int = Field(default=0, alias="totalCount")
+    returned_count: int = Field(default=0, alias="returnedCount")
+    groups: List[FormAnswerGroupDetail] = Field(default_factory=list, alias="groups")
+
+    class Config:
+        populate_by_name = True
+        json_schema_extra = {
+            "example": {
+                "patientId": "3642270",
+                "totalCount": 1,
+                "returnedCount": 1,
+                "groups": [
+                    {
+                        "id": "512345",
+                        "formId": "2215494",
+                        "formName": "Override App: Intake Form",
+                        "finished": True,
+                        "createdAt": "2025-10-31 10:15:00 -0400",
+                        "answers": [
+                            {
+                                "id": "98765",
+                                "customModuleId": "19056452",
+                                "label": "Date of birth",
+                                "modType": "date",
+                                "answer": "1985-05-15",
+                                "displayedAnswer": "1985-05-15"
+                            }
+                        ]
+                    }
+                ]
+            }
+        }
+
+
 class FormAnswerGroupInput(BaseModel):
     """Form answer group input model matching .NET FormAnswerGroupInput class"""
     custom_module_form_id: str = Field(..., alias="customModuleFormId")
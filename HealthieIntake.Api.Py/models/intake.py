@@ -7,8 +7,47 @@ more structured nested model later.
 """
 
 from datetime import datetime
-from typing import Optional, Dict, Any
-from pydantic import BaseModel, EmailStr, Field
+from decimal import Decimal
+from typing import Optional, Dict, Any, List, Literal
+import orjson
+from pydantic import BaseModel, EmailStr, Field, model_validator
+from .form_answer import FormAnswerInput, FormAnswerGroupInput
+
+
+def form_answer_text(answer: Any) -> str:
+    """
+    Healthie answer string for a form_data answer
+
+    - str: as-is
+    - list: items converted the same way, empty ones dropped, joined with
+      ", " (how the UI joins checkbox selections)
+    - bool: "true" / "false"
+    - int / float: plain decimal notation, no exponent; integral floats
+      without ".0" (3.0 -> "3", 1e-05 -> "0.00001")
+    - dict (and anything else JSON can hold): compact JSON
+    - None: ""
+
+    Args:
+        answer: Value from form_data['answers']
+
+    Returns:
+        Answer text; "" means there is nothing to send
+    """
+    if answer is None:
+        return ''
+    if isinstance(answer, str):
+        return answer
+    if isinstance(answer, bool):
+        return 'true' if answer else 'false'
+    if isinstance(answer, int):
+        return str(answer)
+    if isinstance(answer, float):
+        if answer.is_integer():
+            return str(int(answer))
+        return format(Decimal(repr(answer)), 'f')
+    if isinstance(answer, (list, tuple)):
+        return ', '.join(text for text in map(form_answer_text, answer) if text)
+    return orjson.dumps(answer).decode()
 
 
 class IntakeSubmission(BaseModel):
@@ -80,3 +119,86 @@ class IntakeSubmission(BaseModel):
     def to_dict(self) -> dict:
         """Convert to dictionary for MongoDB insertion"""
         return self.model_dump(mode='json')
+
+    def to_form_answer_group_input(self, default_form_id: str) -> FormAnswerGroupInput:
+        """
+        Build the Healthie createFormAnswerGroup input for this intake
+
+        Only numeric keys in form_data['answers'] are Healthie custom module IDs;
+        derived keys such as '<id>_typed_name' or 'past_medications_structured'
+        are kept in PostgreSQL only. Values are converted with form_answer_text;
+        empty answers are not sent.
+
+        Args:
+            default_form_id: Custom module form ID if form_data has none
+
+        Returns:
+            FormAnswerGroupInput ready for HealthieApiClient
+        """
+        answers = self.form_data.get('answers') or {}
+        form_answers = []
+        for module_id, answer in answers.items():
+            if not module_id.isdigit():
+                continue
+            text = form_answer_text(answer)
+            if text:
+                form_answers.append(FormAnswerInput(custom_module_id=module_id, answer=text))
+
+        return FormAnswerGroupInput(
+            custom_module_form_id=str(self.form_data.get('form_id') or default_form_id),
+            user_id=self.patient_healthie_id,
+            form_answers=form_answers
+        )
+
+
+class JsonPatchOperation(BaseModel):
+    """
+    One RFC 6902 JSON Patch operation on form_data
+
+    Supported ops: add, replace, remove. 'add' sets an object member or
+    inserts before an array index ('-' appends); 'replace' and 'remove'
+    fail (422) when the path does not exist.
+    """
+    op: Literal["add", "replace", "remove"]
+    path: str = Field(..., description="JSON Pointer into form_data, e.g. /answers/19056452")
+    value: Any = None
+
+
+class DraftPatch(BaseModel):
+    """
+    Incremental draft update
+
+    Applied only if the draft's last_updated_at still equals the version the
+    client based its delta on; otherwise the API answers 409 and the client
+    should fall back to a full save.
+    """
+
+    last_updated_at: datetime = Field(..., description="Draft version the delta was computed against")
+    current_step: Optional[str] = Field(None, description="Current form step (1-6)")
+    first_name: Optional[str] = Field(None, max_length=100)
+    last_name: Optional[str] = Field(None, max_length=100)
+    email: Optional[str] = None
+    date_of_birth: Optional[str] = None
+    phone: Optional[str] = Field(None, max_length=20)
+
+    # At most one of the two patch formats
+    merge_patch: Optional[Dict[str, Any]] = Field(None, description="RFC 7396 JSON Merge Patch for form_data")
+    json_patch: Optional[List[JsonPatchOperation]] = Field(None, description="RFC 6902 JSON Patch for form_data")
+
+    @model_validator(mode="after")
+    def check_single_patch_format(self) -> "DraftPatch":
+        if self.merge_patch is not None and self.json_patch is not None:
+            raise ValueError("Provide either merge_patch or json_patch, not both")
+        return self
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "last_updated_at": "2025-10-30T14:03:11.123456+00:00",
+                "current_step": "4",
+                "merge_patch": {
+                    "answers": {"19056452": "1990-01-01", "19056460": None},
+                    "weight": "180"
+                }
+            }
+        }
@@ -0,0 +1,271 @@
+"""
+Request timing, hot-path spans and Prometheus metrics
+
+TimingMiddleware times every request and, per request, sums the time
+spent in each span component:
+
+    db          IntakeRepository / OutboxRepository methods
+    db_connect  waiting for (or opening) a database connection
+    serialize   IntakeRecord.to_dict
+    healthie    HealthieApiClient calls
+
+The totals go out as a Server-Timing header (visible in browser devtools)
+and every span is observed in a Prometheus histogram served by /metrics.
+Overlapping spans of one component (nesting, asyncio.gather) count once
+towards the request total.
+
+With PROFILE_SLOW_REQUESTS=true a sample of requests runs under cProfile
+and profiles of the ones slower than the threshold are written to
+PROFILE_OUTPUT_DIR (open with `python -m pstats` or snakeviz).
+"""
+import cProfile
+import functools
+import inspect
+import logging
+import os
+import random
+import re
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "CONTENT_TYPE_LATEST", "generate_latest", "span", "traced", "traced_methods",
+    "SlowRequestProfiler", "TimingMiddleware",
+]
+
+_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+REQUEST_SECONDS = Histogram(
+    "intake_api_request_duration_seconds", "HTTP request duration",
+    ["method", "route", "status"], buckets=_BUCKETS
+)
+REQUESTS_IN_PROGRESS = Gauge("intake_api_requests_in_progress", "HTTP requests being handled")
+SPAN_SECONDS = Histogram(
+    "intake_api_span_duration_seconds", "Time spent in instrumented calls",
+    ["component", "operation"], buckets=_BUCKETS
+)
+SPAN_ERRORS = Counter(
+    "intake_api_span_errors_total", "Instrumented calls that raised", ["component", "operation"]
+)
+
+
+class RequestTrace:
+    """Per-request span totals by component (wall time, overlaps merged)"""
+
+    def __init__(self):
+        self.totals: Dict[str, float] = {}
+        self._depth: Dict[str, int] = {}
+        self._opened: Dict[str, float] = {}
+
+    def enter(self, component: str, now: float) -> None:
+        depth = self._depth.get(component, 0)
+        if depth == 0:
+            self._opened[component] = now
+        self._depth[component] = depth + 1
+
+    def exit(self, component: str, now: float) -> None:
+        depth = self._depth[component] - 1
+        self._depth[component] = depth
+        if depth == 0:
+            self.totals[component] = self.totals.get(component, 0.0) + now - self._opened[component]
+
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("request_trace", default=None)
+
+
+class span:
+    """
+    Time a block of code as one call of component/operation
+
+    Usage:
+        with span("db", "get_draft"):
+            ...
+    """
+    __slots__ = ("component", "operation", "_start", "_trace")
+
+    def __init__(self, component: str, operation: str):
+        self.component = component
+        self.operation = operation
+
+    def __enter__(self) -> "span":
+        self._start = time.perf_counter()
+        self._trace = _current_trace.get()
+        if self._trace is not None:
+            self._trace.enter(self.component, self._start)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        end = time.perf_counter()
+        SPAN_SECONDS.labels(self.component, self.operation).observe(end - self._start)
+        if exc_type is not None:
+            SPAN_ERRORS.labels(self.component, self.operation).inc()
+        if self._trace is not None:
+            self._trace.exit(self.component, end)
+
+
+def traced(component: str, operation: Optional[str] = None):
+    """
+    Decorator: run each call of a function or coroutine function in a span
+
+    Args:
+        component: Span component, e.g. "db"
+        operation: Operation label (defaults to the function name)
+    """
+    def decorate(func):
+        name = operation or func.__name__
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(component, name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(component, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def traced_methods(component: str, exclude: Iterable[str] = ()):
+    """
+    Class decorator: trace every public method defined on the class
+
+    Async generators (streamed queries) are left alone, since their
+    duration is set by the consumer.
+
+    Args:
+        component: Span component for all methods
+        exclude: Method names to skip (e.g. connection lifecycle)
+    """
+    skipped = set(exclude)
+
+    def decorate(cls):
+        for name, attr in list(vars(cls).items()):
+            if (name.startswith("_") or name in skipped or not inspect.isfunction(attr)
+                    or inspect.isasyncgenfunction(attr)):
+                continue
+            setattr(cls, name, traced(component, name)(attr))
+        return cls
+    return decorate
+
+
+class SlowRequestProfiler:
+    """
+    cProfile a random sample of requests and keep the slow ones
+
+    cProfile hooks the whole event loop thread, so a profile also contains
+    whatever other requests ran meanwhile; only one request is profiled at
+    a time.
+    """
+
+    def __init__(self, sample_rate: float, threshold_ms: float, output_dir: str):
+        """
+        Args:
+            sample_rate: Fraction of requests to profile (0-1)
+            threshold_ms: Keep profiles of requests at least this slow
+            output_dir: Directory for .prof files (created if missing)
+        """
+        self.sample_rate = sample_rate
+        self.threshold_ms = threshold_ms
+        self.output_dir = output_dir
+        self._active = False
+
+    def start(self) -> Optional[cProfile.Profile]:
+        """Begin profiling this request if it is sampled and no other profile is running"""
+        if self._active or random.random() >= self.sample_rate:
+            return None
+        self._active = True
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def finish(self, profile: cProfile.Profile, elapsed_ms: float, method: str, route: str) -> Optional[str]:
+        """
+        Stop profiling and write the profile if the request was slow
+
+        Returns:
+            Path of the written profile, or None
+        """
+        profile.disable()
+        self._active = False
+        if elapsed_ms < self.threshold_ms:
+            return None
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        path = os.path.join(self.output_dir, f"{stamp}-{method}-{slug}-{elapsed_ms:.0f}ms.prof")
+        profile.dump_stats(path)
+        logger.warning(f"Slow request {method} {route} took {elapsed_ms:.0f} ms; profile written to {path}")
+        return path
+
+
+class TimingMiddleware:
+    """
+    Time requests, export Prometheus histograms and add a Server-Timing header
+
+    Requests are labelled by route template (e.g. /api/intake/{intake_id})
+    to keep metric cardinality bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = True,
+                 profiler: Optional[SlowRequestProfiler] = None):
+        """
+        Args:
+            app: Wrapped ASGI app
+            server_timing: Add the Server-Timing response header
+            profiler: Optional sampled profiler for slow requests
+        """
+        self.app = app
+        self.server_timing = server_timing
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace()
+        token = _current_trace.set(trace)
+        profile = self.profiler.start() if self.profiler else None
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    headers = MutableHeaders(raw=message["headers"])
+                    headers.append("Server-Timing", self._server_timing(trace, start))
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUESTS_IN_PROGRESS.dec()
+            _current_trace.reset(token)
+
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            REQUEST_SECONDS.labels(scope["method"], route_path, str(status)).observe(elapsed)
+            if profile is not None:
+                self.profiler.finish(profile, elapsed * 1000, scope["method"], route_path)
+
+    @staticmethod
+    def _server_timing(trace: RequestTrace, start: float) -> str:
+        entries = [f"{component};dur={seconds * 1000:.1f}" for component, seconds in trace.totals.items()]
+        entries.append(f"app;dur={(time.perf_counter() - start) * 1000:.1f}")
+        return ", ".join(entries)
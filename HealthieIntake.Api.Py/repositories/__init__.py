@@ -1,3 +1,4 @@
 from .intake_repository import IntakeRepository
+from .outbox_repository import OutboxRepository
 
-__all__ = ['IntakeRepository']
+__all__ = ['IntakeRepository', 'OutboxRepository']
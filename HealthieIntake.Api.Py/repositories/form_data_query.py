@@ -0,0 +1,116 @@
+"""
+Index-friendly queries on intakes.form_data
+
+Two kinds of index serve form_data lookups (migrations/006):
+
+    GIN (form_data jsonb_path_ops)   any containment query, form_data @> '{...}'
+    expression (form_data #> path)   one hot path each, e.g. emergency_contact.name,
+                                     configured with FORM_DATA_INDEXED_PATHS
+
+Values are compared as JSON, so the string "1" and the number 1 differ.
+The planner only matches an expression index when the query repeats its
+expression exactly, so paths are rendered as SQL literals, never as bind
+parameters.
+
+services/form_data_indexes.py creates the configured indexes.
+"""
+import hashlib
+import re
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Tuple
+
+from sqlalchemy import literal, literal_column
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql.elements import ColumnElement
+
+GIN_INDEX_NAME = "ix_intakes_form_data_path_ops"
+
+# Path tokens are embedded in index DDL and path literals, so keep them to identifier characters
+_TOKEN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def parse_field_path(field_path: str) -> Tuple[str, ...]:
+    """
+    Split a dotted form_data path into tokens
+
+    Example:
+        parse_field_path('emergency_contact.name') -> ('emergency_contact', 'name')
+
+    Raises:
+        ValueError: Empty path or a token with characters other than letters, digits, _ and -
+    """
+    tokens = tuple(field_path.split("."))
+    if not field_path or not all(_TOKEN.match(token) for token in tokens):
+        raise ValueError(f"Invalid form_data path: {field_path!r}")
+    return tokens
+
+
+def containment_document(tokens: Tuple[str, ...], value: Any) -> Dict[str, Any]:
+    """
+    Nested document matching value at a path, for form_data @> document
+
+    Example:
+        containment_document(('answers', '19056453'), '1990-01-01')
+            -> {'answers': {'19056453': '1990-01-01'}}
+    """
+    document = value
+    for token in reversed(tokens):
+        document = {token: document}
+    return document
+
+
+def path_expression(column: ColumnElement, tokens: Tuple[str, ...]) -> ColumnElement:
+    """column #> '{a,b}', written exactly as in the expression index"""
+    return column.op("#>", return_type=JSONB)(literal_column(f"'{{{','.join(tokens)}}}'::text[]"))
+
+
+def path_equals(column: ColumnElement, tokens: Tuple[str, ...], value: Any) -> ColumnElement:
+    """Filter form_data #> path = value (served by the path's expression index)"""
+    return path_expression(column, tokens) == literal(value, JSONB)
+
+
+def form_field_condition(column: ColumnElement, field_path: str, value: Any) -> ColumnElement:
+    """
+    Filter for value at a dotted path, in the form an index can serve
+
+    Paths in FORM_DATA_INDEXED_PATHS compare against their expression
+    index; any other path becomes a containment query for the GIN index.
+    """
+    tokens = parse_field_path(field_path)
+    if tokens in indexed_paths():
+        return path_equals(column, tokens, value)
+    return column.contains(containment_document(tokens, value))
+
+
+def expression_index_name(tokens: Tuple[str, ...]) -> str:
+    """Index name for a path, shortened with a hash to fit PostgreSQL's 63-byte limit"""
+    name = "ix_intakes_fd_" + "_".join(token.replace("-", "_") for token in tokens).lower()
+    if len(name) > 63:
+        digest = hashlib.sha1(".".join(tokens).encode()).hexdigest()[:8]
+        name = f"{name[:54]}_{digest}"
+    return name
+
+
+def gin_index_ddl(concurrently: bool = True) -> str:
+    """CREATE INDEX statement for the form_data containment index"""
+    concurrent = " CONCURRENTLY" if concurrently else ""
+    return f"CREATE INDEX{concurrent} IF NOT EXISTS {GIN_INDEX_NAME} ON intakes USING GIN (form_data jsonb_path_ops)"
+
+
+def expression_index_ddl(tokens: Tuple[str, ...], concurrently: bool = True) -> str:
+    """CREATE INDEX statement for one form_data path"""
+    concurrent = " CONCURRENTLY" if concurrently else ""
+    return (f"CREATE INDEX{concurrent} IF NOT EXISTS {expression_index_name(tokens)} "
+            f"ON intakes ((form_data #> '{{{','.join(tokens)}}}'::text[]))")
+
+
+def parse_indexed_paths(paths: str) -> List[Tuple[str, ...]]:
+    """Split a comma-separated FORM_DATA_INDEXED_PATHS value into token tuples"""
+    return [parse_field_path(path.strip()) for path in paths.split(",") if path.strip()]
+
+
+@lru_cache(maxsize=1)
+def indexed_paths() -> FrozenSet[Tuple[str, ...]]:
+    """Paths with an expression index, from settings"""
+    from config import settings
+    return frozenset(parse_indexed_paths(settings.form_data_indexed_paths))
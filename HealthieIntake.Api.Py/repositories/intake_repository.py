@@ -3,15 +3,39 @@ PostgreSQL Repository for Intake Submissions
 
 Uses SQLAlchemy async ORM with JSONB for MongoDB-like flexibility
 """
-from sqlalchemy import select, func, update
+import re
+
+from sqlalchemy import select, func, update, or_, and_, insert, literal, literal_column, exists, union_all, cast, text, Text
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
-from models.database import IntakeRecord
-from models.intake import IntakeSubmission
-from typing import Optional, List
-from uuid import UUID
-from datetime import datetime
+from models.database import IntakeRecord, IntakeIdempotencyKey, HealthieSyncOutbox
+from models.intake import IntakeSubmission, DraftPatch
+from repositories.jsonb_patch import JSON_PATCH_ERROR_SQLSTATE, merge_patch_expression, json_patch_expression
+from repositories.form_data_query import form_field_condition
+from typing import Optional, List, Dict, Any, Tuple, AsyncIterator
+from uuid import UUID, uuid4
+from datetime import datetime, timezone
+from observability import traced_methods
+
+
+# Text searched by search_summaries; must match the ix_intakes_search_trgm expression
+# in migrations/007 exactly, or the planner cannot use the index
+SEARCH_TEXT_SQL = (
+    "lower(first_name || ' ' || last_name || ' ' || email || ' ' || "
+    "coalesce(regexp_replace(phone, '[^0-9]', '', 'g'), ''))"
+)
+
+
+def normalize_search_query(query: str) -> str:
+    """Lowercase a search, and reduce phone-like input ("(555) 013-4") to its digits"""
+    query = " ".join(query.lower().split())
+    if re.fullmatch(r"[0-9()+.\- ]+", query) and any(c.isdigit() for c in query):
+        return re.sub(r"[^0-9]", "", query)
+    return query
 
 
+@traced_methods("db")
 class IntakeRepository:
     """
     Repository pattern for intake submissions
@@ -61,6 +85,136 @@ class IntakeRepository:
 
         return str(record.id)
 
+    async def submit(
+        self,
+        intake: IntakeSubmission,
+        sync_payload: Optional[Dict[str, Any]] = None,
+        idempotency_key: Optional[str] = None,
+        request_hash: Optional[str] = None,
+        response_body: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Save a completed intake and queue its Healthie sync in one statement
+
+        Converts the patient's draft to completed if one exists, otherwise
+        inserts a new completed record. When sync_payload is given, a
+        healthie_sync_outbox row is written by the same statement, and so is
+        the intake_idempotency_keys row when idempotency_key is given. A
+        concurrent submit with the same key fails the whole statement on the
+        key's primary key (IntegrityError), so no duplicate intake is written.
+
+        Args:
+            intake: IntakeSubmission with status='completed'
+            sync_payload: createFormAnswerGroup input for the outbox, or None
+            idempotency_key: Idempotency-Key header value, or None
+            request_hash: SHA-256 of the request body, stored with the key
+            response_body: Response to replay for the key (intake_id is added)
+
+        Returns:
+            String UUID of the completed record
+        """
+        now = datetime.utcnow()
+        columns = IntakeRecord.__table__.c
+
+        draft = (
+            update(IntakeRecord)
+            .where(IntakeRecord.patient_healthie_id == intake.patient_healthie_id)
+            .where(IntakeRecord.status == 'draft')
+            .values(
+                status='completed',
+                submitted_at=intake.submitted_at or now,
+                last_updated_at=now,
+                first_name=intake.first_name,
+                last_name=intake.last_name,
+                email=intake.email,
+                date_of_birth=intake.date_of_birth,
+                phone=intake.phone,
+                form_data=intake.form_data
+            )
+            .returning(IntakeRecord.id)
+            .cte("draft")
+        )
+
+        # New completed record, only when there was no draft to convert
+        new_record = {
+            "id": uuid4(),
+            "patient_healthie_id": intake.patient_healthie_id,
+            "first_name": intake.first_name,
+            "last_name": intake.last_name,
+            "email": intake.email,
+            "date_of_birth": intake.date_of_birth,
+            "phone": intake.phone,
+            "schema_version": intake.schema_version,
+            "status": intake.status,
+            "current_step": intake.current_step,
+            "last_updated_at": intake.last_updated_at or now,
+            "submitted_at": intake.submitted_at,
+            "form_data": intake.form_data,
+        }
+        inserted = (
+            insert(IntakeRecord)
+            .from_select(
+                list(new_record),
+                select(*[literal(value, columns[name].type) for name, value in new_record.items()])
+                .where(~exists(select(draft.c.id)))
+            )
+            .returning(IntakeRecord.id)
+            .cte("inserted")
+        )
+        target = union_all(select(draft.c.id), select(inserted.c.id)).cte("target")
+
+        ctes = []
+        if sync_payload is not None:
+            ctes.append(
+                insert(HealthieSyncOutbox)
+                .from_select(
+                    ["id", "intake_id", "operation", "payload", "status", "attempts"],
+                    select(
+                        literal(uuid4(), HealthieSyncOutbox.__table__.c.id.type),
+                        target.c.id,
+                        literal('create_form_answer_group'),
+                        literal(sync_payload, JSONB),
+                        literal('pending'),
+                        literal(0)
+                    )
+                )
+                .returning(HealthieSyncOutbox.id)
+                .cte("outbox")
+            )
+        if idempotency_key is not None:
+            response = func.jsonb_build_object('intake_id', cast(target.c.id, Text)).op('||')(
+                literal(response_body or {}, JSONB)
+            )
+            ctes.append(
+                insert(IntakeIdempotencyKey)
+                .from_select(
+                    ["key", "request_hash", "intake_id", "status_code", "response"],
+                    select(literal(idempotency_key), literal(request_hash or ""), target.c.id, literal(200), response)
+                )
+                .returning(IntakeIdempotencyKey.key)
+                .cte("idempotency_key")
+            )
+
+        result = await self.session.execute(select(target.c.id).add_cte(*ctes))
+        intake_id = result.scalar_one()
+        await self.session.commit()
+        return str(intake_id)
+
+    async def get_idempotency_record(self, key: str) -> Optional[IntakeIdempotencyKey]:
+        """
+        Find the stored submit result for an Idempotency-Key
+
+        Args:
+            key: Idempotency-Key header value
+
+        Returns:
+            IntakeIdempotencyKey row or None
+        """
+        result = await self.session.execute(
+            select(IntakeIdempotencyKey).where(IntakeIdempotencyKey.key == key)
+        )
+        return result.scalar_one_or_none()
+
     async def find_by_id(self, intake_id: str) -> Optional[dict]:
         """
         Find intake by UUID
@@ -81,6 +235,26 @@ class IntakeRepository:
         except Exception:
             return None
 
+    async def get_last_updated_at(self, intake_id: str) -> Optional[str]:
+        """
+        Get only the last_updated_at of an intake (cheap version check)
+
+        Args:
+            intake_id: String UUID
+
+        Returns:
+            ISO timestamp string, or None if the intake does not exist
+        """
+        try:
+            uuid_id = UUID(intake_id)
+            result = await self.session.execute(
+                select(IntakeRecord.last_updated_at).where(IntakeRecord.id == uuid_id)
+            )
+            last_updated_at = result.scalar_one_or_none()
+            return last_updated_at.isoformat() if last_updated_at else None
+        except Exception:
+            return None
+
     async def find_by_email(self, email: str) -> List[dict]:
         """
         Find all intakes for a patient email
@@ -129,37 +303,286 @@ class IntakeRepository:
         )
         return result.scalar()
 
+    # Columns shown in admin listings (everything except form_data)
+    SUMMARY_COLUMNS = (
+        IntakeRecord.id,
+        IntakeRecord.patient_healthie_id,
+        IntakeRecord.first_name,
+        IntakeRecord.last_name,
+        IntakeRecord.email,
+        IntakeRecord.date_of_birth,
+        IntakeRecord.phone,
+        IntakeRecord.status,
+        IntakeRecord.current_step,
+        IntakeRecord.created_at,
+        IntakeRecord.last_updated_at,
+        IntakeRecord.submitted_at,
+    )
+
+    @staticmethod
+    def _summary_filters(
+        status: Optional[str],
+        created_from: Optional[datetime],
+        created_to: Optional[datetime]
+    ) -> list:
+        conditions = []
+        if status:
+            conditions.append(IntakeRecord.status == status)
+        if created_from:
+            conditions.append(IntakeRecord.created_at >= created_from)
+        if created_to:
+            conditions.append(IntakeRecord.created_at < created_to)
+        return conditions
+
+    async def list_summaries(
+        self,
+        limit: int = 50,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        status: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None
+    ) -> Tuple[List[dict], Optional[Tuple[datetime, UUID]]]:
+        """
+        Keyset-paginated intake summaries, newest first
+
+        Selects only summary columns (never form_data). Pages are anchored on
+        (created_at, id), so page N costs the same as page 1.
+
+        Args:
+            limit: Maximum number of records to return
+            after: (created_at, id) of the last row of the previous page
+            status: Optional status filter ('draft' or 'completed')
+            created_from: Optional inclusive lower bound on created_at
+            created_to: Optional exclusive upper bound on created_at
+
+        Returns:
+            (summaries, cursor for the next page or None on the last page)
+        """
+        conditions = self._summary_filters(status, created_from, created_to)
+        if after:
+            after_created_at, after_id = after
+            # Expanded form of (created_at, id) < (:c, :i) so the created_at index bounds the scan
+            conditions.append(IntakeRecord.created_at <= after_created_at)
+            conditions.append(or_(
+                IntakeRecord.created_at < after_created_at,
+                IntakeRecord.id < after_id
+            ))
+
+        result = await self.session.execute(
+            select(*self.SUMMARY_COLUMNS)
+            .where(*conditions)
+            .order_by(IntakeRecord.created_at.desc(), IntakeRecord.id.desc())
+            .limit(limit + 1)
+        )
+        rows = result.all()
+
+        next_after = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_after = (rows[-1].created_at, rows[-1].id)
+
+        return [self._summary_dict(row) for row in rows], next_after
+
+    @staticmethod
+    def _summary_dict(row) -> dict:
+        summary = dict(row._mapping)
+        summary["id"] = str(row.id)
+        for field in ("created_at", "last_updated_at", "submitted_at"):
+            summary[field] = summary[field].isoformat() if summary[field] else None
+        return summary
+
+    async def search_summaries(
+        self,
+        query: str,
+        limit: int = 25,
+        after: Optional[Tuple[float, UUID]] = None,
+        status: Optional[str] = None,
+        min_similarity: float = 0.3
+    ) -> Tuple[List[dict], Optional[Tuple[float, UUID]]]:
+        """
+        Typo-tolerant search over patient name, email and phone
+
+        Matches with pg_trgm word similarity against SEARCH_TEXT_SQL, which
+        the GIN trigram index ix_intakes_search_trgm covers (migrations/007),
+        so only candidate rows are read. Results are ranked by similarity and
+        keyset-paginated on (similarity, id).
+
+        Args:
+            query: Search text, e.g. "jon smth", "smith@exa" or "555 0134"
+            limit: Maximum number of records to return
+            after: (similarity, id) of the last row of the previous page
+            status: Optional status filter ('draft' or 'completed')
+            min_similarity: Word similarity threshold (0-1) for a match
+
+        Returns:
+            (summaries with a similarity score, cursor for the next page or None)
+
+        Raises:
+            ValueError: min_similarity is outside 0-1
+        """
+        min_similarity = float(min_similarity)
+        if not 0.0 <= min_similarity <= 1.0:
+            raise ValueError(f"min_similarity must be between 0 and 1, got {min_similarity}")
+
+        needle = normalize_search_query(query)
+        search_text = literal_column(SEARCH_TEXT_SQL)
+        similarity = func.word_similarity(needle, search_text)
+
+        # The <% operator (indexable) compares against this threshold. SET takes no bind
+        # parameters, hence the validated literal; SET LOCAL ends with the session's
+        # transaction, which the search query below runs in
+        await self.session.execute(text(f"SET LOCAL pg_trgm.word_similarity_threshold = {min_similarity!r}"))
+
+        conditions = [literal(needle).op("<%")(search_text)]
+        if status:
+            conditions.append(IntakeRecord.status == status)
+        if after:
+            after_similarity, after_id = after
+            conditions.append(or_(
+                similarity < after_similarity,
+                and_(similarity == after_similarity, IntakeRecord.id < after_id)
+            ))
+
+        result = await self.session.execute(
+            select(*self.SUMMARY_COLUMNS, similarity.label("similarity"))
+            .where(*conditions)
+            .order_by(similarity.desc(), IntakeRecord.id.desc())
+            .limit(limit + 1)
+        )
+        rows = result.all()
+
+        next_after = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_after = (rows[-1].similarity, rows[-1].id)
+
+        return [self._summary_dict(row) for row in rows], next_after
+
+    async def count_filtered(
+        self,
+        status: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None
+    ) -> int:
+        """
+        Count intakes matching the listing filters
+
+        Returns:
+            Number of matching intake records
+        """
+        result = await self.session.execute(
+            select(func.count(IntakeRecord.id))
+            .where(*self._summary_filters(status, created_from, created_to))
+        )
+        return result.scalar()
+
+    async def stream_for_export(
+        self,
+        field_paths: Optional[List[str]] = None,
+        include_form_data: bool = False,
+        status: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[List[dict]]:
+        """
+        Stream intakes for export in batches using a server-side cursor
+
+        Memory use is bounded by batch_size regardless of table size. Selected
+        form_data paths are extracted in SQL (form_data #>> path), so the full
+        JSONB document is only transferred when include_form_data is set.
+
+        Args:
+            field_paths: Dot-separated form_data paths to add as columns,
+                e.g. ['emergency_contact.name', 'answers.19056452']
+            include_form_data: Also return the whole form_data document
+            status: Optional status filter
+            created_from: Optional inclusive lower bound on created_at
+            created_to: Optional exclusive upper bound on created_at
+            batch_size: Rows fetched per round trip
+
+        Yields:
+            Lists of row dictionaries, oldest first
+        """
+        columns = list(self.SUMMARY_COLUMNS)
+        for path in field_paths or []:
+            columns.append(
+                IntakeRecord.form_data[tuple(path.split('.'))].astext.label(f"form_data.{path}")
+            )
+        if include_form_data:
+            columns.append(IntakeRecord.form_data)
+
+        result = await self.session.stream(
+            select(*columns)
+            .where(*self._summary_filters(status, created_from, created_to))
+            .order_by(IntakeRecord.created_at, IntakeRecord.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for partition in result.partitions():
+            yield [dict(row._mapping) for row in partition]
+
     # BONUS: JSONB query capabilities (MongoDB-like!)
-    async def find_by_form_field(self, field_path: str, value: str) -> List[dict]:
+    async def find_by_form_field(self, field_path: str, value: Any, limit: int = 100) -> List[dict]:
         """
         Query by JSONB field path (similar to MongoDB dot notation)
 
+        Paths listed in FORM_DATA_INDEXED_PATHS use their expression index;
+        any other path is a containment query served by the GIN index.
+        Values are matched as JSON, so pass numbers and booleans as such.
+
         Example:
             find_by_form_field('emergency_contact.name', 'Jane Doe')
             find_by_form_field('answers.19056453', '1990-01-01')
 
         Args:
             field_path: Dot-separated path in form_data JSONB
-            value: Value to search for
+            value: JSON value to search for
+            limit: Maximum number of records
 
         Returns:
             List of matching intake dictionaries
         """
-        # Parse field path into JSONB accessor
-        path_parts = field_path.split('.')
-
-        # Build JSONB query
-        jsonb_path = IntakeRecord.form_data
-        for part in path_parts:
-            jsonb_path = jsonb_path[part]
-
         result = await self.session.execute(
             select(IntakeRecord)
-            .where(jsonb_path.astext == value)
+            .where(form_field_condition(IntakeRecord.form_data, field_path, value))
+            .order_by(IntakeRecord.created_at.desc())
+            .limit(limit)
         )
         records = result.scalars().all()
         return [r.to_dict() for r in records]
 
+    async def find_by_form_data(
+        self,
+        match: Dict[str, Any],
+        status: Optional[str] = None,
+        limit: int = 100
+    ) -> List[dict]:
+        """
+        Find intakes whose form_data contains a document (form_data @> match)
+
+        Uses the GIN jsonb_path_ops index, so several fields can be matched
+        at once without a sequential scan.
+
+        Example:
+            find_by_form_data({'emergency_contact': {'name': 'Jane Doe'}, 'hospitalized_recently': 'No'})
+
+        Args:
+            match: Nested document every result must contain
+            status: Optional status filter ('draft' or 'completed')
+            limit: Maximum number of records
+
+        Returns:
+            List of matching intake dictionaries, newest first
+        """
+        query = select(IntakeRecord).where(IntakeRecord.form_data.contains(match))
+        if status:
+            query = query.where(IntakeRecord.status == status)
+
+        result = await self.session.execute(
+            query.order_by(IntakeRecord.created_at.desc()).limit(limit)
+        )
+        return [r.to_dict() for r in result.scalars().all()]
+
     # ============================================================================
     # DRAFT SUPPORT METHODS
     # ============================================================================
@@ -168,8 +591,9 @@ class IntakeRepository:
         """
         Save or update draft progress
 
-        If a draft exists for this healthie_id, updates it.
-        Otherwise, creates a new draft.
+        Single INSERT ... ON CONFLICT DO UPDATE against the partial unique
+        index uq_intakes_one_draft_per_patient, so concurrent saves from two
+        tabs update the same draft instead of racing into duplicates.
 
         Args:
             intake: IntakeSubmission with status='draft'
@@ -177,30 +601,150 @@ class IntakeRepository:
         Returns:
             String UUID of draft record
         """
-        # Check if draft already exists
-        existing_draft = await self.get_draft_by_healthie_id(intake.patient_healthie_id)
+        # Report the stored version back to the caller (used for PATCH)
+        intake.last_updated_at = datetime.utcnow()
+
+        result = await self.session.execute(self._draft_upsert([intake]).returning(IntakeRecord.id))
+        draft_id = result.scalar_one()
+        await self.session.commit()
+        return str(draft_id)
 
-        if existing_draft:
-            # Update existing draft
-            await self.session.execute(
+    async def save_drafts(self, intakes: List[IntakeSubmission]) -> Dict[str, str]:
+        """
+        Write several buffered drafts in one multi-row upsert
+
+        Used by the draft write-behind buffer. A row only replaces a stored
+        draft with an older last_updated_at, so a stale copy flushed late
+        (e.g. by another worker) never overwrites a newer save.
+
+        Args:
+            intakes: Drafts with last_updated_at already set, at most one per patient
+
+        Returns:
+            Draft ID per patient_healthie_id for the rows that were written
+        """
+        if not intakes:
+            return {}
+        stmt = self._draft_upsert(intakes, only_if_newer=True)
+        result = await self.session.execute(stmt.returning(IntakeRecord.patient_healthie_id, IntakeRecord.id))
+        written = {row.patient_healthie_id: str(row.id) for row in result}
+        await self.session.commit()
+        return written
+
+    @staticmethod
+    def _draft_upsert(intakes: List[IntakeSubmission], only_if_newer: bool = False):
+        """INSERT ... ON CONFLICT DO UPDATE of drafts against uq_intakes_one_draft_per_patient"""
+        stmt = pg_insert(IntakeRecord).values([
+            {
+                'patient_healthie_id': intake.patient_healthie_id,
+                'first_name': intake.first_name,
+                'last_name': intake.last_name,
+                'email': intake.email,
+                'date_of_birth': intake.date_of_birth,
+                'phone': intake.phone,
+                'schema_version': intake.schema_version,
+                'status': 'draft',
+                'current_step': intake.current_step,
+                'last_updated_at': intake.last_updated_at,
+                'form_data': intake.form_data
+            }
+            for intake in intakes
+        ])
+        return stmt.on_conflict_do_update(
+            index_elements=[IntakeRecord.patient_healthie_id],
+            # Literal predicate: with a bound 'draft' the generic plan used after five
+            # executions of the prepared statement cannot infer the partial index
+            index_where=text("status = 'draft'"),
+            set_={
+                'first_name': stmt.excluded.first_name,
+                'last_name': stmt.excluded.last_name,
+                'email': stmt.excluded.email,
+                'date_of_birth': stmt.excluded.date_of_birth,
+                'phone': stmt.excluded.phone,
+                'current_step': stmt.excluded.current_step,
+                'last_updated_at': stmt.excluded.last_updated_at,
+                'updated_at': func.now(),
+                'form_data': stmt.excluded.form_data
+            },
+            where=IntakeRecord.last_updated_at < stmt.excluded.last_updated_at if only_if_newer else None
+        )
+
+    async def patch_draft(self, healthie_id: str, patch: DraftPatch) -> Optional[dict]:
+        """
+        Apply an incremental update to a patient's draft
+
+        form_data is patched in SQL (jsonb_set / || / #-), so only the delta
+        travels over the wire. The update only applies if last_updated_at
+        still matches the version the client based its delta on.
+
+        Args:
+            healthie_id: Healthie patient ID
+            patch: DraftPatch with expected version and delta
+
+        Returns:
+            {'id', 'last_updated_at'} of the updated draft, or None if there
+            is no draft or the version does not match
+
+        Raises:
+            ValueError: A JSON Patch operation cannot apply to the draft
+                (e.g. 'replace' or 'remove' of a missing path)
+        """
+        expected = patch.last_updated_at
+        if expected.tzinfo is None:
+            expected = expected.replace(tzinfo=timezone.utc)
+
+        values = {
+            'last_updated_at': datetime.utcnow(),
+            'updated_at': func.now()
+        }
+        for field in ('current_step', 'first_name', 'last_name', 'email', 'date_of_birth', 'phone'):
+            value = getattr(patch, field)
+            if value is not None:
+                values[field] = value
+        if patch.merge_patch:
+            values['form_data'] = merge_patch_expression(IntakeRecord.form_data, patch.merge_patch)
+        elif patch.json_patch:
+            values['form_data'] = json_patch_expression(IntakeRecord.form_data, patch.json_patch)
+
+        try:
+            result = await self.session.execute(
                 update(IntakeRecord)
-                .where(IntakeRecord.id == UUID(existing_draft['id']))
-                .values(
-                    first_name=intake.first_name,
-                    last_name=intake.last_name,
-                    email=intake.email,
-                    date_of_birth=intake.date_of_birth,
-                    phone=intake.phone,
-                    current_step=intake.current_step,
-                    last_updated_at=datetime.utcnow(),
-                    form_data=intake.form_data
-                )
+                .where(IntakeRecord.patient_healthie_id == healthie_id)
+                .where(IntakeRecord.status == 'draft')
+                .where(IntakeRecord.last_updated_at == expected)
+                .values(**values)
+                .returning(IntakeRecord.id, IntakeRecord.last_updated_at)
             )
-            await self.session.commit()
-            return existing_draft['id']
-        else:
-            # Create new draft
-            return await self.save(intake)
+        except DBAPIError as e:
+            if getattr(e.orig, 'sqlstate', None) != JSON_PATCH_ERROR_SQLSTATE:
+                raise
+            await self.session.rollback()
+            # First line of the server message, e.g. 'Cannot replace /answers/123: path does not exist'
+            raise ValueError(str(e.orig).split('\n')[0].split(': ', 1)[-1]) from e
+        row = result.one_or_none()
+        await self.session.commit()
+
+        if row is None:
+            return None
+        return {"id": str(row.id), "last_updated_at": row.last_updated_at.isoformat()}
+
+    async def get_draft_last_updated_at(self, healthie_id: str) -> Optional[str]:
+        """
+        Get only the last_updated_at of a patient's draft
+
+        Args:
+            healthie_id: Healthie patient ID
+
+        Returns:
+            ISO timestamp string, or None if no draft exists
+        """
+        result = await self.session.execute(
+            select(IntakeRecord.last_updated_at)
+            .where(IntakeRecord.patient_healthie_id == healthie_id)
+            .where(IntakeRecord.status == 'draft')
+        )
+        last_updated_at = result.scalar_one_or_none()
+        return last_updated_at.isoformat() if last_updated_at else None
 
     async def get_draft_by_healthie_id(self, healthie_id: str) -> Optional[dict]:
         """
@@ -0,0 +1,130 @@
+"""
+Server-side JSONB patch expressions
+
+Translate RFC 7396 merge patches and RFC 6902 JSON Patch operations into
+SQL expressions so a draft update sends only the delta and PostgreSQL
+applies it in place, without a read-modify-write. Merge patches become
+jsonb_set / || / - expressions; JSON Patch goes through the
+intake_json_patch function (migrations/008), which checks each path
+against the document as patched so far.
+"""
+from typing import Any, Dict, List
+
+from sqlalchemy import Text, case, func, literal
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.sql.elements import ColumnElement
+
+from models.intake import JsonPatchOperation
+
+# invalid_parameter_value, raised by intake_json_patch for operations that cannot apply
+JSON_PATCH_ERROR_SQLSTATE = "22023"
+
+
+def parse_json_pointer(pointer: str) -> List[str]:
+    """
+    Split an RFC 6901 JSON Pointer into path tokens
+
+    Example:
+        parse_json_pointer('/emergency_contact/name') -> ['emergency_contact', 'name']
+    """
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise ValueError(f"Invalid JSON Pointer: {pointer!r}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _path(tokens: List[str]) -> ColumnElement:
+    return literal(tokens, ARRAY(Text))
+
+
+def _jsonb(value: Any) -> ColumnElement:
+    return literal(value, JSONB)
+
+
+def merge_patch_expression(column: ColumnElement, patch: Dict[str, Any], tokens: List[str] = None) -> ColumnElement:
+    """
+    Build an expression applying an RFC 7396 merge patch to a JSONB column
+
+    Each nested object in the patch refers back to the original column
+    (column #> path), so the SQL grows linearly with the patch size.
+
+    Args:
+        column: JSONB column, e.g. IntakeRecord.form_data
+        patch: Merge patch; None values delete members
+        tokens: Path of the sub-document being patched (internal)
+
+    Returns:
+        JSONB expression for the patched document
+    """
+    tokens = tokens or []
+    target = column.op("#>", return_type=JSONB)(_path(tokens)) if tokens else column
+
+    # Non-object targets are replaced by {} before patching (RFC 7396)
+    expr = case((func.jsonb_typeof(target) == "object", target), else_=_jsonb({}))
+
+    removed = [key for key, value in patch.items() if value is None]
+    replaced = {key: value for key, value in patch.items() if value is not None and not isinstance(value, dict)}
+    nested = {key: value for key, value in patch.items() if isinstance(value, dict)}
+
+    if removed:
+        expr = expr.op("-", return_type=JSONB)(_path(removed))
+    if replaced:
+        expr = expr.op("||", return_type=JSONB)(_jsonb(replaced))
+    for key, value in nested.items():
+        child = merge_patch_expression(column, value, tokens + [key])
+        expr = expr.op("||", return_type=JSONB)(func.jsonb_build_object(key, child, type_=JSONB))
+    return expr
+
+
+def apply_merge_patch(target: Any, patch: Any) -> Any:
+    """
+    Apply an RFC 7396 merge patch to a Python document
+
+    In-memory counterpart of merge_patch_expression, for drafts held by the
+    write-behind buffer. The target is not modified.
+
+    Args:
+        target: Current document
+        patch: Merge patch; None values delete members
+
+    Returns:
+        Patched document
+    """
+    if not isinstance(patch, dict):
+        return patch
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_merge_patch(result.get(key), value)
+    return result
+
+
+def json_patch_expression(column: ColumnElement, operations: List[JsonPatchOperation]) -> ColumnElement:
+    """
+    Build an expression applying RFC 6902 operations to a JSONB column
+
+    Operations are applied in order with RFC 6902 semantics: 'add' on an
+    array index inserts before that element ('-' appends), and 'replace' /
+    'remove' require the target to exist. An operation that cannot apply
+    makes the statement fail with SQLSTATE 22023 (JSON_PATCH_ERROR_SQLSTATE).
+
+    Args:
+        column: JSONB column, e.g. IntakeRecord.form_data
+        operations: add / replace / remove operations
+
+    Returns:
+        JSONB expression for the patched document
+
+    Raises:
+        ValueError: A path is not a JSON Pointer, or the root is not replaced with an object
+    """
+    encoded = []
+    for operation in operations:
+        tokens = parse_json_pointer(operation.path)
+        if not tokens and (operation.op == "remove" or not isinstance(operation.value, dict)):
+            raise ValueError("The form_data root can only be replaced with an object")
+        encoded.append({"op": operation.op, "path": operation.path, "tokens": tokens, "value": operation.value})
+    return func.intake_json_patch(column, _jsonb(encoded), type_=JSONB)
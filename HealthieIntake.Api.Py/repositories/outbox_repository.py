@@ -0,0 +1,205 @@
+"""
+PostgreSQL Repository for the Healthie sync outbox
+
+Claims use FOR UPDATE SKIP LOCKED so several workers can drain the
+outbox concurrently without processing the same row twice.
+"""
+from sqlalchemy import select, func, update, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.database import HealthieSyncOutbox
+from typing import Optional, List, Dict, Any
+from uuid import UUID
+from datetime import datetime, timedelta, timezone
+from observability import traced_methods
+
+
+@traced_methods("db")
+class OutboxRepository:
+    """
+    Repository for healthie_sync_outbox rows
+
+    Row lifecycle: pending -> processing -> done, or back to pending with
+    a backoff delay on failure, and dead once max attempts are exhausted.
+    """
+
+    def __init__(self, session: AsyncSession):
+        """
+        Initialize repository with database session
+
+        Args:
+            session: SQLAlchemy async session
+        """
+        self.session = session
+
+    def add(self, operation: str, payload: Dict[str, Any], intake_id: Optional[UUID] = None) -> HealthieSyncOutbox:
+        """
+        Stage an outbox row in the current transaction (caller commits)
+
+        Args:
+            operation: Operation name, e.g. 'create_form_answer_group'
+            payload: JSON payload for the operation
+            intake_id: Intake this row belongs to
+
+        Returns:
+            The pending HealthieSyncOutbox row
+        """
+        row = HealthieSyncOutbox(
+            intake_id=intake_id,
+            operation=operation,
+            payload=payload,
+            status="pending",
+            attempts=0
+        )
+        self.session.add(row)
+        return row
+
+    async def claim_batch(self, batch_size: int, lease_seconds: float) -> List[HealthieSyncOutbox]:
+        """
+        Claim due rows for processing
+
+        Picks pending rows whose next_attempt_at has passed, plus processing
+        rows whose lease expired (a worker died mid-batch).
+
+        Args:
+            batch_size: Maximum rows to claim
+            lease_seconds: How long the claim is held before it can be reclaimed
+
+        Returns:
+            Claimed rows, now in 'processing' status
+        """
+        now = datetime.now(timezone.utc)
+        result = await self.session.execute(
+            select(HealthieSyncOutbox)
+            .where(or_(
+                and_(HealthieSyncOutbox.status == "pending", HealthieSyncOutbox.next_attempt_at <= now),
+                and_(HealthieSyncOutbox.status == "processing", HealthieSyncOutbox.locked_until < now)
+            ))
+            .order_by(HealthieSyncOutbox.next_attempt_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        rows = list(result.scalars().all())
+
+        locked_until = now + timedelta(seconds=lease_seconds)
+        for row in rows:
+            row.status = "processing"
+            row.locked_until = locked_until
+        await self.session.commit()
+        return rows
+
+    async def mark_done(self, outbox_id: UUID, result: Dict[str, Any]) -> None:
+        """
+        Record a successful sync
+
+        Args:
+            outbox_id: Outbox row ID
+            result: Result to keep, e.g. {"form_answer_group_id": "..."}
+        """
+        await self.session.execute(
+            update(HealthieSyncOutbox)
+            .where(HealthieSyncOutbox.id == outbox_id)
+            .values(
+                status="done",
+                attempts=HealthieSyncOutbox.attempts + 1,
+                result=result,
+                last_error=None,
+                locked_until=None,
+                processed_at=datetime.now(timezone.utc)
+            )
+        )
+        await self.session.commit()
+
+    async def mark_failed(self, outbox_id: UUID, error: str, retry_at: Optional[datetime]) -> None:
+        """
+        Record a failed attempt
+
+        Args:
+            outbox_id: Outbox row ID
+            error: Error message
+            retry_at: When to retry, or None to dead-letter the row
+        """
+        values: Dict[str, Any] = {
+            "attempts": HealthieSyncOutbox.attempts + 1,
+            "last_error": error,
+            "locked_until": None,
+        }
+        if retry_at is None:
+            values.update(status="dead", processed_at=datetime.now(timezone.utc))
+        else:
+            values.update(status="pending", next_attempt_at=retry_at)
+
+        await self.session.execute(
+            update(HealthieSyncOutbox)
+            .where(HealthieSyncOutbox.id == outbox_id)
+            .values(**values)
+        )
+        await self.session.commit()
+
+    async def reschedule(self, outbox_id: UUID, reason: str, retry_at: datetime) -> None:
+        """
+        Put a claimed row back without counting an attempt
+
+        For calls that were never made (circuit open, bulkhead full), so an
+        outage does not use up the row's attempts.
+
+        Args:
+            outbox_id: Outbox row ID
+            reason: Why the call was not made
+            retry_at: When to try again
+        """
+        await self.session.execute(
+            update(HealthieSyncOutbox)
+            .where(HealthieSyncOutbox.id == outbox_id)
+            .values(status="pending", next_attempt_at=retry_at, last_error=reason, locked_until=None)
+        )
+        await self.session.commit()
+
+    async def retry(self, outbox_id: str) -> bool:
+        """
+        Requeue a dead-lettered row for immediate retry
+
+        Args:
+            outbox_id: String UUID of the outbox row
+
+        Returns:
+            True if a dead row was requeued
+        """
+        result = await self.session.execute(
+            update(HealthieSyncOutbox)
+            .where(HealthieSyncOutbox.id == UUID(outbox_id))
+            .where(HealthieSyncOutbox.status == "dead")
+            .values(status="pending", attempts=0, next_attempt_at=func.now(), processed_at=None)
+        )
+        await self.session.commit()
+        return result.rowcount > 0
+
+    async def count_by_status(self) -> Dict[str, int]:
+        """
+        Count outbox rows per status
+
+        Returns:
+            Mapping of status to row count
+        """
+        result = await self.session.execute(
+            select(HealthieSyncOutbox.status, func.count(HealthieSyncOutbox.id))
+            .group_by(HealthieSyncOutbox.status)
+        )
+        return {status: count for status, count in result.all()}
+
+    async def find_dead(self, limit: int = 50) -> List[dict]:
+        """
+        Get most recent dead-lettered rows
+
+        Args:
+            limit: Maximum number of rows to return
+
+        Returns:
+            List of outbox dictionaries, newest first
+        """
+        result = await self.session.execute(
+            select(HealthieSyncOutbox)
+            .where(HealthieSyncOutbox.status == "dead")
+            .order_by(HealthieSyncOutbox.processed_at.desc())
+            .limit(limit)
+        )
+        return [r.to_dict() for r in result.scalars().all()]
@@ -1,3 +1,5 @@
 from .healthie_client import HealthieApiClient
+from .cache import AsyncTTLCache
+from .medication_index import MedicationIndex, OpenFdaMedicationSearch
 
-__all__ = ['HealthieApiClient']
+__all__ = ['HealthieApiClient', 'AsyncTTLCache', 'MedicationIndex', 'OpenFdaMedicationSearch']
@@ -0,0 +1,339 @@
+"""
+Content-addressed blob storage for signatures and other large form values
+
+Blobs are stored under the SHA-256 of their bytes, so identical uploads
+are written once and references never go stale. form_data holds only a
+reference string ("blob:sha256:<hex>") instead of a base64 data URL; the
+bytes are served by GET /api/blobs/{sha256} or inlined on request.
+
+Backends:
+    LocalBlobStore  files under BLOB_STORE_PATH (default)
+    S3BlobStore     any S3-compatible bucket (requires the optional boto3 package)
+
+Backfill existing rows:
+    python -m services.blob_store --backfill
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import re
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, NamedTuple, Optional, Tuple
+
+BLOB_REF_PREFIX = "blob:sha256:"
+
+ALLOWED_CONTENT_TYPES = ("image/png", "image/jpeg", "image/webp", "image/gif", "application/pdf")
+
+_SHA256_HEX = re.compile(r"^[0-9a-f]{64}$")
+_DATA_URL = re.compile(r"^data:([\w.+-]+/[\w.+-]+);base64,", re.ASCII)
+
+
+class BlobInfo(NamedTuple):
+    """Stored blob metadata"""
+    sha256: str
+    size: int
+    content_type: str
+
+    @property
+    def ref(self) -> str:
+        """Reference string stored in form_data"""
+        return f"{BLOB_REF_PREFIX}{self.sha256}"
+
+
+def is_blob_ref(value: Any) -> bool:
+    """True for a "blob:sha256:<hex>" reference"""
+    return isinstance(value, str) and value.startswith(BLOB_REF_PREFIX) and bool(
+        _SHA256_HEX.match(value[len(BLOB_REF_PREFIX):])
+    )
+
+
+def is_valid_sha256(sha256: str) -> bool:
+    """True for a lowercase 64-character hex digest"""
+    return bool(_SHA256_HEX.match(sha256))
+
+
+class BlobStore(ABC):
+    """Storage interface; keys are lowercase hex SHA-256 digests"""
+
+    async def put(self, data: bytes, content_type: str) -> BlobInfo:
+        """
+        Store bytes under their SHA-256 (no-op if already present)
+
+        Args:
+            data: Blob contents
+            content_type: MIME type, e.g. image/png
+
+        Returns:
+            BlobInfo with the digest, size and content type
+        """
+        info = BlobInfo(hashlib.sha256(data).hexdigest(), len(data), content_type)
+        if not await self.exists(info.sha256):
+            await self._write(info, data)
+        return info
+
+    @abstractmethod
+    async def get(self, sha256: str) -> Optional[Tuple[bytes, str]]:
+        """Return (bytes, content_type), or None if the blob does not exist"""
+
+    @abstractmethod
+    async def exists(self, sha256: str) -> bool:
+        """Check whether a blob is stored"""
+
+    @abstractmethod
+    async def _write(self, info: BlobInfo, data: bytes) -> None:
+        """Persist a blob that is not stored yet"""
+
+
+class LocalBlobStore(BlobStore):
+    """
+    Blobs as files: <root>/<ab>/<abcdef...> plus a <digest>.type sidecar
+
+    Writes go to a temp file and are renamed into place, so readers never
+    see partial blobs and concurrent writers of the same blob are harmless.
+    """
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: Directory for blob files (created if missing)
+        """
+        self.root = Path(root)
+
+    def _path(self, sha256: str) -> Path:
+        return self.root / sha256[:2] / sha256
+
+    async def get(self, sha256: str) -> Optional[Tuple[bytes, str]]:
+        def read():
+            path = self._path(sha256)
+            try:
+                data = path.read_bytes()
+            except FileNotFoundError:
+                return None
+            content_type = path.with_suffix(".type").read_text().strip()
+            return data, content_type
+        return await asyncio.to_thread(read)
+
+    async def exists(self, sha256: str) -> bool:
+        return await asyncio.to_thread(self._path(sha256).exists)
+
+    async def _write(self, info: BlobInfo, data: bytes) -> None:
+        def write():
+            path = self._path(info.sha256)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.with_suffix(".type").write_text(info.content_type)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        await asyncio.to_thread(write)
+
+
+class S3BlobStore(BlobStore):
+    """Blobs as objects in an S3-compatible bucket, keyed <prefix><digest>"""
+
+    def __init__(self, bucket: str, prefix: str = "blobs/", endpoint_url: Optional[str] = None,
+                 region: Optional[str] = None):
+        """
+        Args:
+            bucket: Bucket name
+            prefix: Key prefix for blob objects
+            endpoint_url: Custom endpoint for S3-compatible services (MinIO, R2, ...)
+            region: AWS region
+        """
+        try:
+            import boto3
+        except ImportError:
+            raise RuntimeError("BLOB_STORE_BACKEND=s3 requires the boto3 package")
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self._client = boto3.client("s3", endpoint_url=endpoint_url or None, region_name=region or None)
+
+    async def get(self, sha256: str) -> Optional[Tuple[bytes, str]]:
+        def read():
+            try:
+                obj = self._client.get_object(Bucket=self.bucket, Key=self.prefix + sha256)
+            except self._client.exceptions.NoSuchKey:
+                return None
+            return obj["Body"].read(), obj["ContentType"]
+        return await asyncio.to_thread(read)
+
+    async def exists(self, sha256: str) -> bool:
+        def head():
+            try:
+                self._client.head_object(Bucket=self.bucket, Key=self.prefix + sha256)
+                return True
+            except self._client.exceptions.ClientError:
+                return False
+        return await asyncio.to_thread(head)
+
+    async def _write(self, info: BlobInfo, data: bytes) -> None:
+        await asyncio.to_thread(
+            self._client.put_object,
+            Bucket=self.bucket,
+            Key=self.prefix + info.sha256,
+            Body=data,
+            ContentType=info.content_type,
+            CacheControl="private, max-age=31536000, immutable"
+        )
+
+
+def create_blob_store(settings) -> BlobStore:
+    """
+    Create the configured blob store
+
+    Args:
+        settings: config.Settings instance
+    """
+    if settings.blob_store_backend == "s3":
+        return S3BlobStore(
+            bucket=settings.blob_s3_bucket,
+            prefix=settings.blob_s3_prefix,
+            endpoint_url=settings.blob_s3_endpoint_url,
+            region=settings.blob_s3_region
+        )
+    if settings.blob_store_backend == "local":
+        return LocalBlobStore(settings.blob_store_path)
+    raise ValueError(f"Unknown BLOB_STORE_BACKEND: {settings.blob_store_backend}")
+
+
+def _parse_data_url(value: str) -> Optional[Tuple[str, bytes]]:
+    match = _DATA_URL.match(value)
+    if not match or match.group(1) not in ALLOWED_CONTENT_TYPES:
+        return None
+    try:
+        return match.group(1), base64.b64decode(value[match.end():], validate=True)
+    except ValueError:
+        return None
+
+
+def _embedded_json(value: str) -> Optional[Any]:
+    """Parse JSON-encoded strings such as TypedSignature's {"imageDataURL": ...}"""
+    if not (value.startswith("{") and ("data:" in value or BLOB_REF_PREFIX in value)):
+        return None
+    try:
+        return json.loads(value)
+    except ValueError:
+        return None
+
+
+async def offload_data_urls(value: Any, store: BlobStore, min_bytes: int = 0) -> Any:
+    """
+    Replace base64 data URLs in a JSON document with blob references
+
+    Walks dicts, lists and JSON-encoded strings. Only data URLs with an
+    allowed content type and at least min_bytes of encoded text are moved.
+
+    Args:
+        value: form_data or any part of it
+        store: Blob store to write to
+        min_bytes: Leave smaller data URLs inline
+
+    Returns:
+        The document with data URLs replaced (input is not modified)
+    """
+    if isinstance(value, dict):
+        return {key: await offload_data_urls(item, store, min_bytes) for key, item in value.items()}
+    if isinstance(value, list):
+        return [await offload_data_urls(item, store, min_bytes) for item in value]
+    if isinstance(value, str):
+        if value.startswith("data:") and len(value) >= min_bytes:
+            parsed = _parse_data_url(value)
+            if parsed:
+                content_type, data = parsed
+                return (await store.put(data, content_type)).ref
+        embedded = _embedded_json(value)
+        if isinstance(embedded, (dict, list)):
+            return json.dumps(await offload_data_urls(embedded, store, min_bytes), separators=(",", ":"))
+    return value
+
+
+async def hydrate_blob_refs(value: Any, store: BlobStore) -> Any:
+    """
+    Replace blob references with data URLs (inverse of offload_data_urls)
+
+    References to missing blobs are left as they are.
+
+    Args:
+        value: form_data or any part of it
+        store: Blob store to read from
+
+    Returns:
+        The document with references inlined (input is not modified)
+    """
+    if isinstance(value, dict):
+        return {key: await hydrate_blob_refs(item, store) for key, item in value.items()}
+    if isinstance(value, list):
+        return [await hydrate_blob_refs(item, store) for item in value]
+    if is_blob_ref(value):
+        blob = await store.get(value[len(BLOB_REF_PREFIX):])
+        if blob is None:
+            return value
+        data, content_type = blob
+        return f"data:{content_type};base64,{base64.b64encode(data).decode('ascii')}"
+    if isinstance(value, str):
+        embedded = _embedded_json(value)
+        if isinstance(embedded, (dict, list)):
+            return json.dumps(await hydrate_blob_refs(embedded, store), separators=(",", ":"))
+    return value
+
+
+async def backfill(batch_size: int = 100) -> int:
+    """
+    Move data URLs already stored in intakes.form_data into the blob store
+
+    Returns:
+        Number of rows rewritten
+    """
+    from sqlalchemy import select, update, cast, String
+    from config import settings
+    from database import async_session_maker, close_db
+    from models.database import IntakeRecord
+
+    store = create_blob_store(settings)
+    rewritten = 0
+    after = None
+    try:
+        while True:
+            async with async_session_maker() as session:
+                query = (
+                    select(IntakeRecord.id, IntakeRecord.form_data)
+                    .where(cast(IntakeRecord.form_data, String).contains("data:"))
+                    .order_by(IntakeRecord.id)
+                    .limit(batch_size)
+                )
+                if after is not None:
+                    query = query.where(IntakeRecord.id > after)
+                rows = (await session.execute(query)).all()
+                if not rows:
+                    return rewritten
+
+                for intake_id, form_data in rows:
+                    offloaded = await offload_data_urls(form_data, store, settings.blob_offload_min_bytes)
+                    if offloaded != form_data:
+                        # last_updated_at is left alone so open drafts don't see a version conflict
+                        await session.execute(
+                            update(IntakeRecord).where(IntakeRecord.id == intake_id).values(form_data=offloaded)
+                        )
+                        rewritten += 1
+                await session.commit()
+                after = rows[-1][0]
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Blob store maintenance")
+    parser.add_argument("--backfill", action="store_true", help="Offload data URLs from existing intakes")
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    if args.backfill:
+        print(f"Rewrote {asyncio.run(backfill(args.batch_size))} intake(s)")
+    else:
+        parser.print_help()
@@ -0,0 +1,170 @@
+"""
+In-process async cache with TTL, stale-while-revalidate and request coalescing
+
+Used to avoid repeated Healthie calls for data that rarely changes.
+Concurrent misses for the same key share a single upstream call.
+Empty results (e.g. a search with no matches) can be kept for a shorter
+negative TTL.
+
+Loads run outside the request that triggered them (no request deadline),
+since other requests share them; each caller's deadline bounds only its
+own wait.
+"""
+import asyncio
+import contextvars
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from services.resilience import DeadlineExceededError, remaining_time
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTTLCache:
+    """
+    TTL cache for async loaders
+
+    - Fresh entries (age < ttl) are returned directly.
+    - Stale entries (ttl <= age < ttl + stale_ttl) are returned immediately
+      while a single background task refreshes them.
+    - Missing or expired entries are loaded once; concurrent callers for
+      the same key await the same load.
+    - Empty values ([], {}, "") expire after negative_ttl and are never
+      served stale.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float = 0.0, max_entries: Optional[int] = None,
+                 negative_ttl: Optional[float] = None):
+        """
+        Args:
+            ttl: Seconds an entry is served without refreshing
+            stale_ttl: Extra seconds an expired entry may be served while refreshing
+            max_entries: Evict least recently used entries beyond this size
+            negative_ttl: Seconds an empty value is served; defaults to ttl
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        # key -> (stored_at, value, ttl, stale_ttl)
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, float, float]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._generation = 0  # Bumped by invalidate() so in-flight loads don't store old data
+        self.hits = 0
+        self.negative_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.loads = 0
+        self.load_errors = 0
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value for key, loading it if needed
+
+        Args:
+            key: Cache key
+            loader: Coroutine factory producing the value; None results are not cached
+
+        Returns:
+            Cached or freshly loaded value
+
+        Raises:
+            DeadlineExceededError: The caller's deadline ran out while waiting for the load
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored_at, value, ttl, stale_ttl = entry
+            age = time.monotonic() - stored_at
+            if age < ttl:
+                self.hits += 1
+                if not value:
+                    self.negative_hits += 1
+                self._entries.move_to_end(key)
+                return value
+            if age < ttl + stale_ttl:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                self._start_load(key, loader)
+                return value
+
+        self.misses += 1
+        if key in self._inflight:
+            self.coalesced += 1
+        task = self._start_load(key, loader)
+        # wait() never cancels the shared load, whether this caller times out or is cancelled
+        remaining = remaining_time()
+        done, _ = await asyncio.wait({task}, timeout=None if remaining is None else max(0.0, remaining))
+        if not done:
+            raise DeadlineExceededError(f"Request deadline exceeded waiting for cache load of {key!r}")
+        return task.result()
+
+    def invalidate(self, key: Optional[Hashable] = None) -> int:
+        """
+        Drop one entry, or every entry when key is None
+
+        Returns:
+            Number of entries removed
+        """
+        self._generation += 1
+        if key is None:
+            removed = len(self._entries)
+            self._entries.clear()
+            self._inflight.clear()
+            return removed
+        self._inflight.pop(key, None)
+        return 1 if self._entries.pop(key, None) is not None else 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring"""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else None,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "loads": self.loads,
+            "load_errors": self.load_errors,
+        }
+
+    def _start_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Return the in-flight load for key, starting one if needed"""
+        task = self._inflight.get(key)
+        if task is None:
+            # Capture the generation now: invalidate() may run before the task starts.
+            # A fresh context keeps the starting request's deadline off the shared load
+            task = asyncio.create_task(self._load(key, loader, self._generation), context=contextvars.Context())
+            # Background refreshes may have no awaiter; mark errors as retrieved
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[key] = task
+        return task
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], generation: int) -> Any:
+        self.loads += 1
+        try:
+            value = await loader()
+            if value is not None and generation == self._generation:
+                self._store(key, value)
+            return value
+        except Exception:
+            self.load_errors += 1
+            logger.warning(f"Cache load failed for key {key!r}", exc_info=True)
+            raise
+        finally:
+            if self._inflight.get(key) is asyncio.current_task():
+                del self._inflight[key]
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        if value:
+            self._entries[key] = (time.monotonic(), value, self.ttl, self.stale_ttl)
+        else:
+            self._entries[key] = (time.monotonic(), value, self.negative_ttl, 0.0)
+        self._entries.move_to_end(key)
+        if self.max_entries is not None:
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,336 @@
+"""
+Write-behind buffer for draft autosaves
+
+Autosaves arrive every few seconds per patient but only the latest copy
+matters. With DRAFT_BUFFER_ENABLED the API keeps each patient's latest
+draft in memory, acknowledges the save at once with its version
+(last_updated_at, the token PATCH already uses), and writes dirty drafts
+to PostgreSQL:
+
+    - every DRAFT_BUFFER_FLUSH_INTERVAL_SECONDS, all dirty drafts in one
+      multi-row upsert (IntakeRepository.save_drafts)
+    - immediately when a save moves the draft to another step
+    - when DRAFT_BUFFER_MAX_DIRTY drafts are waiting
+    - before get_draft reads it (read-your-writes) and before submit or
+      a JSON Patch takes the draft over
+    - on shutdown (close() drains, with retries)
+
+The buffer is per process: read-your-writes holds for requests served by
+the same worker, so route a patient's requests to one worker (sticky
+sessions) or leave the buffer off when running several. A flush never
+replaces a newer stored draft with an older copy, whichever worker sends it.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from models.intake import DraftPatch, IntakeSubmission
+from repositories import IntakeRepository
+from repositories.jsonb_patch import apply_merge_patch
+
+logger = logging.getLogger(__name__)
+
+# Rows per upsert statement; keeps bind parameters well under asyncpg's 32767 limit
+FLUSH_CHUNK_SIZE = 500
+
+_PATCH_FIELDS = ('current_step', 'first_name', 'last_name', 'email', 'date_of_birth', 'phone')
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Naive timestamps are UTC (datetime.utcnow()); make them comparable with aware ones"""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+class _Entry:
+    """Latest draft of one patient"""
+    __slots__ = ("intake", "draft_id", "dirty", "touched_at")
+
+    def __init__(self, intake: IntakeSubmission, draft_id: Optional[str] = None, dirty: bool = True):
+        self.intake = intake
+        self.draft_id = draft_id
+        self.dirty = dirty
+        self.touched_at = time.monotonic()
+
+
+class DraftWriteBuffer:
+    """
+    In-memory latest-draft store with periodic batched flushes
+
+    Every change replaces the entry's intake object instead of mutating it,
+    so a flush can tell whether the copy it wrote is still the latest one.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker,
+        flush_interval: float = 2.0,
+        max_dirty: int = 2000,
+        idle_seconds: float = 300.0,
+        drain_attempts: int = 3,
+    ):
+        """
+        Args:
+            session_maker: Factory for database sessions
+            flush_interval: Seconds between background flushes
+            max_dirty: Flush right away once this many drafts are waiting
+            idle_seconds: Drop flushed drafts not touched for this long
+            drain_attempts: Flush attempts on shutdown before giving up
+        """
+        self.session_maker = session_maker
+        self.flush_interval = flush_interval
+        self.max_dirty = max_dirty
+        self.idle_seconds = idle_seconds
+        self.drain_attempts = drain_attempts
+        self._entries: Dict[str, _Entry] = {}
+        self._flush_lock = asyncio.Lock()
+        self._stopping = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.saves = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.flush_errors = 0
+
+    # ------------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the background flush loop (call from the app's startup)"""
+        if self._task is None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """
+        Stop the flush loop and write every dirty draft
+
+        Retries failed flushes with a short backoff; drafts still unwritten
+        after drain_attempts are logged by patient ID.
+        """
+        self._stopping.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+        for attempt in range(self.drain_attempts):
+            if not self._dirty_ids():
+                break
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Draft buffer drain attempt {attempt + 1} failed: {str(e)}")
+                await asyncio.sleep(0.5 * 2 ** attempt)
+
+        lost = self._dirty_ids()
+        if lost:
+            logger.error(f"Draft buffer closed with {len(lost)} unwritten draft(s): {', '.join(lost)}")
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as e:
+                # Entries stay dirty and are retried on the next tick
+                logger.error(f"Draft buffer flush failed: {str(e)}")
+            self._evict_idle()
+
+    # ------------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------------
+
+    async def save(self, intake: IntakeSubmission) -> Optional[str]:
+        """
+        Buffer a full draft save
+
+        Sets intake.last_updated_at to the new version, like
+        IntakeRepository.save_draft.
+
+        Args:
+            intake: Draft to store (status='draft')
+
+        Returns:
+            Draft ID if the patient's draft was already written, else None
+        """
+        intake.last_updated_at = datetime.utcnow()
+        entry = await self._replace(intake.patient_healthie_id, intake)
+        return entry.draft_id
+
+    async def patch(self, healthie_id: str, patch: DraftPatch) -> Optional[dict]:
+        """
+        Apply a merge patch to the patient's buffered draft
+
+        The draft is loaded into the buffer on first use. As with
+        IntakeRepository.patch_draft, the patch only applies if the draft's
+        last_updated_at still equals patch.last_updated_at.
+
+        Args:
+            healthie_id: Healthie patient ID
+            patch: DraftPatch with merge_patch (or no form_data change)
+
+        Returns:
+            {'id', 'last_updated_at'} of the new version, or None if there is
+            no draft or the version does not match (see current_version)
+        """
+        if patch.json_patch:
+            raise ValueError("The draft buffer only applies merge patches")
+
+        entry = self._entries.get(healthie_id)
+        if entry is None:
+            entry = await self._load(healthie_id)
+            if entry is None:
+                return None
+
+        current = entry.intake
+        if _as_utc(current.last_updated_at) != _as_utc(patch.last_updated_at):
+            return None
+
+        updates = {field: getattr(patch, field) for field in _PATCH_FIELDS if getattr(patch, field) is not None}
+        updates["last_updated_at"] = datetime.utcnow()
+        if patch.merge_patch:
+            updates["form_data"] = apply_merge_patch(current.form_data, patch.merge_patch)
+        intake = current.model_copy(update=updates)
+
+        entry = await self._replace(healthie_id, intake)
+        return {"id": entry.draft_id, "last_updated_at": intake.last_updated_at.isoformat()}
+
+    def current_version(self, healthie_id: str) -> Optional[str]:
+        """Buffered draft's last_updated_at (for 409 responses), or None if not buffered"""
+        entry = self._entries.get(healthie_id)
+        return entry.intake.last_updated_at.isoformat() if entry else None
+
+    async def _replace(self, healthie_id: str, intake: IntakeSubmission) -> _Entry:
+        """Store a new latest copy, then flush if the step changed or too many drafts wait"""
+        previous = self._entries.get(healthie_id)
+        entry = _Entry(intake, previous.draft_id if previous else None)
+        self._entries[healthie_id] = entry
+        self.saves += 1
+
+        try:
+            if previous is not None and previous.intake.current_step != intake.current_step:
+                await self.flush([healthie_id])
+            elif len(self._dirty_ids()) >= self.max_dirty:
+                await self.flush()
+        except Exception as e:
+            # Already acknowledged from memory; the background loop retries
+            logger.error(f"Draft buffer flush for {healthie_id} failed: {str(e)}")
+        return entry
+
+    async def _load(self, healthie_id: str) -> Optional[_Entry]:
+        """Read the stored draft into the buffer"""
+        async with self.session_maker() as session:
+            draft = await IntakeRepository(session).get_draft_by_healthie_id(healthie_id)
+        if draft is None:
+            return None
+        # A concurrent request may have buffered the draft while this one was reading
+        existing = self._entries.get(healthie_id)
+        if existing is not None:
+            return existing
+
+        intake = IntakeSubmission(**{
+            field: draft[field] for field in IntakeSubmission.model_fields
+            if field in draft and field != "submitted_at"
+        })
+        entry = _Entry(intake, draft["id"], dirty=False)
+        self._entries[healthie_id] = entry
+        return entry
+
+    # ------------------------------------------------------------------------
+    # Flushing
+    # ------------------------------------------------------------------------
+
+    async def flush(self, patient_ids: Optional[Iterable[str]] = None) -> int:
+        """
+        Write dirty drafts to PostgreSQL
+
+        Args:
+            patient_ids: Only these patients (default: all dirty drafts)
+
+        Returns:
+            Number of drafts written
+        """
+        async with self._flush_lock:
+            return await self._write(patient_ids)
+
+    async def flush_patient(self, healthie_id: str) -> None:
+        """
+        Make the patient's latest save visible in PostgreSQL
+
+        Also waits for an in-flight flush, which may be writing this draft.
+        """
+        entry = self._entries.get(healthie_id)
+        if (entry is not None and entry.dirty) or self._flush_lock.locked():
+            await self.flush([healthie_id])
+
+    async def release(self, healthie_id: str) -> None:
+        """Write the patient's draft and stop buffering it (before submit or a SQL-side patch)"""
+        async with self._flush_lock:
+            while healthie_id in self._dirty_ids():
+                await self._write([healthie_id])
+            self._entries.pop(healthie_id, None)
+
+    async def discard(self, healthie_id: str) -> None:
+        """Drop the patient's draft without writing it (before deleting the stored draft)"""
+        async with self._flush_lock:
+            self._entries.pop(healthie_id, None)
+
+    async def _write(self, patient_ids: Optional[Iterable[str]]) -> int:
+        """Upsert dirty entries in chunks; caller holds _flush_lock"""
+        if patient_ids is None:
+            candidates = list(self._entries.items())
+        else:
+            candidates = [(pid, self._entries[pid]) for pid in patient_ids if pid in self._entries]
+        batch = [(pid, entry.intake) for pid, entry in candidates if entry.dirty]
+
+        written = 0
+        for start in range(0, len(batch), FLUSH_CHUNK_SIZE):
+            chunk = batch[start:start + FLUSH_CHUNK_SIZE]
+            try:
+                async with self.session_maker() as session:
+                    draft_ids = await IntakeRepository(session).save_drafts([intake for _, intake in chunk])
+            except Exception:
+                self.flush_errors += 1
+                raise
+            self.flushes += 1
+            written += len(chunk)
+
+            for pid, intake in chunk:
+                entry = self._entries.get(pid)
+                if entry is None:
+                    continue
+                if pid in draft_ids:
+                    entry.draft_id = draft_ids[pid]
+                # A save that arrived during the write keeps the entry dirty
+                if entry.intake is intake:
+                    entry.dirty = False
+
+        self.rows_written += written
+        return written
+
+    def _dirty_ids(self) -> List[str]:
+        return [pid for pid, entry in self._entries.items() if entry.dirty]
+
+    def _evict_idle(self) -> None:
+        """Forget written drafts nobody touched for idle_seconds"""
+        cutoff = time.monotonic() - self.idle_seconds
+        idle = [pid for pid, entry in self._entries.items() if not entry.dirty and entry.touched_at < cutoff]
+        for pid in idle:
+            del self._entries[pid]
+
+    def stats(self) -> dict:
+        """Counters for /health"""
+        return {
+            "buffered": len(self._entries),
+            "dirty": len(self._dirty_ids()),
+            "saves": self.saves,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "flush_errors": self.flush_errors,
+        }
@@ -0,0 +1,450 @@
+"""
+Multi-device draft sync over PostgreSQL LISTEN/NOTIFY
+
+Every draft change (save, patch, delete, submit) is published with
+pg_notify on one channel. Each API worker holds a single dedicated
+connection that LISTENs on it and forwards events to the WebSocket
+subscribers of that patient it serves, so a change made through any
+worker or node reaches every open device without polling.
+
+Event (JSON, also the WebSocket message):
+    {"type": "patched" | "saved" | "deleted" | "submitted" | "resync",
+     "patient_healthie_id": "...", "last_updated_at": "<new version>",
+     "base": "<version the patch applies to>", "patch": {...}, "origin": "<client id>"}
+
+Conflicts are resolved with last_updated_at, as for PATCH: a device
+applies a "patched" event's merge patch only if its own version equals
+"base"; otherwise (or when "patch" is null) it re-reads the draft if
+last_updated_at is newer than its own. Events are not sent back to the
+device that made the change (matched on X-Draft-Client-Id).
+
+NOTIFY payloads are limited to 8000 bytes, so larger patches go out
+without "patch" and devices re-read the draft. When the listener
+reconnects, subscribers get a "resync" event, since notifications sent
+in the meantime are lost.
+
+Publishing never blocks the request: events go into a bounded queue that
+a background task sends in batches. A change is only published if some
+worker has a subscriber for that patient. Workers announce the patients
+they serve on the same channel ("interest" messages: on the first
+subscriber, on the last unsubscribe, and in full every keepalive, since
+entries from other workers expire after three keepalives), and a worker
+that (re)connects asks the others to announce theirs ("hello").
+"""
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Union
+
+import asyncpg
+import orjson
+from sqlalchemy.engine import make_url
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "intake_draft_changes"
+
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more
+MAX_PAYLOAD_BYTES = 7900
+
+_RESYNC = orjson.dumps({"type": "resync"}).decode()
+
+# Control messages between workers; never forwarded to devices
+_INTEREST = "interest"
+_HELLO = "hello"
+
+# Events sent per pg_notify batch
+PUBLISH_BATCH_SIZE = 100
+
+
+def listen_dsn(database_url: str) -> str:
+    """asyncpg DSN for a SQLAlchemy URL (postgresql+asyncpg://... -> postgresql://...)"""
+    return make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+def version_key(value: Union[datetime, str, None]) -> Optional[str]:
+    """
+    Canonical draft version string: UTC, no offset, microseconds
+
+    Responses carry last_updated_at with or without "+00:00"; events use
+    this one form so devices can compare versions as plain strings.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat(timespec="microseconds")
+
+
+def draft_event(
+    event_type: str,
+    healthie_id: str,
+    last_updated_at: Union[datetime, str, None] = None,
+    origin: Optional[str] = None,
+    base: Union[datetime, str, None] = None,
+    patch: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Build a draft change event
+
+    Args:
+        event_type: "patched", "saved", "deleted" or "submitted"
+        healthie_id: Healthie patient ID
+        last_updated_at: Draft version after the change
+        origin: X-Draft-Client-Id of the device that made the change
+        base: Version a "patched" event's patch was applied to
+        patch: DraftPatch fields (merge_patch, current_step, ...) for "patched"
+    """
+    return {
+        "type": event_type,
+        "patient_healthie_id": healthie_id,
+        "last_updated_at": version_key(last_updated_at),
+        "base": version_key(base),
+        "patch": patch,
+        "origin": origin,
+    }
+
+
+class DraftSubscription:
+    """One WebSocket's queue of encoded events"""
+
+    def __init__(self, healthie_id: str, client_id: Optional[str], queue_size: int):
+        self.healthie_id = healthie_id
+        self.client_id = client_id
+        self.queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue(maxsize=queue_size)
+
+    def put(self, message: str) -> None:
+        """Queue a message; a subscriber that fell behind gets a single resync instead"""
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(_RESYNC)
+
+    def close(self) -> None:
+        """Wake the sender with the end-of-stream marker"""
+        while True:
+            try:
+                self.queue.put_nowait(None)
+                return
+            except asyncio.QueueFull:
+                self.queue.get_nowait()
+
+    async def get(self) -> Optional[str]:
+        """Next message, or None once the subscription is closed"""
+        return await self.queue.get()
+
+
+class DraftSyncHub:
+    """Per-worker LISTEN connection and local subscriber registry"""
+
+    def __init__(self, dsn: str, channel: str = CHANNEL, queue_size: int = 64,
+                 keepalive_seconds: float = 30.0, reconnect_max_seconds: float = 30.0,
+                 publish_queue_size: int = 1000):
+        """
+        Args:
+            dsn: asyncpg DSN of a direct PostgreSQL connection (not PgBouncer
+                transaction pooling, which does not support LISTEN)
+            channel: NOTIFY channel
+            queue_size: Events buffered per subscriber before it is told to resync
+            keepalive_seconds: Idle time after which the listener connection is pinged
+            reconnect_max_seconds: Upper bound for the reconnect backoff
+            publish_queue_size: Events waiting to be sent before new ones are dropped
+        """
+        self.dsn = dsn
+        self.channel = channel
+        self.queue_size = queue_size
+        self.keepalive_seconds = keepalive_seconds
+        self.reconnect_max_seconds = reconnect_max_seconds
+        self.worker_id = uuid.uuid4().hex
+        self._subscribers: Dict[str, Set[DraftSubscription]] = {}
+        # Patients other workers have subscribers for: {healthie_id: {worker_id: expires_at}}
+        self._remote_interest: Dict[str, Dict[str, float]] = {}
+        # Local patients whose interest announcement has not come back yet
+        self._announcing: Dict[str, asyncio.Event] = {}
+        self._outbox: "asyncio.Queue[str]" = asyncio.Queue(maxsize=publish_queue_size)
+        self._conn: Optional[asyncpg.Connection] = None
+        self._lock = asyncio.Lock()  # One query at a time on the shared connection
+        self._connected = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._publisher: Optional[asyncio.Task] = None
+        self.published = 0
+        self.publish_errors = 0
+        self.publish_dropped = 0
+        self.publish_skipped = 0
+        self.delivered = 0
+        self.reconnects = 0
+
+    # ------------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------------
+
+    async def start(self, timeout: float = 5.0) -> None:
+        """Start listening; waits up to timeout for the first connection"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            self._publisher = asyncio.create_task(self._publish_loop())
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Draft sync listener not connected yet; retrying in the background")
+
+    async def close(self) -> None:
+        """Stop listening and end every subscription"""
+        for task in (self._publisher, self._task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = self._publisher = None
+        for subscriptions in self._subscribers.values():
+            for subscription in subscriptions:
+                subscription.close()
+        self._subscribers.clear()
+
+    async def _run(self) -> None:
+        delay = 1.0
+        connected_before = False
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(self.dsn)
+                lost = asyncio.Event()
+                conn.add_termination_listener(lambda _: lost.set())
+                await conn.add_listener(self.channel, self._on_notify)
+                self._conn = conn
+                self._connected.set()
+                # Learn which patients the other workers serve, and tell them ours
+                self._send_control({"type": _HELLO})
+                self._announce_all()
+                if connected_before:
+                    # Notifications sent while disconnected are gone
+                    self.reconnects += 1
+                    self._broadcast(_RESYNC)
+                connected_before = True
+                delay = 1.0
+                logger.info(f"Draft sync listening on {self.channel}")
+
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), self.keepalive_seconds)
+                    except asyncio.TimeoutError:
+                        async with self._lock:
+                            await conn.execute("SELECT 1")
+                        self._expire_interest()
+                        self._announce_all()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Draft sync listener connection failed: {str(e)}")
+            finally:
+                self._conn = None
+                self._connected.clear()
+                if conn is not None and not conn.is_closed():
+                    conn.terminate()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.reconnect_max_seconds)
+
+    # ------------------------------------------------------------------------
+    # Publishing
+    # ------------------------------------------------------------------------
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """
+        Queue a draft change for every worker
+
+        Returns at once; the background publisher sends it. Events for
+        patients nobody subscribes to are skipped, and events that do not
+        fit in the queue are dropped. Neither is raised: the change itself
+        is already stored, and devices catch up on their next read or resync.
+        """
+        if not self.interested(event["patient_healthie_id"]):
+            self.publish_skipped += 1
+            return
+        payload = orjson.dumps(event)
+        if len(payload) > MAX_PAYLOAD_BYTES:
+            payload = orjson.dumps({**event, "patch": None})
+        self._enqueue(payload.decode())
+
+    def interested(self, healthie_id: str) -> bool:
+        """Whether any worker has a subscriber for the patient"""
+        if healthie_id in self._subscribers:
+            return True
+        now = time.monotonic()
+        return any(expires_at > now for expires_at in self._remote_interest.get(healthie_id, {}).values())
+
+    def _enqueue(self, payload: str) -> None:
+        try:
+            self._outbox.put_nowait(payload)
+        except asyncio.QueueFull:
+            self.publish_dropped += 1
+            logger.warning("Draft sync publish queue full; event dropped")
+
+    async def _publish_loop(self) -> None:
+        """Send queued payloads in batches, one round trip per batch"""
+        while True:
+            batch = [await self._outbox.get()]
+            while len(batch) < PUBLISH_BATCH_SIZE and not self._outbox.empty():
+                batch.append(self._outbox.get_nowait())
+
+            conn = self._conn
+            if conn is None:
+                # Control messages are sent again on reconnect
+                self.publish_errors += len(batch)
+                logger.warning(f"Draft sync not connected; {len(batch)} message(s) dropped")
+                continue
+            try:
+                async with self._lock:
+                    await conn.executemany("SELECT pg_notify($1, $2)", [(self.channel, p) for p in batch])
+                self.published += len(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.publish_errors += len(batch)
+                logger.warning(f"Draft sync publish failed: {str(e)}")
+
+    # ------------------------------------------------------------------------
+    # Interest announcements
+    # ------------------------------------------------------------------------
+
+    def _send_control(self, message: Dict[str, Any]) -> None:
+        self._enqueue(orjson.dumps({**message, "worker": self.worker_id}).decode())
+
+    def _announce(self, key: str, healthie_ids: Iterable[str]) -> None:
+        """Send interest messages listing healthie_ids, split to fit NOTIFY payloads"""
+        ttl = 3 * self.keepalive_seconds
+        chunk: List[str] = []
+        size = 0
+        for healthie_id in healthie_ids:
+            if chunk and size + len(healthie_id) + 3 > MAX_PAYLOAD_BYTES - 200:
+                self._send_control({"type": _INTEREST, key: chunk, "ttl": ttl})
+                chunk, size = [], 0
+            chunk.append(healthie_id)
+            size += len(healthie_id) + 3
+        if chunk:
+            self._send_control({"type": _INTEREST, key: chunk, "ttl": ttl})
+
+    def _announce_all(self) -> None:
+        self._announce("add", list(self._subscribers))
+
+    def _expire_interest(self) -> None:
+        now = time.monotonic()
+        for healthie_id in list(self._remote_interest):
+            workers = self._remote_interest[healthie_id]
+            for worker, expires_at in list(workers.items()):
+                if expires_at <= now:
+                    del workers[worker]
+            if not workers:
+                del self._remote_interest[healthie_id]
+
+    def _on_control(self, message: Dict[str, Any]) -> None:
+        worker = message.get("worker")
+        if worker == self.worker_id:
+            # Our own announcement is now visible to every connected worker
+            for healthie_id in message.get("add") or ():
+                announced = self._announcing.pop(healthie_id, None)
+                if announced is not None:
+                    announced.set()
+            return
+        if message["type"] == _HELLO:
+            self._announce_all()
+            return
+        expires_at = time.monotonic() + float(message.get("ttl") or 3 * self.keepalive_seconds)
+        for healthie_id in message.get("add") or ():
+            self._remote_interest.setdefault(healthie_id, {})[worker] = expires_at
+        for healthie_id in message.get("remove") or ():
+            workers = self._remote_interest.get(healthie_id)
+            if workers is not None:
+                workers.pop(worker, None)
+                if not workers:
+                    del self._remote_interest[healthie_id]
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            event = orjson.loads(payload)
+        except orjson.JSONDecodeError:
+            logger.warning(f"Ignoring malformed draft sync payload on {channel}")
+            return
+        if event.get("type") in (_INTEREST, _HELLO):
+            self._on_control(event)
+            return
+        origin = event.get("origin")
+        for subscription in self._subscribers.get(event.get("patient_healthie_id"), ()):
+            if origin is not None and subscription.client_id == origin:
+                continue
+            subscription.put(payload)
+            self.delivered += 1
+
+    def _broadcast(self, message: str) -> None:
+        for subscriptions in self._subscribers.values():
+            for subscription in subscriptions:
+                subscription.put(message)
+
+    # ------------------------------------------------------------------------
+    # Subscribers
+    # ------------------------------------------------------------------------
+
+    def subscribe(self, healthie_id: str, client_id: Optional[str] = None) -> DraftSubscription:
+        """
+        Register a WebSocket for a patient's draft events
+
+        The first subscriber for a patient announces it to the other
+        workers; await announced() before reading the draft's version.
+        """
+        subscription = DraftSubscription(healthie_id, client_id, self.queue_size)
+        subscriptions = self._subscribers.setdefault(healthie_id, set())
+        if not subscriptions:
+            self._announcing[healthie_id] = asyncio.Event()
+            self._announce("add", [healthie_id])
+        subscriptions.add(subscription)
+        return subscription
+
+    async def announced(self, subscription: DraftSubscription, timeout: float = 2.0) -> None:
+        """
+        Wait until the other workers know about the subscription
+
+        Changes they publish from then on reach it. Gives up after timeout
+        (e.g. while disconnected); the periodic announcement catches up.
+        """
+        announcing = self._announcing.get(subscription.healthie_id)
+        if announcing is None:
+            return
+        try:
+            await asyncio.wait_for(announcing.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Draft sync interest for {subscription.healthie_id} not confirmed within {timeout}s")
+
+    def unsubscribe(self, subscription: DraftSubscription) -> None:
+        subscriptions = self._subscribers.get(subscription.healthie_id)
+        if subscriptions is not None and subscription in subscriptions:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscribers[subscription.healthie_id]
+                announcing = self._announcing.pop(subscription.healthie_id, None)
+                if announcing is not None:
+                    announcing.set()
+                self._announce("remove", [subscription.healthie_id])
+        subscription.close()
+
+    def stats(self) -> dict:
+        """Counters for /health"""
+        return {
+            "connected": self._conn is not None,
+            "patients": len(self._subscribers),
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+            "remote_patients": len(self._remote_interest),
+            "queued": self._outbox.qsize(),
+            "published": self.published,
+            "publish_errors": self.publish_errors,
+            "publish_dropped": self.publish_dropped,
+            "publish_skipped": self.publish_skipped,
+            "delivered": self.delivered,
+            "reconnects": self.reconnects,
+        }
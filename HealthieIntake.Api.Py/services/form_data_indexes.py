@@ -0,0 +1,52 @@
+"""
+Create the form_data indexes without blocking writes
+
+Runs CREATE INDEX CONCURRENTLY for the GIN containment index and one
+expression index per FORM_DATA_INDEXED_PATHS entry (see
+repositories/form_data_query.py), then ANALYZE. Existing indexes are
+skipped, so adding a path and re-running only builds the new one.
+
+CLI usage:
+    python -m services.form_data_indexes            # create missing indexes
+    python -m services.form_data_indexes --print    # only print the DDL
+"""
+import argparse
+import asyncio
+from typing import List
+
+from sqlalchemy import text
+
+from repositories.form_data_query import expression_index_ddl, gin_index_ddl, indexed_paths
+
+
+def index_statements() -> List[str]:
+    """DDL for the GIN index and every configured path"""
+    return [gin_index_ddl()] + [expression_index_ddl(tokens) for tokens in sorted(indexed_paths())]
+
+
+async def create_indexes() -> None:
+    """Run index_statements() outside a transaction, then refresh planner statistics"""
+    from database import engine, close_db
+
+    try:
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            for statement in index_statements():
+                print(statement)
+                await conn.execute(text(statement))
+            await conn.execute(text("ANALYZE intakes"))
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create form_data indexes")
+    parser.add_argument("--print", dest="print_only", action="store_true", help="Print the DDL without running it")
+    args = parser.parse_args()
+
+    if args.print_only:
+        for statement in index_statements():
+            print(f"{statement};")
+    else:
+        asyncio.run(create_indexes())
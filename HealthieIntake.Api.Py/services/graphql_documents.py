@@ -0,0 +1,156 @@
+"""
+Pre-parsed GraphQL documents and persisted-query transport
+
+Documents are parsed and printed once, when they are registered at import
+time, instead of on every call. Each one also gets the SHA-256 of its
+printed query, for Automatic Persisted Queries (APQ): the request carries
+only the hash, and the full query is sent only when the server does not
+know the hash yet. This cuts per-call CPU (no parse or print) and request
+size.
+
+APQ protocol (Apollo):
+    {"extensions": {"persistedQuery": {"version": 1, "sha256Hash": "<hex>"}}, "variables": {...}}
+    -> error PersistedQueryNotFound: resend with "query" to register it
+    -> error PersistedQueryNotSupported: server has no APQ; send full queries from then on
+"""
+import hashlib
+import logging
+from typing import Any, Dict, NamedTuple, Optional
+
+import httpx
+from gql import gql
+from gql.transport.exceptions import TransportClosed
+from gql.transport.httpx import HTTPXAsyncTransport
+from graphql import DocumentNode, ExecutionResult, print_ast
+
+logger = logging.getLogger(__name__)
+
+PERSISTED_QUERY_NOT_FOUND = "PersistedQueryNotFound"
+PERSISTED_QUERY_NOT_SUPPORTED = "PersistedQueryNotSupported"
+
+
+class PersistedDocument(NamedTuple):
+    """A registered document: its AST, the exact query text sent upstream and that text's hash"""
+    name: str
+    document: DocumentNode
+    query: str
+    sha256: str
+
+
+_documents: Dict[str, PersistedDocument] = {}
+_by_node: Dict[int, PersistedDocument] = {}
+
+
+def register(name: str, source: str) -> DocumentNode:
+    """
+    Parse a GraphQL document once and add it to the registry
+
+    Args:
+        name: Unique registry name, e.g. "get_patient"
+        source: GraphQL source text
+
+    Returns:
+        The parsed document, to pass to Client/session execute()
+    """
+    if name in _documents:
+        return _documents[name].document
+
+    document = gql(source)
+    query = print_ast(document)
+    persisted = PersistedDocument(name, document, query, hashlib.sha256(query.encode("utf-8")).hexdigest())
+    _documents[name] = persisted
+    # Registered documents live for the process, so their id() is a stable key
+    _by_node[id(document)] = persisted
+    return document
+
+
+def lookup(document: DocumentNode) -> Optional[PersistedDocument]:
+    """Registry entry for a document returned by register(), or None"""
+    return _by_node.get(id(document))
+
+
+def registered_documents() -> Dict[str, PersistedDocument]:
+    """All registered documents by name"""
+    return dict(_documents)
+
+
+def _apq_error(response: httpx.Response) -> Optional[str]:
+    """PersistedQueryNotFound / PersistedQueryNotSupported from an APQ response, if present"""
+    # Cheap byte scan first so successful responses are not parsed twice
+    if b"PersistedQuery" not in response.content and b"PERSISTED_QUERY" not in response.content:
+        return None
+    try:
+        errors = response.json().get("errors") or []
+    except ValueError:
+        return None
+    for error in errors:
+        message = error.get("message", "")
+        code = (error.get("extensions") or {}).get("code", "")
+        if PERSISTED_QUERY_NOT_FOUND in message or code == "PERSISTED_QUERY_NOT_FOUND":
+            return PERSISTED_QUERY_NOT_FOUND
+        if PERSISTED_QUERY_NOT_SUPPORTED in message or code == "PERSISTED_QUERY_NOT_SUPPORTED":
+            return PERSISTED_QUERY_NOT_SUPPORTED
+    return None
+
+
+class PersistedQueryTransport(HTTPXAsyncTransport):
+    """
+    HTTPXAsyncTransport that sends registered documents' pre-printed text,
+    or only their hash when persisted queries are enabled
+
+    Unregistered documents go through the normal gql path.
+    """
+
+    def __init__(self, *args, persisted_queries: bool = False, **kwargs):
+        """
+        Args:
+            persisted_queries: Send hash-only APQ requests (falls back to full
+                queries if the server reports it does not support them)
+            args, kwargs: HTTPXAsyncTransport arguments
+        """
+        super().__init__(*args, **kwargs)
+        self.persisted_queries = persisted_queries
+        self.persisted_stats = {"hash_only": 0, "registered": 0, "full": 0}
+
+    async def execute(
+        self,
+        document: DocumentNode,
+        variable_values: Optional[Dict[str, Any]] = None,
+        operation_name: Optional[str] = None,
+        extra_args: Optional[Dict[str, Any]] = None,
+        upload_files: bool = False,
+    ) -> ExecutionResult:
+        persisted = lookup(document)
+        if persisted is None or upload_files:
+            return await super().execute(document, variable_values, operation_name, extra_args, upload_files)
+        if not self.client:
+            raise TransportClosed("Transport is not connected")
+
+        payload: Dict[str, Any] = {}
+        if operation_name:
+            payload["operationName"] = operation_name
+        if variable_values:
+            payload["variables"] = variable_values
+        post_args = dict(extra_args or {})
+
+        if self.persisted_queries:
+            payload["extensions"] = {"persistedQuery": {"version": 1, "sha256Hash": persisted.sha256}}
+            response = await self.client.post(self.url, json=payload, **post_args)
+            apq_error = _apq_error(response)
+            if apq_error is None:
+                self.persisted_stats["hash_only"] += 1
+                return self._prepare_result(response)
+            if apq_error == PERSISTED_QUERY_NOT_SUPPORTED:
+                logger.warning("Healthie does not support persisted queries; sending full queries")
+                self.persisted_queries = False
+                self.persisted_stats["full"] += 1
+                del payload["extensions"]
+            else:
+                self.persisted_stats["registered"] += 1
+        else:
+            self.persisted_stats["full"] += 1
+
+        # Full query; with the persistedQuery extension still set, the server stores the hash
+        payload["query"] = persisted.query
+        response = await self.client.post(self.url, json=payload, **post_args)
+        return self._prepare_result(response)
@@ -1,35 +1,421 @@
 """
 Healthie GraphQL API Client
 Port of HealthieIntake.Api.Services.HealthieApiClient from .NET
+
+Uses a single pooled async HTTP client (httpx) for the lifetime of the
+process, so Healthie calls never block the event loop.
 """
+import asyncio
+import logging
+from functools import lru_cache
 from typing import List, Optional, Dict, Any
-from gql import gql, Client
-from gql.transport.requests import RequestsHTTPTransport
-from models import Patient, CustomModuleForm, CustomModule, FormAnswerGroupInput
+import httpx
+from gql import Client
+from gql.client import AsyncClientSession
+from gql.transport.exceptions import TransportQueryError, TransportServerError
+from graphql import DocumentNode
+from models import (
+    Patient, CustomModuleForm, CustomModule, FormAnswerGroupInput,
+    FormAnswerDetail, FormAnswerGroupDetail, PatientFormHistory
+)
+from observability import traced_methods
+from services.graphql_documents import PersistedQueryTransport, register
+from services.resilience import (
+    Bulkhead, CircuitBreaker, DeadlineExceededError, UpstreamUnavailableError, call_timeout
+)
+
+logger = logging.getLogger(__name__)
+
+# GraphQL documents, parsed once at import (see services/graphql_documents.py)
+GET_PATIENT = register("get_patient", """
+    query($id: ID!) {
+        user(id: $id) {
+            id
+            email
+            first_name
+            last_name
+        }
+    }
+""")
+
+SEARCH_PATIENTS = register("search_patients", """
+    query($keywords: String!) {
+        users(should_paginate: false, keywords: $keywords) {
+            id
+            email
+            first_name
+            last_name
+            dob
+        }
+    }
+""")
+
+GET_CUSTOM_FORM = register("get_custom_form", """
+    query($id: ID!) {
+        customModuleForm(id: $id) {
+            id
+            name
+            custom_modules {
+                id
+                label
+                mod_type
+                required
+                options
+            }
+        }
+    }
+""")
+
+CREATE_FORM_ANSWER_GROUP = register("create_form_answer_group", """
+    mutation createFormAnswerGroup($input: createFormAnswerGroupInput!) {
+        createFormAnswerGroup(input: $input) {
+            form_answer_group {
+                id
+                finished
+            }
+            messages {
+                field
+                message
+            }
+        }
+    }
+""")
+
+GET_FORM_ANSWER_GROUP_DETAILS = register("get_form_answer_group_details", """
+    query($id: ID!) {
+        formAnswerGroup(id: $id) {
+            id
+            finished
+            created_at
+            form_answers {
+                id
+                answer
+                displayed_answer
+                custom_module {
+                    id
+                    label
+                    mod_type
+                }
+            }
+        }
+    }
+""")
+
+GET_FORM_ANSWER_GROUPS_FOR_PATIENT = register("get_form_answer_groups_for_patient", """
+    query($userId: String) {
+        formAnswerGroups(user_id: $userId) {
+            id
+            custom_module_form {
+                id
+                name
+            }
+            created_at
+        }
+    }
+""")
+
+FORM_ANSWER_GROUP_IDS = register("form_answer_group_ids", """
+    query($userId: String) {
+        formAnswerGroups(user_id: $userId) {
+            id
+        }
+    }
+""")
+
+DELETE_FORM_ANSWER_GROUP = register("delete_form_answer_group", """
+    mutation deleteFormAnswerGroup($input: deleteFormAnswerGroupInput!) {
+        deleteFormAnswerGroup(input: $input) {
+            messages {
+                field
+                message
+            }
+        }
+    }
+""")
+
+
+def _http2_available() -> bool:
+    """HTTP/2 in httpx needs the optional `h2` package"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+@lru_cache(maxsize=32)
+def _form_answer_groups_batch_document(count: int) -> DocumentNode:
+    """
+    One query fetching `count` form answer groups by ID, as aliases g0..g<count-1>
+
+    Registered (parsed once) per batch size.
+    """
+    variables = ", ".join(f"$id{i}: ID!" for i in range(count))
+    fields = "\n".join(f"g{i}: formAnswerGroup(id: $id{i}) {{ ...FormAnswerGroupDetail }}" for i in range(count))
+    return register(f"form_answer_groups_batch_{count}", f"""
+        query formAnswerGroupsBatch({variables}) {{
+            {fields}
+        }}
+
+        fragment FormAnswerGroupDetail on FormAnswerGroup {{
+            id
+            finished
+            created_at
+            custom_module_form {{
+                id
+                name
+            }}
+            form_answers {{
+                id
+                answer
+                displayed_answer
+                custom_module {{
+                    id
+                    label
+                    mod_type
+                }}
+            }}
+        }}
+    """)
+
+
+def _form_answer_group_detail(data: Dict[str, Any]) -> FormAnswerGroupDetail:
+    """Flatten a formAnswerGroup result into FormAnswerGroupDetail"""
+    form = data.get('custom_module_form') or {}
+    return FormAnswerGroupDetail(
+        id=data.get('id', ''),
+        form_id=form.get('id', ''),
+        form_name=form.get('name', ''),
+        finished=bool(data.get('finished')),
+        created_at=data.get('created_at'),
+        answers=[
+            FormAnswerDetail(
+                id=answer.get('id', ''),
+                custom_module_id=(answer.get('custom_module') or {}).get('id', ''),
+                label=(answer.get('custom_module') or {}).get('label', ''),
+                mod_type=(answer.get('custom_module') or {}).get('mod_type', ''),
+                answer=answer.get('answer'),
+                displayed_answer=answer.get('displayed_answer')
+            )
+            for answer in data.get('form_answers') or []
+        ]
+    )
 
 
+@traced_methods("healthie", exclude=("connect", "close", "resilience_stats"))
 class HealthieApiClient:
     """GraphQL client for Healthie API - exact port of .NET HealthieApiClient"""
 
-    def __init__(self, api_url: str, api_key: str):
+    def __init__(
+        self,
+        api_url: str,
+        api_key: str,
+        timeout: float = 10.0,
+        connect_timeout: float = 5.0,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        connect_retries: int = 3,
+        http2: bool = False,
+        max_concurrent_calls: int = 10,
+        bulkhead_wait: float = 1.0,
+        breaker_failure_threshold: int = 5,
+        breaker_recovery: float = 30.0,
+        persisted_queries: bool = False,
+    ):
         """
         Initialize Healthie API client
 
+        No connection is opened here; call connect() on startup (or let the
+        first request connect lazily) and close() on shutdown.
+
         Args:
             api_url: Healthie GraphQL API endpoint
             api_key: API authentication key
+            timeout: Default per-call timeout in seconds
+            connect_timeout: TCP/TLS connect timeout in seconds
+            max_connections: Maximum pooled connections to Healthie
+            max_keepalive_connections: Idle connections kept open for reuse
+            keepalive_expiry: Seconds an idle connection is kept alive
+            connect_retries: Retries on connection failures (not on responses)
+            http2: Negotiate HTTP/2 when the `h2` package is installed
+            max_concurrent_calls: Bulkhead size (max in-flight Healthie calls)
+            bulkhead_wait: Seconds a call may wait for a bulkhead slot
+            breaker_failure_threshold: Consecutive failures that open an operation's breaker
+            breaker_recovery: Seconds a breaker stays open before a probe call
+            persisted_queries: Send hash-only persisted queries (APQ) instead of query text
         """
-        transport = RequestsHTTPTransport(
+        self.timeout = timeout
+        self.bulkhead = Bulkhead(max_concurrent_calls, bulkhead_wait)
+        self.breaker_failure_threshold = breaker_failure_threshold
+        self.breaker_recovery = breaker_recovery
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+        if http2 and not _http2_available():
+            logger.warning("HEALTHIE_HTTP2 is enabled but `h2` is not installed; using HTTP/1.1")
+            http2 = False
+
+        transport = PersistedQueryTransport(
             url=api_url,
+            persisted_queries=persisted_queries,
             headers={
                 'Authorization': f'Basic {api_key}',
                 'AuthorizationSource': 'API'
             },
-            verify=True,
-            retries=3,
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            transport=httpx.AsyncHTTPTransport(
+                verify=True,
+                http2=http2,
+                retries=connect_retries,
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_keepalive_connections,
+                    keepalive_expiry=keepalive_expiry,
+                ),
+            ),
+        )
+
+        # execute_timeout is handled per call in _execute()
+        self.client = Client(
+            transport=transport,
+            fetch_schema_from_transport=False,
+            execute_timeout=None,
         )
+        self._session: Optional[AsyncClientSession] = None
+        self._connect_lock = asyncio.Lock()
+
+        # users(keywords) returns every name match; DOB filtering happens here
+        self.search_stats = {"searches": 0, "upstream_rows": 0, "discarded_rows": 0, "max_upstream_rows": 0}
+
+    @classmethod
+    def from_settings(cls, settings) -> "HealthieApiClient":
+        """
+        Create a client from application Settings
+
+        Args:
+            settings: config.Settings instance
+        """
+        return cls(
+            api_url=settings.healthie_api_url,
+            api_key=settings.healthie_api_key,
+            timeout=settings.healthie_timeout_seconds,
+            connect_timeout=settings.healthie_connect_timeout_seconds,
+            max_connections=settings.healthie_max_connections,
+            max_keepalive_connections=settings.healthie_max_keepalive_connections,
+            keepalive_expiry=settings.healthie_keepalive_expiry_seconds,
+            connect_retries=settings.healthie_connect_retries,
+            http2=settings.healthie_http2,
+            max_concurrent_calls=settings.healthie_max_concurrent_calls,
+            bulkhead_wait=settings.healthie_bulkhead_wait_seconds,
+            breaker_failure_threshold=settings.healthie_breaker_failure_threshold,
+            breaker_recovery=settings.healthie_breaker_recovery_seconds,
+            persisted_queries=settings.healthie_persisted_queries
+        )
+
+    async def connect(self) -> None:
+        """Open the shared connection pool (idempotent)"""
+        async with self._connect_lock:
+            if self._session is None:
+                self._session = await self.client.connect_async()
+
+    async def close(self) -> None:
+        """Close the shared connection pool"""
+        async with self._connect_lock:
+            if self._session is not None:
+                await self.client.close_async()
+                self._session = None
+
+    def resilience_stats(self) -> Dict[str, Any]:
+        """Circuit breaker states per operation, bulkhead occupancy and persisted query usage, for /health"""
+        transport = self.client.transport
+        return {
+            "circuit_breakers": {name: breaker.stats() for name, breaker in self.breakers.items()},
+            "bulkhead": self.bulkhead.stats(),
+            "persisted_queries": {"enabled": transport.persisted_queries, **transport.persisted_stats},
+        }
+
+    def _breaker(self, operation: str) -> CircuitBreaker:
+        breaker = self.breakers.get(operation)
+        if breaker is None:
+            breaker = CircuitBreaker(operation, self.breaker_failure_threshold, self.breaker_recovery)
+            self.breakers[operation] = breaker
+        return breaker
+
+    async def _execute(
+        self,
+        operation: str,
+        document: DocumentNode,
+        variable_values: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Execute a GraphQL document on the shared session
+
+        Guarded by the operation's circuit breaker and the shared bulkhead;
+        the timeout is clamped to the incoming request's remaining deadline.
+        GraphQL errors and 4xx responses mean Healthie is up, so only
+        timeouts, transport errors and 5xx responses count as failures.
+
+        Args:
+            operation: Operation name (one circuit breaker per operation)
+            document: Parsed GraphQL document
+            variable_values: GraphQL variables
+            timeout: Per-call timeout in seconds (defaults to self.timeout)
+
+        Returns:
+            The `data` dict of the GraphQL response
+
+        Raises:
+            UpstreamUnavailableError: Breaker open, bulkhead full or deadline exceeded
+        """
+        if self._session is None:
+            await self.connect()
+
+        breaker = self._breaker(operation)
+        breaker.before_call()
+        try:
+            await self.bulkhead.acquire()
+        except UpstreamUnavailableError:
+            breaker.release()
+            raise
 
-        self.client = Client(transport=transport, fetch_schema_from_transport=False)
+        try:
+            default_timeout = timeout or self.timeout
+            call_deadline = call_timeout(default_timeout)
+            result = await asyncio.wait_for(
+                self._session.execute(document, variable_values=variable_values),
+                timeout=call_deadline,
+            )
+        except TransportQueryError:
+            breaker.record_success()
+            raise
+        except TransportServerError as e:
+            if e.code is not None and e.code < 500:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+            raise
+        except asyncio.TimeoutError:
+            if call_deadline < default_timeout:
+                # Our caller's budget ran out, not necessarily Healthie's fault
+                breaker.release()
+                raise DeadlineExceededError(f"Request deadline exceeded during {operation}")
+            breaker.record_failure()
+            raise
+        except DeadlineExceededError:
+            breaker.release()
+            raise
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        finally:
+            self.bulkhead.release()
+
+        breaker.record_success()
+        return result
 
     async def get_patient_async(self, patient_id: str) -> Optional[Patient]:
         """
@@ -41,19 +427,8 @@ class HealthieApiClient:
         Returns:
             Patient object or None
         """
-        query = gql("""
-            query($id: ID!) {
-                user(id: $id) {
-                    id
-                    email
-                    first_name
-                    last_name
-                }
-            }
-        """)
-
         try:
-            result = self.client.execute(query, variable_values={"id": patient_id})
+            result = await self._execute("get_patient", GET_PATIENT, variable_values={"id": patient_id})
             user_data = result.get('user')
 
             if not user_data:
@@ -65,6 +440,8 @@ class HealthieApiClient:
                 first_name=user_data.get('first_name', ''),
                 last_name=user_data.get('last_name', '')
             )
+        except UpstreamUnavailableError:
+            raise
         except Exception as e:
             raise Exception(f"Error fetching patient: {str(e)}")
 
@@ -83,20 +460,8 @@ class HealthieApiClient:
         # Construct search keywords from name
         keywords = f"{first_name} {last_name}".strip()
 
-        query = gql("""
-            query($keywords: String!) {
-                users(should_paginate: false, keywords: $keywords) {
-                    id
-                    email
-                    first_name
-                    last_name
-                    dob
-                }
-            }
-        """)
-
         try:
-            result = self.client.execute(query, variable_values={"keywords": keywords})
+            result = await self._execute("search_patients", SEARCH_PATIENTS, variable_values={"keywords": keywords})
             users_data = result.get('users', [])
 
             # Filter by DOB if provided
@@ -122,7 +487,14 @@ class HealthieApiClient:
                         last_name=user_data.get('last_name', '')
                     ))
 
+            self.search_stats["searches"] += 1
+            self.search_stats["upstream_rows"] += len(users_data)
+            self.search_stats["discarded_rows"] += len(users_data) - len(matching_patients)
+            self.search_stats["max_upstream_rows"] = max(self.search_stats["max_upstream_rows"], len(users_data))
+
             return matching_patients
+        except UpstreamUnavailableError:
+            raise
         except Exception as e:
             raise Exception(f"Error searching patients: {str(e)}")
 
@@ -136,24 +508,8 @@ class HealthieApiClient:
         Returns:
             CustomModuleForm object or None
         """
-        query = gql("""
-            query($id: ID!) {
-                customModuleForm(id: $id) {
-                    id
-                    name
-                    custom_modules {
-                        id
-                        label
-                        mod_type
-                        required
-                        options
-                    }
-                }
-            }
-        """)
-
         try:
-            result = self.client.execute(query, variable_values={"id": form_id})
+            result = await self._execute("get_custom_form", GET_CUSTOM_FORM, variable_values={"id": form_id})
             form_data = result.get('customModuleForm')
 
             if not form_data:
@@ -182,6 +538,8 @@ class HealthieApiClient:
                 name=form_data.get('name', ''),
                 custom_modules=modules
             )
+        except UpstreamUnavailableError:
+            raise
         except Exception as e:
             raise Exception(f"Error fetching form: {str(e)}")
 
@@ -195,21 +553,6 @@ class HealthieApiClient:
         Returns:
             Form answer group ID
         """
-        mutation = gql("""
-            mutation createFormAnswerGroup($input: createFormAnswerGroupInput!) {
-                createFormAnswerGroup(input: $input) {
-                    form_answer_group {
-                        id
-                        finished
-                    }
-                    messages {
-                        field
-                        message
-                    }
-                }
-            }
-        """)
-
         # Convert Pydantic model to GraphQL input format
         graphql_input = {
             'custom_module_form_id': input_data.custom_module_form_id,
@@ -225,8 +568,9 @@ class HealthieApiClient:
         }
 
         try:
-            result = self.client.execute(
-                mutation,
+            result = await self._execute(
+                "create_form_answer_group",
+                CREATE_FORM_ANSWER_GROUP,
                 variable_values={'input': graphql_input}
             )
 
@@ -244,11 +588,11 @@ class HealthieApiClient:
                 raise Exception("Form submission failed - no form_answer_group returned")
 
             form_id = form_answer_group.get('id', '')
-            is_finished = form_answer_group.get('finished', False)
-
-            print(f"DEBUG: Form created with ID {form_id}, finished={is_finished}")
+            logger.debug(f"Form answer group {form_id} created, finished={form_answer_group.get('finished', False)}")
 
             return form_id
+        except UpstreamUnavailableError:
+            raise
         except Exception as e:
             raise Exception(f"Error creating form answer group: {str(e)}")
 
@@ -262,29 +606,12 @@ class HealthieApiClient:
         Returns:
             Form answer group details
         """
-        query = gql("""
-            query($id: ID!) {
-                formAnswerGroup(id: $id) {
-                    id
-                    finished
-                    created_at
-                    form_answers {
-                        id
-                        answer
-                        displayed_answer
-                        custom_module {
-                            id
-                            label
-                            mod_type
-                        }
-                    }
-                }
-            }
-        """)
-
         try:
-            result = self.client.execute(query, variable_values={"id": form_answer_group_id})
+            result = await self._execute("get_form_answer_group_details", GET_FORM_ANSWER_GROUP_DETAILS,
+                                         variable_values={"id": form_answer_group_id})
             return result
+        except UpstreamUnavailableError:
+            raise
         except Exception as e:
             raise Exception(f"Error fetching form answer group details: {str(e)}")
 
@@ -298,36 +625,75 @@ class HealthieApiClient:
         Returns:
             List of form answer group IDs
         """
-        query = gql("""
-            query($userId: String) {
-                formAnswerGroups(user_id: $userId) {
-                    id
-                    custom_module_form {
-                        id
-                        name
-                    }
-                    created_at
-                }
-            }
-        """)
-
         try:
-            result = self.client.execute(query, variable_values={"userId": patient_id})
+            result = await self._execute("get_form_answer_groups_for_patient", GET_FORM_ANSWER_GROUPS_FOR_PATIENT,
+                                         variable_values={"userId": patient_id})
             form_answer_groups = result.get('formAnswerGroups', [])
+            logger.debug(f"Found {len(form_answer_groups)} form answer group(s) for patient {patient_id}")
 
-            ids = []
-            print(f"\nFound {len(form_answer_groups)} form answer group(s) for patient {patient_id}:")
-            for group in form_answer_groups:
-                group_id = group.get('id', '')
-                form_name = group.get('custom_module_form', {}).get('name', '')
-                created_at = group.get('created_at', '')
-                ids.append(group_id)
-                print(f"  - ID: {group_id}, Form: {form_name}, Created: {created_at}")
-
-            return ids
+            return [group.get('id', '') for group in form_answer_groups]
+        except UpstreamUnavailableError:
+            raise
         except Exception as e:
             raise Exception(f"Error fetching form answer groups: {str(e)}")
 
+    async def get_form_history_async(
+        self,
+        patient_id: str,
+        max_groups: int = 200,
+        batch_size: int = 25,
+        max_concurrency: int = 4,
+    ) -> PatientFormHistory:
+        """
+        Get a patient's form answer groups with all answers
+
+        One call lists the groups, then details are fetched batch_size
+        groups per request (aliased formAnswerGroup fields) with at most
+        max_concurrency batches in flight: 1 + ceil(N / batch_size) round
+        trips instead of 1 + N.
+
+        Args:
+            patient_id: Patient ID
+            max_groups: Fetch details for at most this many groups (in upstream order)
+            batch_size: Groups per batched request
+            max_concurrency: Batched requests in flight at once
+
+        Returns:
+            PatientFormHistory; total_count counts all groups, returned_count those fetched
+        """
+        try:
+            result = await self._execute("get_form_answer_groups_for_patient", FORM_ANSWER_GROUP_IDS,
+                                         variable_values={"userId": patient_id})
+            group_ids = [group.get('id', '') for group in result.get('formAnswerGroups') or []]
+            selected = group_ids[:max_groups]
+            semaphore = asyncio.Semaphore(max_concurrency)
+
+            async def fetch_batch(batch_ids: List[str]) -> List[FormAnswerGroupDetail]:
+                async with semaphore:
+                    data = await self._execute(
+                        "get_form_answer_groups_batch",
+                        _form_answer_groups_batch_document(len(batch_ids)),
+                        variable_values={f"id{i}": group_id for i, group_id in enumerate(batch_ids)}
+                    )
+                # Groups deleted since the listing come back as null
+                return [_form_answer_group_detail(data[f"g{i}"]) for i in range(len(batch_ids)) if data.get(f"g{i}")]
+
+            batches = await asyncio.gather(*(
+                fetch_batch(selected[start:start + batch_size]) for start in range(0, len(selected), batch_size)
+            ))
+            groups = [group for batch in batches for group in batch]
+
+            return PatientFormHistory(
+                patient_id=patient_id,
+                total_count=len(group_ids),
+                returned_count=len(groups),
+                groups=groups
+            )
+        except UpstreamUnavailableError:
+            raise
+        except Exception as e:
+            raise Exception(f"Error fetching form history: {str(e)}")
+
     async def delete_form_answer_group_async(self, form_answer_group_id: str) -> bool:
         """
         Delete form answer group
@@ -338,20 +704,10 @@ class HealthieApiClient:
         Returns:
             True if successful
         """
-        mutation = gql("""
-            mutation deleteFormAnswerGroup($input: deleteFormAnswerGroupInput!) {
-                deleteFormAnswerGroup(input: $input) {
-                    messages {
-                        field
-                        message
-                    }
-                }
-            }
-        """)
-
         try:
-            result = self.client.execute(
-                mutation,
+            result = await self._execute(
+                "delete_form_answer_group",
+                DELETE_FORM_ANSWER_GROUP,
                 variable_values={'input': {'id': form_answer_group_id}}
             )
 
@@ -363,5 +719,7 @@ class HealthieApiClient:
                 raise Exception(f"Delete errors: {', '.join(error_msgs)}")
 
             return True
+        except UpstreamUnavailableError:
+            raise
         except Exception as e:
             raise Exception(f"Error deleting form answer group: {str(e)}")
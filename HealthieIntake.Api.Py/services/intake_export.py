@@ -0,0 +1,204 @@
+"""
+Streaming bulk export of intakes to NDJSON, CSV, XLSX and Parquet
+
+Rows come from IntakeRepository.stream_for_export (server-side cursor) and
+are written batch by batch, so memory stays flat for any table size.
+
+CLI usage:
+    python -m services.intake_export --format csv --output intakes.csv
+    python -m services.intake_export --format parquet --output intakes.parquet \
+        --status completed --fields emergency_contact.name,answers.19056452
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, AsyncIterator, BinaryIO, Dict, List, Optional
+from uuid import UUID
+
+from repositories import IntakeRepository
+
+EXPORT_FORMATS = ("ndjson", "csv", "xlsx", "parquet")
+
+# Formats that can be streamed straight to the client without finalization
+STREAMING_FORMATS = ("ndjson", "csv")
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+BASE_COLUMNS = [
+    "id", "patient_healthie_id", "first_name", "last_name", "email", "date_of_birth", "phone",
+    "status", "current_step", "created_at", "last_updated_at", "submitted_at",
+]
+
+
+def export_columns(field_paths: List[str], include_form_data: bool) -> List[str]:
+    """Column names in export order"""
+    columns = BASE_COLUMNS + [f"form_data.{path}" for path in field_paths]
+    if include_form_data:
+        columns.append("form_data")
+    return columns
+
+
+def parse_field_paths(fields: Optional[str]) -> List[str]:
+    """Split a comma-separated list of dotted form_data paths"""
+    return [path.strip() for path in (fields or "").split(",") if path.strip()]
+
+
+def _to_text(value: Any) -> Optional[str]:
+    """Render a row value as a flat string (None stays None)"""
+    if value is None:
+        return None
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    return str(value)
+
+
+def _to_json(value: Any) -> Any:
+    """Make a row value JSON-serializable, keeping nested documents"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+async def stream_text(batches: AsyncIterator[List[Dict[str, Any]]], fmt: str,
+                      columns: List[str]) -> AsyncIterator[bytes]:
+    """
+    Encode batches as NDJSON or CSV, one chunk per batch
+
+    Args:
+        batches: Row batches from IntakeRepository.stream_for_export
+        fmt: 'ndjson' or 'csv'
+        columns: Column order (see export_columns)
+
+    Yields:
+        Encoded bytes for each batch
+    """
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        yield buffer.getvalue().encode("utf-8")
+
+        async for batch in batches:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows([_to_text(row.get(column)) for column in columns] for row in batch)
+            yield buffer.getvalue().encode("utf-8")
+        return
+
+    if fmt == "ndjson":
+        async for batch in batches:
+            lines = [
+                json.dumps({column: _to_json(row.get(column)) for column in columns}, separators=(",", ":"))
+                for row in batch
+            ]
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+        return
+
+    raise ValueError(f"{fmt} cannot be streamed; use write_export")
+
+
+async def _write_xlsx(batches: AsyncIterator[List[Dict[str, Any]]], columns: List[str], fileobj: BinaryIO) -> None:
+    from openpyxl import Workbook
+
+    # write_only keeps rows in a temp file instead of building the sheet in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Intakes")
+    sheet.append(columns)
+
+    def append_batch(batch):
+        for row in batch:
+            sheet.append([_to_text(row.get(column)) for column in columns])
+
+    async for batch in batches:
+        await asyncio.to_thread(append_batch, batch)
+    await asyncio.to_thread(workbook.save, fileobj)
+
+
+async def _write_parquet(batches: AsyncIterator[List[Dict[str, Any]]], columns: List[str], fileobj: BinaryIO) -> None:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Parquet export requires the pyarrow package")
+
+    schema = pa.schema([(column, pa.string()) for column in columns])
+    writer = pq.ParquetWriter(fileobj, schema)
+    try:
+        async for batch in batches:
+            # One row group per batch
+            table = pa.Table.from_pylist(
+                [{column: _to_text(row.get(column)) for column in columns} for row in batch],
+                schema=schema
+            )
+            await asyncio.to_thread(writer.write_table, table)
+    finally:
+        writer.close()
+
+
+async def write_export(batches: AsyncIterator[List[Dict[str, Any]]], fmt: str,
+                       columns: List[str], fileobj: BinaryIO) -> None:
+    """
+    Write an export in any supported format to a binary file object
+
+    Args:
+        batches: Row batches from IntakeRepository.stream_for_export
+        fmt: One of EXPORT_FORMATS
+        columns: Column order (see export_columns)
+        fileobj: Destination opened in binary mode
+    """
+    if fmt in STREAMING_FORMATS:
+        async for chunk in stream_text(batches, fmt, columns):
+            fileobj.write(chunk)
+    elif fmt == "xlsx":
+        await _write_xlsx(batches, columns, fileobj)
+    elif fmt == "parquet":
+        await _write_parquet(batches, columns, fileobj)
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+
+async def main(args: argparse.Namespace) -> None:
+    from database import async_session_maker, close_db
+
+    field_paths = parse_field_paths(args.fields)
+    columns = export_columns(field_paths, args.include_form_data)
+
+    try:
+        async with async_session_maker() as session:
+            batches = IntakeRepository(session).stream_for_export(
+                field_paths=field_paths,
+                include_form_data=args.include_form_data,
+                status=args.status,
+                created_from=args.created_from,
+                created_to=args.created_to,
+                batch_size=args.batch_size
+            )
+            with open(args.output, "wb") as fileobj:
+                await write_export(batches, args.format, columns, fileobj)
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export intakes to a file")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, required=True)
+    parser.add_argument("--output", required=True, help="Destination file path")
+    parser.add_argument("--status", help="Only export intakes with this status")
+    parser.add_argument("--created-from", type=datetime.fromisoformat, help="Inclusive ISO lower bound on created_at")
+    parser.add_argument("--created-to", type=datetime.fromisoformat, help="Exclusive ISO upper bound on created_at")
+    parser.add_argument("--fields", help="Comma-separated form_data paths to flatten into columns")
+    parser.add_argument("--include-form-data", action="store_true", help="Add the whole form_data document as a column")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    asyncio.run(main(parser.parse_args()))
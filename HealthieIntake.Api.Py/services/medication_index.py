@@ -0,0 +1,297 @@
+"""
+In-memory medication name index built from the openFDA NDC bulk download
+
+Replaces per-keystroke calls to api.fda.gov from the browser. Brand and
+generic names are de-duplicated and indexed in a sorted array of
+suffixes starting at each word, so a prefix lookup is two bisects plus a
+scan of the matching slice.
+
+Without a data file, OpenFdaMedicationSearch answers the same route from
+the openFDA NDC search API (server-side, cached per query), as the
+browser used to.
+
+Data file (either form is accepted by MedicationIndex.from_file):
+    - openFDA bulk NDC export, drug-ndc-0001-of-0001.json or the .zip as downloaded
+    - compact index written by --build (names + product counts only; loads in well under a second)
+
+CLI usage:
+    python -m services.medication_index --download data/drug-ndc.json.zip
+    python -m services.medication_index --source data/drug-ndc.json.zip --build data/medication-index.json
+    python -m services.medication_index --source data/medication-index.json --query ibupro
+"""
+import argparse
+import json
+import re
+import time
+import zipfile
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+from services.cache import AsyncTTLCache
+
+NDC_DOWNLOAD_URL = "https://download.open.fda.gov/drug/ndc/drug-ndc-0001-of-0001.json.zip"
+NDC_SEARCH_URL = "https://api.fda.gov/drug/ndc.json"
+
+# Products fetched per openFDA query; ranked and de-duplicated locally
+OPENFDA_FETCH_LIMIT = 100
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+# Anything else is openFDA query syntax (field:, quotes, grouping, +, wildcards)
+_OPENFDA_UNSAFE = re.compile(r"[^a-z0-9-]+")
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase and collapse punctuation/whitespace, e.g. 'Advil  PM' -> 'advil pm'"""
+    return _NON_ALNUM.sub(" ", name.casefold()).strip()
+
+
+class MedicationIndex:
+    """
+    Prefix index over medication names
+
+    Ranking: names that start with the query come before names where a
+    later word starts with it; ties are broken by how many NDC products
+    carry the name, then by shorter name.
+    """
+
+    def __init__(self, names: List[str], product_counts: List[int], cache_size: int = 4096):
+        """
+        Args:
+            names: Display names, one per distinct normalized name
+            product_counts: NDC product count per name (popularity)
+            cache_size: Number of recent query results to memoize
+        """
+        self.names = names
+        self.product_counts = product_counts
+
+        # One key per word start: "ibuprofen and famotidine" is found by "ibu" and "famo"
+        entries: List[Tuple[str, int, int]] = []
+        for name_id, name in enumerate(names):
+            normalized = normalize_name(name)
+            for match in re.finditer(r"\S+", normalized):
+                entries.append((normalized[match.start():], match.start(), name_id))
+        entries.sort()
+
+        self._keys = [key for key, _, _ in entries]
+        self._offsets = [offset for _, offset, _ in entries]
+        self._name_ids = [name_id for _, _, name_id in entries]
+        self._cached_search = lru_cache(maxsize=cache_size)(self._search)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_products(cls, products: Iterable[Dict[str, Any]]) -> "MedicationIndex":
+        """
+        Build an index from openFDA NDC product records
+
+        Args:
+            products: Items of the export's "results" array
+
+        Returns:
+            MedicationIndex over brand and generic names
+        """
+        counts: Counter = Counter()
+        spellings: Dict[str, Counter] = defaultdict(Counter)
+        for product in products:
+            seen = set()
+            for field in ("brand_name", "generic_name"):
+                value = product.get(field)
+                for name in (value if isinstance(value, list) else [value]):
+                    if not name or not name.strip():
+                        continue
+                    normalized = normalize_name(name)
+                    if not normalized or normalized in seen:
+                        continue
+                    seen.add(normalized)
+                    counts[normalized] += 1
+                    spellings[normalized][" ".join(name.split())] += 1
+
+        normalized_names = sorted(counts)
+        # Show the most common spelling of each name
+        names = [spellings[n].most_common(1)[0][0] for n in normalized_names]
+        return cls(names, [counts[n] for n in normalized_names])
+
+    @classmethod
+    def from_file(cls, path: str) -> "MedicationIndex":
+        """
+        Load an openFDA NDC export (.json or .zip) or a compact index from --build
+
+        Args:
+            path: File path
+
+        Returns:
+            MedicationIndex
+        """
+        if path.endswith(".zip"):
+            with zipfile.ZipFile(path) as archive:
+                member = next(n for n in archive.namelist() if n.endswith(".json"))
+                with archive.open(member) as f:
+                    data = json.load(f)
+        else:
+            with open(path, "rb") as f:
+                data = json.load(f)
+
+        if "names" in data:
+            return cls(data["names"], data["product_counts"])
+        return cls.from_products(data.get("results", []))
+
+    def save(self, path: str) -> None:
+        """Write the compact form (names and product counts) read by from_file"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"names": self.names, "product_counts": self.product_counts}, f, separators=(",", ":"))
+
+    def search(self, query: str, limit: int = 10) -> List[str]:
+        """
+        Ranked, de-duplicated names matching a prefix
+
+        Args:
+            query: Text typed so far
+            limit: Maximum suggestions
+
+        Returns:
+            Display names, best match first
+        """
+        normalized = normalize_name(query)
+        if not normalized:
+            return []
+        return list(self._cached_search(normalized, limit))
+
+    def _search(self, prefix: str, limit: int) -> Tuple[str, ...]:
+        start = bisect_left(self._keys, prefix)
+        end = bisect_left(self._keys, prefix + "\U0010ffff", start)
+
+        # 0 = the name itself starts with the prefix, 1 = a later word does
+        tiers: Dict[int, int] = {}
+        for position in range(start, end):
+            name_id = self._name_ids[position]
+            tier = 0 if self._offsets[position] == 0 else 1
+            if tiers.get(name_id, 2) > tier:
+                tiers[name_id] = tier
+
+        ranked = sorted(
+            tiers,
+            key=lambda name_id: (tiers[name_id], -self.product_counts[name_id],
+                                 len(self.names[name_id]), self.names[name_id])
+        )
+        return tuple(self.names[name_id] for name_id in ranked[:limit])
+
+
+class OpenFdaMedicationSearch:
+    """
+    Medication name search against the openFDA NDC API
+
+    Fallback for when no index file is loaded. Products matching the
+    query's first word are fetched once per query and ranked like
+    MedicationIndex (a small index is built from the response), so
+    results look the same either way.
+    """
+
+    def __init__(self, api_key: str = "", timeout: float = 5.0, cache_seconds: float = 3600.0,
+                 max_entries: int = 4096):
+        """
+        Args:
+            api_key: openFDA API key (optional; raises the daily rate limit)
+            timeout: Seconds to wait for openFDA
+            cache_seconds: Seconds a query's result is reused
+            max_entries: Queries kept in the cache
+        """
+        self.api_key = api_key
+        self.timeout = timeout
+        self.cache = AsyncTTLCache(ttl=cache_seconds, max_entries=max_entries)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def connect(self) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def search(self, query: str, limit: int = 10) -> List[str]:
+        """
+        Ranked, de-duplicated names matching a prefix
+
+        Args:
+            query: Text typed so far
+            limit: Maximum suggestions
+
+        Returns:
+            Display names, best match first
+
+        Raises:
+            httpx.HTTPError: openFDA could not be reached or returned an error
+        """
+        normalized = normalize_name(query)
+        if not normalized:
+            return []
+        return await self.cache.get_or_load(
+            (normalized, limit), lambda: self._fetch(normalized, limit)
+        )
+
+    async def _fetch(self, normalized: str, limit: int) -> List[str]:
+        # Only plain characters reach the query: syntax in typed text makes openFDA answer 400
+        term = _OPENFDA_UNSAFE.sub("", normalized.split()[0])
+        if not term:
+            return []
+        await self.connect()
+        params = {
+            "search": f"brand_name:{term}* OR generic_name:{term}*",
+            "limit": OPENFDA_FETCH_LIMIT,
+        }
+        if self.api_key:
+            params["api_key"] = self.api_key
+        response = await self._client.get(NDC_SEARCH_URL, params=params)
+        if response.status_code == 404:
+            # openFDA answers "no matches" with 404
+            return []
+        response.raise_for_status()
+        products = response.json().get("results", [])
+        return MedicationIndex.from_products(products).search(normalized, limit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the medication name index")
+    parser.add_argument("--download", metavar="PATH", help="Download the openFDA NDC export to PATH")
+    parser.add_argument("--source", help="openFDA NDC export (.json/.zip) or compact index")
+    parser.add_argument("--build", metavar="PATH", help="Write a compact index to PATH")
+    parser.add_argument("--query", action="append", default=[], help="Query to run (repeatable)")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.download:
+        import httpx
+        with httpx.stream("GET", NDC_DOWNLOAD_URL, follow_redirects=True, timeout=300) as response:
+            response.raise_for_status()
+            with open(args.download, "wb") as f:
+                for chunk in response.iter_bytes():
+                    f.write(chunk)
+        print(f"Downloaded {NDC_DOWNLOAD_URL} to {args.download}")
+        args.source = args.source or args.download
+
+    if not args.source:
+        parser.error("--source is required")
+
+    start = time.perf_counter()
+    index = MedicationIndex.from_file(args.source)
+    print(f"Loaded {len(index)} names in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    if args.build:
+        index.save(args.build)
+        print(f"Wrote compact index to {args.build}")
+
+    for query in args.query:
+        start = time.perf_counter()
+        results = index.search(query, args.limit)
+        elapsed_us = (time.perf_counter() - start) * 1_000_000
+        print(f"{query!r} ({elapsed_us:.0f} us): {results}")
+
+
+if __name__ == "__main__":
+    main()
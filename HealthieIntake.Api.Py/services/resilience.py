@@ -0,0 +1,249 @@
+"""
+Circuit breaker, bulkhead and request deadlines for upstream calls
+
+When Healthie degrades, calls that are bound to fail should fail fast
+instead of tying up request workers:
+
+    CircuitBreaker  opens after consecutive failures of one operation and
+                    rejects calls until a recovery probe succeeds
+    Bulkhead        caps in-flight upstream calls so a slow upstream cannot
+                    absorb every request (drafts keep being served)
+    deadline        the incoming request's time budget (DeadlineMiddleware);
+                    upstream timeouts are clamped to what is left of it
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+DEADLINE_HEADER = "x-request-timeout"
+
+
+class UpstreamUnavailableError(Exception):
+    """An upstream call was not attempted or could not finish in time"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(UpstreamUnavailableError):
+    """The operation's circuit breaker is open"""
+
+
+class BulkheadFullError(UpstreamUnavailableError):
+    """Too many upstream calls are already in flight"""
+
+
+class DeadlineExceededError(UpstreamUnavailableError):
+    """The request's time budget ran out"""
+
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Set the time budget for the code in the block (and tasks it starts)
+
+    A budget never extends an enclosing deadline.
+
+    Args:
+        seconds: Budget from now; None or <= 0 leaves the current deadline
+    """
+    if not seconds or seconds <= 0:
+        yield
+        return
+
+    expires = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(expires if current is None else min(current, expires))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left in the current deadline, or None when there is none"""
+    expires = _deadline.get()
+    return None if expires is None else expires - time.monotonic()
+
+
+def call_timeout(default: float) -> float:
+    """
+    Timeout for one upstream call: the default, clamped to the remaining deadline
+
+    Raises:
+        DeadlineExceededError: The deadline has already passed
+    """
+    remaining = remaining_time()
+    if remaining is None:
+        return default
+    if remaining <= 0:
+        raise DeadlineExceededError("Request deadline exceeded before calling upstream")
+    return min(default, remaining)
+
+
+class DeadlineMiddleware:
+    """
+    Give each HTTP request a time budget
+
+    The budget is default_seconds, or less if the caller sends
+    X-Request-Timeout (seconds), e.g. a client that gives up after 5 s.
+    """
+
+    def __init__(self, app: ASGIApp, default_seconds: float):
+        """
+        Args:
+            app: Wrapped ASGI app
+            default_seconds: Budget per request; 0 disables deadlines
+        """
+        self.app = app
+        self.default_seconds = default_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        budget = self.default_seconds
+        requested = Headers(scope=scope).get(DEADLINE_HEADER)
+        if requested:
+            try:
+                requested_seconds = float(requested)
+                if requested_seconds > 0:
+                    budget = min(budget, requested_seconds) if budget > 0 else requested_seconds
+            except ValueError:
+                pass
+
+        with deadline(budget):
+            await self.app(scope, receive, send)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker
+
+    closed     calls pass; failure_threshold failures in a row open it
+    open       calls fail fast with CircuitOpenError for recovery_seconds
+    half_open  one probe call passes; success closes, failure reopens
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_seconds: float = 30.0):
+        """
+        Args:
+            name: Operation name, used in errors and stats
+            failure_threshold: Consecutive failures that open the breaker
+            recovery_seconds: Time open before a probe call is allowed
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.times_opened = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+
+    def before_call(self) -> None:
+        """
+        Admit or reject a call
+
+        Raises:
+            CircuitOpenError: The breaker is open, or half-open with a probe already running
+        """
+        if self.state == "open":
+            retry_after = self.opened_at + self.recovery_seconds - time.monotonic()
+            if retry_after > 0:
+                self.rejected += 1
+                raise CircuitOpenError(f"Circuit open for {self.name}", retry_after=retry_after)
+            self.state = "half_open"
+
+        if self.state == "half_open":
+            if self._probe_in_flight:
+                self.rejected += 1
+                raise CircuitOpenError(f"Circuit half-open for {self.name}; probe in progress",
+                                       retry_after=1.0)
+            self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        self._probe_in_flight = False
+        self.consecutive_failures = 0
+        self.state = "closed"
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self._probe_in_flight = False
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                self.times_opened += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """End an admitted call that neither succeeded nor failed upstream (e.g. cancelled)"""
+        self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        """State and counters for /health"""
+        stats: Dict[str, Any] = {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+        if self.state == "open":
+            stats["retry_in_seconds"] = round(max(0.0, self.opened_at + self.recovery_seconds - time.monotonic()), 1)
+        return stats
+
+
+class Bulkhead:
+    """Cap on concurrent upstream calls; callers wait briefly for a slot, then fail fast"""
+
+    def __init__(self, max_concurrent: int, max_wait_seconds: float = 1.0):
+        """
+        Args:
+            max_concurrent: Maximum calls in flight
+            max_wait_seconds: How long a call may queue for a slot
+        """
+        self.max_concurrent = max_concurrent
+        self.max_wait_seconds = max_wait_seconds
+        self.in_flight = 0
+        self.rejected = 0
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def acquire(self) -> None:
+        """
+        Take a slot, waiting at most max_wait_seconds (or the remaining deadline)
+
+        Raises:
+            BulkheadFullError: No slot freed up in time
+        """
+        if self._semaphore.locked():
+            wait = self.max_wait_seconds
+            remaining = remaining_time()
+            if remaining is not None:
+                wait = min(wait, max(0.0, remaining))
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=wait)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise BulkheadFullError(f"{self.max_concurrent} upstream calls already in flight", retry_after=1.0)
+        else:
+            await self._semaphore.acquire()
+        self.in_flight += 1
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"max_concurrent": self.max_concurrent, "in_flight": self.in_flight, "rejected": self.rejected}
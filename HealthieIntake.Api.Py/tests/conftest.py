@@ -0,0 +1,119 @@
+"""
+Shared fixtures: a disposable PostgreSQL migrated with migrate.py
+
+Set TEST_DATABASE_URL to use an existing empty database (CI uses a
+postgres:16 service container); otherwise benchmarks/local_postgres.py
+starts one with Docker or the pgserver package. Tests that need the
+database are skipped when neither is available.
+"""
+import asyncio
+import os
+import uuid
+from typing import Iterator
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+os.environ.setdefault("HEALTHIE_API_KEY", "test")
+
+# Migration that needs the pg_trgm extension (pgserver does not ship it)
+TRIGRAM_MIGRATION = 7
+
+
+async def _prepare(url: str) -> bool:
+    """Migrate the test database; returns whether pg_trgm is available"""
+    from migrate import discover, migrate
+
+    engine = create_async_engine(url, poolclass=NullPool)
+    try:
+        async with engine.connect() as conn:
+            has_pg_trgm = (await conn.execute(text(
+                "SELECT EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm')"
+            ))).scalar_one()
+        await migrate(engine, target=None if has_pg_trgm else TRIGRAM_MIGRATION - 1)
+        if not has_pg_trgm:
+            # The runner stops at the failing trigram migration; later ones are
+            # still needed by the other tests (all are idempotent, none recorded)
+            async with engine.connect() as conn:
+                driver = (await conn.get_raw_connection()).driver_connection
+                for migration in discover():
+                    if migration.version > TRIGRAM_MIGRATION:
+                        statements = [migration.sql()] if migration.transactional() else migration.statements()
+                        for statement in statements:
+                            await driver.execute(statement)
+        return has_pg_trgm
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def postgres() -> Iterator[dict]:
+    """{'url', 'has_pg_trgm'} of the migrated test database"""
+    url = os.environ.get("TEST_DATABASE_URL")
+    server = None
+    if not url:
+        from benchmarks.local_postgres import LocalPostgres
+        server = LocalPostgres(database="intake_test")
+        try:
+            url = server.start()
+        except Exception as e:
+            pytest.skip(f"No PostgreSQL for database tests: {e}")
+
+    # Modules that build the engine read settings at import time
+    from config import settings
+    settings.database_url = url
+    try:
+        yield {"url": url, "has_pg_trgm": asyncio.run(_prepare(url))}
+    finally:
+        if server is not None:
+            server.stop()
+
+
+@pytest.fixture
+def database_url(postgres) -> str:
+    return postgres["url"]
+
+
+@pytest.fixture
+def pg_trgm(postgres) -> None:
+    """Skip unless the server has pg_trgm (and migration 007 was applied)"""
+    if not postgres["has_pg_trgm"]:
+        pytest.skip("pg_trgm extension is not available on this PostgreSQL")
+
+
+@pytest.fixture
+async def engine(database_url) -> AsyncEngine:
+    engine = create_async_engine(database_url, poolclass=NullPool)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_maker(engine) -> async_sessionmaker:
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+@pytest.fixture
+async def session(session_maker):
+    async with session_maker() as session:
+        yield session
+
+
+@pytest.fixture
+def patient_id() -> str:
+    """Healthie patient ID no other test uses"""
+    return f"test-{uuid.uuid4().hex[:12]}"
+
+
+@pytest.fixture
+async def app_client(postgres):
+    """httpx client for main.app on the test database"""
+    import httpx
+    import database
+    import main
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+        yield client
+    await database.close_db()
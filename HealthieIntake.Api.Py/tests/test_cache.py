@@ -0,0 +1,195 @@
+"""AsyncTTLCache: coalescing, TTLs, stale-while-revalidate and the form cache"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from services import cache as cache_module
+from services.cache import AsyncTTLCache
+from services.resilience import DeadlineExceededError, call_timeout, deadline, remaining_time
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    """Controls the cache's notion of time (not asyncio's)"""
+    fake = Clock()
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(monotonic=fake.monotonic))
+    return fake
+
+
+class Loader:
+    """Loader double that counts calls and can be held open"""
+
+    def __init__(self, *values):
+        self.values = list(values)
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        value = self.values.pop(0)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
+async def test_concurrent_misses_share_one_load(clock):
+    cache = AsyncTTLCache(ttl=60)
+    loader = Loader("form")
+    loader.release.clear()
+
+    waiters = [asyncio.create_task(cache.get_or_load("f1", loader)) for _ in range(10)]
+    await asyncio.sleep(0)
+    loader.release.set()
+
+    assert await asyncio.gather(*waiters) == ["form"] * 10
+    assert loader.calls == 1
+    assert cache.stats()["coalesced"] == 9
+
+
+async def test_fresh_entries_are_served_until_ttl(clock):
+    cache = AsyncTTLCache(ttl=60)
+    loader = Loader("v1", "v2")
+
+    assert await cache.get_or_load("k", loader) == "v1"
+    clock.now += 59
+    assert await cache.get_or_load("k", loader) == "v1"
+    clock.now += 2
+    assert await cache.get_or_load("k", loader) == "v2"
+    assert loader.calls == 2
+
+
+async def test_stale_entry_is_served_while_one_refresh_runs(clock):
+    cache = AsyncTTLCache(ttl=60, stale_ttl=300)
+    loader = Loader("v1", "v2")
+    await cache.get_or_load("k", loader)
+
+    clock.now += 120
+    loader.release.clear()
+    assert await cache.get_or_load("k", loader) == "v1"
+    assert await cache.get_or_load("k", loader) == "v1"
+    loader.release.set()
+    await asyncio.sleep(0.01)
+
+    assert await cache.get_or_load("k", loader) == "v2"
+    assert loader.calls == 2
+    assert cache.stats()["stale_hits"] == 2
+
+
+async def test_empty_results_expire_after_negative_ttl(clock):
+    cache = AsyncTTLCache(ttl=300, negative_ttl=30)
+    loader = Loader([], ["patient"])
+
+    assert await cache.get_or_load("k", loader) == []
+    clock.now += 10
+    assert await cache.get_or_load("k", loader) == []
+    assert cache.stats()["negative_hits"] == 1
+    clock.now += 25
+    assert await cache.get_or_load("k", loader) == ["patient"]
+
+
+async def test_none_and_errors_are_not_cached(clock):
+    cache = AsyncTTLCache(ttl=60)
+    loader = Loader(None, RuntimeError("Healthie down"), "v")
+
+    assert await cache.get_or_load("k", loader) is None
+    with pytest.raises(RuntimeError):
+        await cache.get_or_load("k", loader)
+    assert await cache.get_or_load("k", loader) == "v"
+    assert cache.stats()["load_errors"] == 1
+
+
+async def test_invalidate_discards_a_load_in_flight(clock):
+    cache = AsyncTTLCache(ttl=60)
+    loader = Loader("old", "new")
+    loader.release.clear()
+
+    pending = asyncio.create_task(cache.get_or_load("k", loader))
+    await asyncio.sleep(0)
+    cache.invalidate("k")
+    loader.release.set()
+
+    assert await pending == "old"
+    assert await cache.get_or_load("k", loader) == "new"
+
+
+async def test_least_recently_used_entries_are_evicted(clock):
+    cache = AsyncTTLCache(ttl=60, max_entries=2)
+    for key in ("a", "b"):
+        await cache.get_or_load(key, Loader(key))
+    await cache.get_or_load("a", Loader("unused"))
+    await cache.get_or_load("c", Loader("c"))
+
+    assert await cache.get_or_load("a", Loader("reloaded")) == "a"
+    assert await cache.get_or_load("b", Loader("reloaded")) == "reloaded"
+
+
+async def test_shared_load_does_not_inherit_the_callers_deadline():
+    cache = AsyncTTLCache(ttl=60)
+    seen = []
+
+    async def loader():
+        seen.append(remaining_time())
+        await asyncio.sleep(0.05)
+        return "form"
+
+    async def impatient():
+        with deadline(0.01):
+            return await cache.get_or_load("k", loader)
+
+    first = asyncio.create_task(impatient())
+    await asyncio.sleep(0)
+    patient = asyncio.create_task(cache.get_or_load("k", loader))
+
+    with pytest.raises(DeadlineExceededError):
+        await first
+    assert await patient == "form"
+    assert seen == [None]
+
+
+async def test_stale_refresh_outlives_the_request_that_started_it(clock):
+    cache = AsyncTTLCache(ttl=60, stale_ttl=300)
+    await cache.get_or_load("k", Loader("v1"))
+
+    async def slow_refresh():
+        await asyncio.sleep(0.03)
+        call_timeout(10)  # Like an upstream call, fails once a deadline has passed
+        return "v2"
+
+    clock.now += 120
+    with deadline(0.01):
+        assert await cache.get_or_load("k", slow_refresh) == "v1"
+    await asyncio.sleep(0.05)
+
+    assert await cache.get_or_load("k", Loader("unused")) == "v2"
+
+
+async def test_form_route_loads_each_form_once(app_client, monkeypatch):
+    import main
+    from models import CustomModuleForm
+
+    calls = []
+
+    async def get_custom_form_async(form_id):
+        calls.append(form_id)
+        await asyncio.sleep(0.05)
+        return CustomModuleForm(id=form_id, name="Intake", custom_modules=[])
+
+    monkeypatch.setattr(main.healthie_client, "get_custom_form_async", get_custom_form_async)
+    main.form_cache.invalidate()
+
+    responses = await asyncio.gather(*(app_client.get("/api/healthie/forms/cache-test") for _ in range(5)))
+
+    assert [r.status_code for r in responses] == [200] * 5
+    assert calls == ["cache-test"]
+    main.form_cache.invalidate()
@@ -0,0 +1,130 @@
+"""DraftWriteBuffer: write-behind of draft autosaves"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete
+
+from models.database import IntakeRecord
+from models.intake import DraftPatch, IntakeSubmission
+from repositories import IntakeRepository
+from services.draft_buffer import DraftWriteBuffer
+
+
+@pytest.fixture
+async def buffer(session_maker, patient_id):
+    """Buffer without its background loop; the patient's drafts are deleted afterwards"""
+    buffer = DraftWriteBuffer(session_maker, flush_interval=3600)
+    yield buffer
+    async with session_maker() as session:
+        await session.execute(delete(IntakeRecord).where(IntakeRecord.patient_healthie_id == patient_id))
+        await session.commit()
+
+
+def draft(patient_id: str, step: str = "1", **form_data) -> IntakeSubmission:
+    return IntakeSubmission(patient_healthie_id=patient_id, current_step=step, form_data=form_data)
+
+
+async def stored(session_maker, patient_id: str):
+    async with session_maker() as session:
+        return await IntakeRepository(session).get_draft_by_healthie_id(patient_id)
+
+
+async def test_saves_are_acknowledged_and_written_once_on_flush(buffer, session_maker, patient_id):
+    for i in range(5):
+        assert await buffer.save(draft(patient_id, answer=i)) is None
+    assert await stored(session_maker, patient_id) is None
+
+    assert await buffer.flush() == 1
+    row = await stored(session_maker, patient_id)
+    assert row["form_data"] == {"answer": 4}
+    assert await buffer.save(draft(patient_id, answer=5)) == row["id"]
+    assert buffer.stats()["rows_written"] == 1
+
+
+async def test_step_change_is_written_immediately(buffer, session_maker, patient_id):
+    await buffer.save(draft(patient_id, "1", answer=1))
+    await buffer.save(draft(patient_id, "2", answer=2))
+
+    row = await stored(session_maker, patient_id)
+    assert row["current_step"] == "2"
+    assert buffer.stats()["dirty"] == 0
+
+
+async def test_max_dirty_triggers_a_flush(session_maker, buffer, patient_id):
+    buffer.max_dirty = 2
+    await buffer.save(draft(patient_id))
+    await buffer.save(draft(f"{patient_id}-b"))
+    try:
+        assert buffer.stats()["dirty"] == 0
+        assert (await stored(session_maker, f"{patient_id}-b")) is not None
+    finally:
+        async with session_maker() as session:
+            await session.execute(delete(IntakeRecord).where(IntakeRecord.patient_healthie_id == f"{patient_id}-b"))
+            await session.commit()
+
+
+async def test_patch_applies_only_to_the_current_version(buffer, session_maker, patient_id):
+    saved = draft(patient_id, answers={"a": 1, "b": 2})
+    await buffer.save(saved)
+    version = saved.last_updated_at
+
+    result = await buffer.patch(patient_id, DraftPatch(last_updated_at=version, merge_patch={"answers": {"b": None, "c": 3}}))
+    assert result is not None
+    assert await buffer.patch(patient_id, DraftPatch(last_updated_at=version, merge_patch={"x": 1})) is None
+    assert buffer.current_version(patient_id) == result["last_updated_at"]
+
+    await buffer.flush_patient(patient_id)
+    assert (await stored(session_maker, patient_id))["form_data"] == {"answers": {"a": 1, "c": 3}}
+
+
+async def test_patch_loads_a_stored_draft_into_the_buffer(buffer, session_maker, patient_id):
+    async with session_maker() as session:
+        repo = IntakeRepository(session)
+        saved = draft(patient_id, answer=1)
+        draft_id = await repo.save_draft(saved)
+
+    result = await buffer.patch(patient_id, DraftPatch(last_updated_at=saved.last_updated_at, merge_patch={"answer": 2}))
+    assert result["id"] == draft_id
+    assert await buffer.patch(f"{patient_id}-none", DraftPatch(last_updated_at=datetime.utcnow())) is None
+
+
+async def test_release_writes_and_forgets_discard_only_forgets(buffer, session_maker, patient_id):
+    await buffer.save(draft(patient_id, answer=1))
+    await buffer.release(patient_id)
+    assert (await stored(session_maker, patient_id))["form_data"] == {"answer": 1}
+    assert buffer.current_version(patient_id) is None
+
+    await buffer.save(draft(patient_id, answer=2))
+    await buffer.discard(patient_id)
+    await buffer.flush()
+    assert (await stored(session_maker, patient_id))["form_data"] == {"answer": 1}
+
+
+async def test_stale_copy_never_overwrites_a_newer_stored_draft(buffer, session_maker, patient_id):
+    older = draft(patient_id, answer="buffered")
+    await buffer.save(older)
+    async with session_maker() as session:
+        newer = draft(patient_id, answer="other worker")
+        newer.last_updated_at = older.last_updated_at + timedelta(seconds=5)
+        await IntakeRepository(session).save_drafts([newer])
+
+    await buffer.flush()
+    assert (await stored(session_maker, patient_id))["form_data"] == {"answer": "other worker"}
+
+
+async def test_close_drains_dirty_drafts_and_retries_failures(session_maker, buffer, patient_id):
+    failures = [RuntimeError("connection lost")]
+
+    def flaky_session_maker():
+        if failures:
+            raise failures.pop()
+        return session_maker()
+
+    buffer.session_maker = flaky_session_maker
+    buffer.start()
+    await buffer.save(draft(patient_id, answer="last"))
+    await buffer.close()
+
+    assert buffer.stats()["flush_errors"] == 1
+    assert buffer.stats()["dirty"] == 0
+    assert (await stored(session_maker, patient_id))["form_data"] == {"answer": "last"}
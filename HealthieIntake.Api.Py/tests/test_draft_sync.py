@@ -0,0 +1,78 @@
+"""DraftSyncHub: queued publishing and cross-worker interest over LISTEN/NOTIFY"""
+import asyncio
+
+import orjson
+import pytest
+
+from services.draft_sync import DraftSyncHub, draft_event, listen_dsn
+
+
+@pytest.fixture
+async def workers(database_url):
+    """Two hubs on the same channel, as two API workers would run them"""
+    hubs = [DraftSyncHub(listen_dsn(database_url), keepalive_seconds=1.0) for _ in range(2)]
+    for hub in hubs:
+        await hub.start()
+    yield hubs
+    for hub in hubs:
+        await hub.close()
+
+
+async def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.02)
+
+
+async def test_events_without_subscribers_are_skipped(workers, patient_id):
+    first, second = workers
+    first.publish(draft_event("saved", patient_id))
+
+    assert first.publish_skipped == 1
+    assert first.stats()["queued"] == 0
+
+
+async def test_change_on_one_worker_reaches_a_socket_on_another(workers, patient_id):
+    first, second = workers
+    subscription = first.subscribe(patient_id, client_id="tablet")
+    await first.announced(subscription)
+    await wait_for(lambda: second.interested(patient_id))
+
+    second.publish(draft_event("saved", patient_id, "2026-10-18T10:00:00", origin="phone"))
+    second.publish(draft_event("saved", patient_id, "2026-10-18T10:00:01", origin="tablet"))
+    second.publish(draft_event("saved", patient_id, "2026-10-18T10:00:02", origin="phone"))
+
+    received = [orjson.loads(await asyncio.wait_for(subscription.get(), 5)) for _ in range(2)]
+    # The tablet's own change is not echoed back
+    assert [event["last_updated_at"] for event in received] == [
+        "2026-10-18T10:00:00.000000", "2026-10-18T10:00:02.000000"
+    ]
+    assert subscription.queue.empty()
+
+
+async def test_interest_is_withdrawn_after_the_last_socket_closes(workers, patient_id):
+    first, second = workers
+    subscription = first.subscribe(patient_id)
+    await first.announced(subscription)
+    await wait_for(lambda: second.interested(patient_id))
+
+    first.unsubscribe(subscription)
+    await wait_for(lambda: not second.interested(patient_id))
+
+    second.publish(draft_event("deleted", patient_id))
+    assert second.publish_skipped == 1
+
+
+async def test_a_new_worker_learns_existing_subscriptions(database_url, workers, patient_id):
+    first, _ = workers
+    subscription = first.subscribe(patient_id)
+    await first.announced(subscription)
+
+    late = DraftSyncHub(listen_dsn(database_url), keepalive_seconds=1.0)
+    await late.start()
+    try:
+        # Its hello makes the others announce their patients right away
+        await wait_for(lambda: late.interested(patient_id), timeout=0.9)
+    finally:
+        await late.close()
@@ -0,0 +1,70 @@
+"""IntakeRepository.save_draft / save_drafts (single-statement draft upsert)"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from models.database import IntakeRecord
+from models.intake import IntakeSubmission
+from repositories import IntakeRepository
+
+
+def draft(patient_id: str, **form_data) -> IntakeSubmission:
+    return IntakeSubmission(patient_healthie_id=patient_id, current_step="1", form_data=form_data)
+
+
+async def draft_count(session, patient_id: str) -> int:
+    result = await session.execute(
+        select(func.count()).select_from(IntakeRecord)
+        .where(IntakeRecord.patient_healthie_id == patient_id, IntakeRecord.status == "draft")
+    )
+    return result.scalar_one()
+
+
+async def test_save_draft_updates_the_same_row(session, patient_id):
+    repo = IntakeRepository(session)
+    first = await repo.save_draft(draft(patient_id, step=1))
+    second = await repo.save_draft(draft(patient_id, step=2))
+
+    assert first == second
+    assert await draft_count(session, patient_id) == 1
+    stored = await repo.get_draft_by_healthie_id(patient_id)
+    assert stored["form_data"] == {"step": 2}
+
+
+async def test_upserts_survive_generic_plans_on_a_pooled_connection(database_url, patient_id):
+    # asyncpg prepares the statement once per connection; PostgreSQL switches to a
+    # generic plan after five executions, which must still match the partial index
+    engine = create_async_engine(database_url, poolclass=AsyncAdaptedQueuePool, pool_size=1, max_overflow=0)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    try:
+        draft_ids = set()
+        for i in range(8):
+            async with session_maker() as session:
+                draft_ids.add(await IntakeRepository(session).save_draft(draft(patient_id, i=i)))
+        assert len(draft_ids) == 1
+        draft_id = draft_ids.pop()
+
+        for i in range(8):
+            async with session_maker() as session:
+                written = await IntakeRepository(session).save_drafts([draft(patient_id, batch=i)])
+                assert written == {patient_id: draft_id}
+
+        async with session_maker() as session:
+            stored = await IntakeRepository(session).get_draft_by_healthie_id(patient_id)
+            assert stored["form_data"] == {"batch": 7}
+    finally:
+        await engine.dispose()
+
+
+async def test_save_drafts_never_overwrites_a_newer_draft(session, patient_id):
+    repo = IntakeRepository(session)
+    await repo.save_draft(draft(patient_id, version="new"))
+
+    stale = draft(patient_id, version="old")
+    stale.last_updated_at = datetime.utcnow() - timedelta(minutes=5)
+    assert await repo.save_drafts([stale]) == {}
+
+    stored = await repo.get_draft_by_healthie_id(patient_id)
+    assert stored["form_data"] == {"version": "new"}
@@ -0,0 +1,50 @@
+"""IntakeSubmission.to_form_answer_group_input answer serialization"""
+import pytest
+
+from models.intake import IntakeSubmission, form_answer_text
+
+
+def answers_sent(**answers) -> dict:
+    intake = IntakeSubmission(
+        patient_healthie_id="123",
+        form_data={"answers": {key.lstrip("_"): value for key, value in answers.items()}}
+    )
+    group = intake.to_form_answer_group_input("999")
+    return {answer.custom_module_id: answer.answer for answer in group.form_answers}
+
+
+def test_strings_are_sent_as_is():
+    assert answers_sent(_1="Jane O'Neil", _2="  spaced  ") == {"1": "Jane O'Neil", "2": "  spaced  "}
+
+
+def test_lists_are_joined_like_checkbox_selections():
+    assert answers_sent(_1=["Asthma", "Diabetes"], _2=["Yes", "", None, 3, True]) == {
+        "1": "Asthma, Diabetes",
+        "2": "Yes, 3, true",
+    }
+
+
+def test_bools_are_lowercase_words():
+    assert answers_sent(_1=True, _2=False) == {"1": "true", "2": "false"}
+
+
+@pytest.mark.parametrize("value, text", [
+    (42, "42"),
+    (-7, "-7"),
+    (3.0, "3"),
+    (2.5, "2.5"),
+    (0.1, "0.1"),
+    (1e-05, "0.00001"),
+    (1e20, "100000000000000000000"),
+])
+def test_numbers_use_plain_decimal_notation(value, text):
+    assert form_answer_text(value) == text
+    assert answers_sent(_1=value) == {"1": text}
+
+
+def test_dicts_are_compact_json():
+    assert answers_sent(_1={"name": "Ann", "phone": ["555", 1]}) == {"1": '{"name":"Ann","phone":["555",1]}'}
+
+
+def test_empty_answers_and_derived_keys_are_not_sent():
+    assert answers_sent(_1=None, _2="", _3=[], _4=["", None], _5="x", _5_typed_name="Jane") == {"5": "x"}
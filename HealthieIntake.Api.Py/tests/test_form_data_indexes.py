@@ -0,0 +1,35 @@
+"""form_data queries use the indexes from migrations/006 (EXPLAIN)"""
+import pytest
+from sqlalchemy import text
+
+from benchmarks.explain_form_data_indexes import LOAD_SQL, explain, plan_nodes, queries
+
+ROWS = 20_000
+
+
+@pytest.fixture
+async def loaded(engine):
+    """Connection with ROWS synthetic intakes in an open transaction, rolled back afterwards"""
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        await conn.execute(text(LOAD_SQL), {"start": 1, "stop": ROWS})
+        await conn.execute(text("ANALYZE intakes"))
+        yield conn
+        await transaction.rollback()
+
+
+def test_migration_006_builds_indexes_concurrently():
+    from migrate import discover
+
+    migration = next(m for m in discover() if m.version == 6)
+    assert not migration.transactional()
+    assert all("CONCURRENTLY" in s for s in migration.statements() if s.startswith("CREATE INDEX"))
+
+
+@pytest.mark.parametrize("case", [c for c in queries(ROWS) if c["index"]], ids=lambda c: c["name"])
+async def test_query_plan_uses_its_index(loaded, case):
+    nodes = list(plan_nodes((await explain(loaded, case["statement"]))["Plan"]))
+
+    used = {node["Index Name"] for node in nodes if "Index Name" in node}
+    assert case["index"] in used
+    assert not any(node["Node Type"] == "Seq Scan" for node in nodes)
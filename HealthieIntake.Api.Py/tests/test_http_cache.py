@@ -0,0 +1,70 @@
+"""ETag helpers and If-None-Match revalidation of intake records"""
+import pytest
+from starlette.requests import Request
+
+from http_cache import etag_matches, form_etag, intake_etag
+
+
+def request_with(if_none_match: str) -> Request:
+    return Request({"type": "http", "headers": [(b"if-none-match", if_none_match.encode())]})
+
+
+def test_etags_change_with_the_version_and_variant():
+    etag = intake_etag("id-1", "2025-01-01T00:00:00")
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == intake_etag("id-1", "2025-01-01T00:00:00")
+    assert etag != intake_etag("id-1", "2025-01-01T00:00:01")
+    assert etag != intake_etag("id-1", "2025-01-01T00:00:00", "hydrated")
+    assert form_etag("{}") != form_etag('{"a":1}')
+
+
+@pytest.mark.parametrize("header, matches", [
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"xyz", W/"abc"', True),
+    ("*", True),
+    ('"xyz"', False),
+    ("abc", False),
+])
+def test_if_none_match_uses_weak_comparison(header, matches):
+    assert etag_matches(request_with(header), '"abc"') is matches
+
+
+def test_missing_header_never_matches():
+    assert etag_matches(Request({"type": "http", "headers": []}), '"abc"') is False
+
+
+async def test_intake_is_revalidated_until_it_changes(app_client, patient_id):
+    saved = await app_client.post("/api/intake/draft", json={
+        "patient_healthie_id": patient_id, "current_step": "1", "form_data": {"a": 1}
+    })
+    assert saved.status_code == 200, saved.text
+    url = f"/api/intake/{saved.json()['draft_id']}"
+
+    first = await app_client.get(url)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    revalidated = await app_client.get(url, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+    assert (await app_client.get(url, headers={"If-None-Match": f"W/{etag}"})).status_code == 304
+
+    hydrated = await app_client.get(url, params={"hydrate_blobs": "true"}, headers={"If-None-Match": etag})
+    assert hydrated.status_code == 200
+
+    await app_client.post("/api/intake/draft", json={
+        "patient_healthie_id": patient_id, "current_step": "2", "form_data": {"a": 2}
+    })
+    changed = await app_client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["form_data"] == {"a": 2}
+
+
+async def test_unknown_intake_is_404_even_with_a_validator(app_client):
+    response = await app_client.get(
+        "/api/intake/00000000-0000-0000-0000-000000000000", headers={"If-None-Match": "*"}
+    )
+    assert response.status_code == 404
@@ -0,0 +1,85 @@
+"""Idempotency-Key on POST /api/intake/submit"""
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import delete, func, select
+
+from models.database import IntakeIdempotencyKey, IntakeRecord
+
+
+@pytest.fixture
+async def submitted(session, patient_id):
+    """Counts the patient's completed intakes; deletes their intakes afterwards"""
+    async def count() -> int:
+        result = await session.execute(
+            select(func.count()).select_from(IntakeRecord)
+            .where(IntakeRecord.patient_healthie_id == patient_id, IntakeRecord.status == "completed")
+        )
+        await session.commit()
+        return result.scalar_one()
+
+    yield count
+    await session.execute(delete(IntakeRecord).where(IntakeRecord.patient_healthie_id == patient_id))
+    await session.commit()
+
+
+def body(patient_id: str, **form_data) -> dict:
+    return {
+        "patient_healthie_id": patient_id, "first_name": "Jane", "last_name": "Doe",
+        "email": "jane@example.com", "date_of_birth": "1990-01-01", "form_data": form_data,
+    }
+
+
+def submit(app_client, json: dict, key: str):
+    return app_client.post("/api/intake/submit", json=json, headers={"Idempotency-Key": key})
+
+
+async def test_retry_replays_the_first_result(app_client, patient_id, submitted, session):
+    key = str(uuid.uuid4())
+    first = await submit(app_client, body(patient_id, answer="yes"), key)
+    # Client-side timestamps are not part of the request identity
+    retry = await submit(app_client, {**body(patient_id, answer="yes"), "created_at": "2025-01-01T00:00:00"}, key)
+
+    assert first.status_code == retry.status_code == 200, first.text
+    assert "idempotent-replayed" not in first.headers
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.json() == first.json()
+    assert await submitted() == 1
+
+    stored = await session.get(IntakeIdempotencyKey, key)
+    assert str(stored.intake_id) == first.json()["intake_id"]
+
+
+async def test_key_reused_with_another_body_is_rejected(app_client, patient_id, submitted):
+    key = str(uuid.uuid4())
+    assert (await submit(app_client, body(patient_id, answer="yes"), key)).status_code == 200
+
+    changed = await submit(app_client, body(patient_id, answer="no"), key)
+    assert changed.status_code == 422
+    assert changed.json()["detail"] == "Idempotency-Key was already used with a different request body"
+    assert await submitted() == 1
+
+
+async def test_concurrent_submits_with_one_key_create_one_intake(app_client, patient_id, submitted):
+    key = str(uuid.uuid4())
+    responses = await asyncio.gather(*(submit(app_client, body(patient_id, answer="yes"), key) for _ in range(4)))
+
+    assert [r.status_code for r in responses] == [200] * 4, [r.text for r in responses]
+    assert len({r.json()["intake_id"] for r in responses}) == 1
+    assert sum(r.headers.get("idempotent-replayed") == "true" for r in responses) == 3
+    assert await submitted() == 1
+
+
+async def test_without_a_key_every_submit_creates_an_intake(app_client, patient_id, submitted):
+    for _ in range(2):
+        response = await app_client.post("/api/intake/submit", json=body(patient_id))
+        assert response.status_code == 200
+    assert await submitted() == 2
+
+
+@pytest.mark.parametrize("key", ["", "k" * 256])
+async def test_key_length_is_validated(app_client, patient_id, submitted, key):
+    response = await submit(app_client, body(patient_id), key)
+    assert response.status_code == 400
+    assert await submitted() == 0
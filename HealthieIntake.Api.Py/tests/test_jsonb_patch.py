@@ -0,0 +1,126 @@
+"""Merge patch and JSON Patch applied in SQL (repositories/jsonb_patch.py)"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import literal, select
+from sqlalchemy.dialects.postgresql import JSONB
+
+from models.intake import DraftPatch, IntakeSubmission, JsonPatchOperation
+from repositories import IntakeRepository
+from repositories.jsonb_patch import apply_merge_patch, json_patch_expression, merge_patch_expression
+
+DOC = {
+    "answers": {"19056452": "Yes", "19056453": "1985-05-15"},
+    "emergency_contact": {"name": "Ann", "phone": "5550100"},
+    "medications": ["aspirin", "ibuprofen"],
+    "notes": "x",
+}
+
+
+async def merge_in_sql(session, doc, patch):
+    return (await session.execute(select(merge_patch_expression(literal(doc, JSONB), patch)))).scalar_one()
+
+
+async def json_patch_in_sql(session, doc, *operations):
+    ops = [JsonPatchOperation(**operation) for operation in operations]
+    return (await session.execute(select(json_patch_expression(literal(doc, JSONB), ops)))).scalar_one()
+
+
+@pytest.mark.parametrize("patch", [
+    {"answers": {"19056452": "No"}},
+    {"answers": {"19056453": None}, "notes": None},
+    {"emergency_contact": {"phone": {"home": "1", "cell": "2"}}},
+    {"medications": {"current": ["x"]}},
+    {"new": {"deep": {"er": 1}}, "notes": ["a"]},
+])
+async def test_merge_patch_sql_matches_rfc_7396(session, patch):
+    assert await merge_in_sql(session, DOC, patch) == apply_merge_patch(DOC, patch)
+
+
+async def test_json_patch_add_inserts_into_arrays(session):
+    patched = await json_patch_in_sql(
+        session, DOC,
+        {"op": "add", "path": "/medications/1", "value": "metformin"},
+        {"op": "add", "path": "/medications/0", "value": "first"},
+        {"op": "add", "path": "/medications/-", "value": "last"},
+        {"op": "add", "path": "/medications/5", "value": "end"},
+    )
+    assert patched["medications"] == ["first", "aspirin", "metformin", "ibuprofen", "last", "end"]
+
+
+async def test_json_patch_sees_earlier_operations(session):
+    patched = await json_patch_in_sql(
+        session, DOC,
+        {"op": "add", "path": "/allergies", "value": {}},
+        {"op": "add", "path": "/allergies/penicillin", "value": "rash"},
+        {"op": "replace", "path": "/allergies/penicillin", "value": "hives"},
+        {"op": "remove", "path": "/medications/0"},
+        {"op": "replace", "path": "/emergency_contact/name", "value": None},
+        {"op": "remove", "path": "/notes"},
+    )
+    assert patched == {
+        "answers": DOC["answers"],
+        "emergency_contact": {"name": None, "phone": "5550100"},
+        "medications": ["ibuprofen"],
+        "allergies": {"penicillin": "hives"},
+    }
+
+
+async def test_json_patch_escaped_pointer_tokens(session):
+    patched = await json_patch_in_sql(session, {"a/b": {"c~d": 1}}, {"op": "replace", "path": "/a~1b/c~0d", "value": 2})
+    assert patched == {"a/b": {"c~d": 2}}
+
+
+@pytest.mark.parametrize("operation", [
+    {"op": "replace", "path": "/missing", "value": 1},
+    {"op": "remove", "path": "/answers/19056499"},
+    {"op": "remove", "path": "/medications/2"},
+    {"op": "replace", "path": "/medications/-", "value": 1},
+    {"op": "add", "path": "/medications/3", "value": 1},
+    {"op": "add", "path": "/medications/01", "value": 1},
+    {"op": "add", "path": "/missing/child", "value": 1},
+    {"op": "add", "path": "/notes/child", "value": 1},
+])
+async def test_json_patch_rejects_paths_that_do_not_apply(patient_id, session, operation):
+    repo = IntakeRepository(session)
+    await repo.save_draft(IntakeSubmission(patient_healthie_id=patient_id, current_step="1", form_data=DOC))
+    version = datetime.fromisoformat(await repo.get_draft_last_updated_at(patient_id))
+
+    with pytest.raises(ValueError, match="Cannot"):
+        await repo.patch_draft(patient_id, DraftPatch(last_updated_at=version, json_patch=[operation]))
+
+    # Nothing was written and the session is usable
+    stored = await repo.get_draft_by_healthie_id(patient_id)
+    assert stored["form_data"] == DOC
+
+
+def test_json_patch_root_must_be_an_object():
+    with pytest.raises(ValueError):
+        json_patch_expression(literal(DOC, JSONB), [JsonPatchOperation(op="replace", path="", value=[1])])
+
+
+async def test_patch_route_answers_422_for_a_missing_path_and_409_for_a_stale_version(app_client, patient_id):
+    saved = await app_client.post("/api/intake/draft", json={
+        "patient_healthie_id": patient_id, "current_step": "1", "form_data": DOC
+    })
+    assert saved.status_code == 200, saved.text
+    version = saved.json()["last_updated_at"]
+    url = f"/api/intake/draft/{patient_id}"
+
+    missing = await app_client.patch(url, json={
+        "last_updated_at": version, "json_patch": [{"op": "replace", "path": "/answers/1", "value": "x"}]
+    })
+    assert missing.status_code == 422
+    assert missing.json()["detail"] == "Cannot replace /answers/1: path does not exist"
+
+    inserted = await app_client.patch(url, json={
+        "last_updated_at": version, "json_patch": [{"op": "add", "path": "/medications/0", "value": "x"}]
+    })
+    assert inserted.status_code == 200
+
+    stale = await app_client.patch(url, json={
+        "last_updated_at": version, "json_patch": [{"op": "replace", "path": "/answers/1", "value": "x"}]
+    })
+    assert stale.status_code == 409
+    draft = (await app_client.get(url)).json()
+    assert draft["form_data"]["medications"] == ["x", "aspirin", "ibuprofen"]
@@ -0,0 +1,101 @@
+"""Keyset pagination of admin intake summaries (list_summaries and cursors)"""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete
+
+from models.database import IntakeRecord
+from repositories import IntakeRepository
+
+# Rows are dated in a window no real intake falls into, and listed with it as filter
+WINDOW_START = datetime(2001, 1, 1, tzinfo=timezone.utc)
+WINDOW_END = WINDOW_START + timedelta(days=1)
+
+
+def record(patient_id: str, created_at: datetime, n: int) -> IntakeRecord:
+    return IntakeRecord(
+        patient_healthie_id=patient_id, first_name=f"First{n}", last_name="Keyset",
+        email=f"keyset{n}@example.com", date_of_birth="1990-01-01", status="completed",
+        created_at=created_at, form_data={"large": "x" * 100},
+    )
+
+
+def records(patient_id: str):
+    """25 intakes over 10 timestamps, so most pages end inside a run of equal created_at"""
+    return [
+        record(patient_id, WINDOW_START + timedelta(minutes=n // 3), n)
+        for n in range(25)
+    ]
+
+
+async def walk(repo: IntakeRepository, limit: int):
+    pages, after = [], None
+    while True:
+        page, after = await repo.list_summaries(
+            limit=limit, after=after, created_from=WINDOW_START, created_to=WINDOW_END
+        )
+        pages.append(page)
+        if after is None:
+            return pages
+
+
+@pytest.mark.parametrize("limit", [1, 4, 7, 25, 50])
+async def test_pages_cover_every_row_once_in_order(session, patient_id, limit):
+    rows = records(patient_id)
+    session.add_all(rows)
+    await session.flush()
+    repo = IntakeRepository(session)
+
+    pages = await walk(repo, limit)
+    listed = [summary["id"] for page in pages for summary in page]
+
+    expected = sorted(rows, key=lambda r: (r.created_at, r.id), reverse=True)
+    assert listed == [str(r.id) for r in expected]
+    assert all(len(page) == limit for page in pages[:-1])
+    assert "form_data" not in pages[0][0]
+    await session.rollback()
+
+
+def test_cursor_round_trip():
+    from main import decode_cursor, encode_cursor
+
+    position = (datetime(2025, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc), uuid.uuid4())
+    cursor = encode_cursor(position)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == position
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "bm9waXBl", ""])
+def test_malformed_cursors_are_rejected(cursor):
+    from main import decode_cursor
+
+    with pytest.raises(ValueError):
+        decode_cursor(cursor or "=")
+
+
+async def test_route_follows_next_cursor_and_rejects_a_bad_one(app_client, session, patient_id):
+    rows = records(patient_id)
+    session.add_all(rows)
+    await session.commit()
+    try:
+        params = {"limit": 10, "created_from": WINDOW_START.isoformat(), "created_to": WINDOW_END.isoformat()}
+        listed, cursor = [], None
+        while True:
+            response = await app_client.get("/api/admin/intakes", params={**params, "cursor": cursor} if cursor else params)
+            assert response.status_code == 200, response.text
+            body = response.json()
+            listed += [summary["id"] for summary in body["intakes"]]
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+
+        assert len(listed) == len(set(listed)) == len(rows)
+        assert body["total_count"] == len(rows)
+
+        bad = await app_client.get("/api/admin/intakes", params={"cursor": "garbage"})
+        assert bad.status_code == 400
+        assert bad.json()["detail"] == "Invalid cursor"
+    finally:
+        await session.execute(delete(IntakeRecord).where(IntakeRecord.patient_healthie_id == patient_id))
+        await session.commit()
@@ -0,0 +1,98 @@
+"""MedicationIndex and the openFDA fallback behind /api/medications/search"""
+import httpx
+import pytest
+
+from services.medication_index import MedicationIndex, OpenFdaMedicationSearch
+
+PRODUCTS = [
+    {"brand_name": "Advil", "generic_name": "Ibuprofen"},
+    {"brand_name": "Motrin IB", "generic_name": "IBUPROFEN"},
+    {"brand_name": "Ibuprofen and Famotidine", "generic_name": "ibuprofen and famotidine"},
+    {"brand_name": "Children's Ibuprofen", "generic_name": "Ibuprofen"},
+]
+
+
+def openfda(requests: list, products=PRODUCTS, status_code: int = 200) -> OpenFdaMedicationSearch:
+    """Fallback search answering from a canned openFDA response"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if status_code != 200:
+            return httpx.Response(status_code, json={"error": {"code": "NOT_FOUND"}})
+        return httpx.Response(200, json={"results": products})
+
+    search = OpenFdaMedicationSearch()
+    search._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return search
+
+
+def test_index_ranks_name_prefixes_before_later_words():
+    index = MedicationIndex.from_products(PRODUCTS)
+
+    # "Ibuprofen" is on four products; "Children's Ibuprofen" only matches on a later word
+    assert index.search("ibupro") == ["Ibuprofen", "Ibuprofen and Famotidine", "Children's Ibuprofen"]
+    assert index.search("famo") == ["Ibuprofen and Famotidine"]
+    assert index.search("  ") == []
+
+
+async def test_fallback_queries_openfda_once_per_query():
+    requests = []
+    search = openfda(requests)
+
+    assert await search.search("Ibupro", 2) == ["Ibuprofen", "Ibuprofen and Famotidine"]
+    assert await search.search("ibupro", 2) == ["Ibuprofen", "Ibuprofen and Famotidine"]
+
+    assert len(requests) == 1
+    assert requests[0].url.params["search"] == "brand_name:ibupro* OR generic_name:ibupro*"
+    await search.close()
+
+
+@pytest.mark.parametrize("query, term", [
+    ('"Tylenol" (PM)', "tylenol"),
+    ("brand_name:advil", "brand"),
+    ("+ibu*", "ibu"),
+    ("Co-Q10", "co"),
+])
+async def test_fallback_keeps_query_syntax_out_of_the_search(query, term):
+    requests = []
+    search = openfda(requests)
+
+    await search.search(query)
+    assert requests[0].url.params["search"] == f"brand_name:{term}* OR generic_name:{term}*"
+    await search.close()
+
+
+async def test_fallback_skips_openfda_when_no_plain_characters_remain():
+    requests = []
+    search = openfda(requests)
+
+    assert await search.search(':"()+') == []
+    assert await search._fetch("\u00e9\u00e8", 10) == []
+    assert requests == []
+    await search.close()
+
+
+async def test_fallback_treats_openfda_404_as_no_matches():
+    search = openfda([], status_code=404)
+    assert await search.search("zzzz") == []
+    await search.close()
+
+
+async def test_fallback_raises_when_openfda_fails():
+    search = openfda([], status_code=500)
+    with pytest.raises(httpx.HTTPStatusError):
+        await search.search("ibu")
+    await search.close()
+
+
+async def test_route_uses_the_fallback_without_an_index(app_client, monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "medication_index", None)
+    monkeypatch.setattr(main, "medication_fallback", openfda([]))
+    response = await app_client.get("/api/medications/search", params={"q": "advil"})
+    assert response.status_code == 200
+    assert response.json() == ["Advil"]
+
+    monkeypatch.setattr(main, "medication_fallback", openfda([], status_code=500))
+    response = await app_client.get("/api/medications/search", params={"q": "motrin"})
+    assert response.status_code == 503
@@ -0,0 +1,72 @@
+"""migrate.py runner: no-transaction migrations"""
+from sqlalchemy import text
+
+from migrate import VERSION_TABLE, Migration, migrate
+
+VERSION = 900
+TABLE = "migrate_concurrent_test"
+INDEX = "ix_migrate_concurrent_test_value"
+
+MIGRATION = f"""-- Migration: test
+-- migrate: no-transaction
+
+CREATE TABLE IF NOT EXISTS {TABLE} (id integer, value integer);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX}
+ON {TABLE} (value);
+"""
+
+
+async def index_state(conn):
+    result = await conn.execute(text(
+        "SELECT indisvalid, indisunique FROM pg_index WHERE indexrelid = to_regclass(:name)"
+    ), {"name": INDEX})
+    return result.one_or_none()
+
+
+async def test_no_transaction_migration_rebuilds_an_invalid_index(engine, tmp_path):
+    (tmp_path / f"{VERSION}_concurrent_test.sql").write_text(MIGRATION)
+    autocommit = {"isolation_level": "AUTOCOMMIT"}
+    try:
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(**autocommit)
+            # A concurrent unique build over duplicates fails and leaves an INVALID index behind
+            await conn.execute(text(f"CREATE TABLE {TABLE} (id integer, value integer)"))
+            await conn.execute(text(f"INSERT INTO {TABLE} VALUES (1, 7), (2, 7)"))
+            try:
+                await conn.execute(text(f"CREATE UNIQUE INDEX CONCURRENTLY {INDEX} ON {TABLE} (value)"))
+            except Exception:
+                pass
+            assert tuple(await index_state(conn)) == (False, True)
+
+        applied = await migrate(engine, directory=str(tmp_path))
+
+        assert [m.version for m in applied] == [VERSION]
+        async with engine.connect() as conn:
+            assert tuple(await index_state(conn)) == (True, False)
+            recorded = await conn.execute(text(f"SELECT count(*) FROM {VERSION_TABLE} WHERE version = {VERSION}"))
+            assert recorded.scalar_one() == 1
+    finally:
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(**autocommit)
+            await conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+            await conn.execute(text(f"DELETE FROM {VERSION_TABLE} WHERE version = {VERSION}"))
+
+
+def test_statements_keep_quoted_semicolons(tmp_path):
+    path = tmp_path / "901_split_test.sql"
+    path.write_text(
+        "-- migrate: no-transaction\n"
+        "DO $$ BEGIN PERFORM 1; END $$;\n"
+        "DO $body$ BEGIN RAISE NOTICE 'a;b'; END $body$;\n"
+        "SELECT 'it''s; fine';\n"
+        "SELECT 2\n"
+    )
+    statements = Migration(901, "split_test", str(path)).statements()
+
+    assert statements == [
+        "DO $$ BEGIN PERFORM 1; END $$",
+        "DO $body$ BEGIN RAISE NOTICE 'a;b'; END $body$",
+        "SELECT 'it''s; fine'",
+        "SELECT 2",
+    ]
@@ -0,0 +1,135 @@
+"""OutboxRepository claims/leases and HealthieSyncWorker retry handling"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete, select, update
+
+from models.database import HealthieSyncOutbox
+from repositories import OutboxRepository
+from services.resilience import BulkheadFullError, CircuitOpenError
+
+PAYLOAD = {"custom_module_form_id": "999", "user_id": "123", "form_answers": []}
+
+
+class FakeHealthie:
+    """Healthie client double: raises the queued errors in order, then succeeds"""
+
+    def __init__(self, *errors: Exception):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def create_form_answer_group_async(self, input_data) -> str:
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return f"fag-{self.calls}"
+
+
+@pytest.fixture
+async def outbox(session_maker):
+    """Empty outbox table (claims would otherwise see rows from other tests)"""
+    async with session_maker() as session:
+        await session.execute(delete(HealthieSyncOutbox))
+        await session.commit()
+    yield
+    async with session_maker() as session:
+        await session.execute(delete(HealthieSyncOutbox))
+        await session.commit()
+
+
+async def add_row(session_maker, **values) -> HealthieSyncOutbox:
+    async with session_maker() as session:
+        row = OutboxRepository(session).add("create_form_answer_group", PAYLOAD)
+        for key, value in values.items():
+            setattr(row, key, value)
+        await session.commit()
+        return row
+
+
+async def load(session_maker, row_id) -> HealthieSyncOutbox:
+    async with session_maker() as session:
+        return (await session.execute(select(HealthieSyncOutbox).where(HealthieSyncOutbox.id == row_id))).scalar_one()
+
+
+def worker(session_maker, healthie, **options):
+    # Imported late: it imports database, which builds its engine from settings at import time
+    from workers.healthie_sync import HealthieSyncWorker
+    return HealthieSyncWorker(session_maker, healthie, backoff_base=60.0, **options)
+
+
+async def test_claim_takes_due_rows_and_holds_a_lease(outbox, session_maker):
+    due = await add_row(session_maker)
+    await add_row(session_maker, next_attempt_at=datetime.now(timezone.utc) + timedelta(hours=1))
+
+    async with session_maker() as session:
+        claimed = await OutboxRepository(session).claim_batch(10, lease_seconds=300)
+    assert [row.id for row in claimed] == [due.id]
+    assert claimed[0].status == "processing"
+
+    # Leased rows are not claimed again until the lease expires
+    async with session_maker() as session:
+        assert await OutboxRepository(session).claim_batch(10, lease_seconds=300) == []
+        await session.execute(
+            update(HealthieSyncOutbox).where(HealthieSyncOutbox.id == due.id)
+            .values(locked_until=datetime.now(timezone.utc) - timedelta(seconds=1))
+        )
+        await session.commit()
+    async with session_maker() as session:
+        reclaimed = await OutboxRepository(session).claim_batch(10, lease_seconds=300)
+    assert [row.id for row in reclaimed] == [due.id]
+
+
+async def test_success_marks_the_row_done(outbox, session_maker):
+    row = await add_row(session_maker)
+
+    assert await worker(session_maker, FakeHealthie()).drain() == 1
+
+    stored = await load(session_maker, row.id)
+    assert (stored.status, stored.attempts, stored.result) == ("done", 1, {"form_answer_group_id": "fag-1"})
+
+
+async def test_failures_back_off_then_dead_letter(outbox, session_maker):
+    row = await add_row(session_maker)
+    sync = worker(session_maker, FakeHealthie(RuntimeError("502"), RuntimeError("502")), max_attempts=2)
+
+    before = datetime.now(timezone.utc)
+    await sync.run_once()
+    stored = await load(session_maker, row.id)
+    assert (stored.status, stored.attempts, stored.last_error) == ("pending", 1, "502")
+    # backoff_base 60s with jitter between 0.5x and 1x
+    assert before + timedelta(seconds=29) <= stored.next_attempt_at <= before + timedelta(seconds=61)
+
+    async with session_maker() as session:
+        await session.execute(update(HealthieSyncOutbox).values(next_attempt_at=datetime.now(timezone.utc)))
+        await session.commit()
+    await sync.run_once()
+    stored = await load(session_maker, row.id)
+    assert (stored.status, stored.attempts) == ("dead", 2)
+
+    async with session_maker() as session:
+        assert await OutboxRepository(session).retry(str(row.id))
+    stored = await load(session_maker, row.id)
+    assert (stored.status, stored.attempts) == ("pending", 0)
+
+
+@pytest.mark.parametrize("error", [
+    CircuitOpenError("Circuit open for create_form_answer_group", retry_after=20.0),
+    BulkheadFullError("4 upstream calls already in flight", retry_after=20.0),
+])
+async def test_calls_not_made_do_not_count_as_attempts(outbox, session_maker, error):
+    row = await add_row(session_maker)
+    sync = worker(session_maker, FakeHealthie(error, error, error), max_attempts=2)
+
+    for _ in range(3):
+        before = datetime.now(timezone.utc)
+        await sync.run_once()
+        stored = await load(session_maker, row.id)
+        assert (stored.status, stored.attempts) == ("pending", 0)
+        assert before + timedelta(seconds=19) <= stored.next_attempt_at <= before + timedelta(seconds=31)
+        async with session_maker() as session:
+            await session.execute(update(HealthieSyncOutbox).values(next_attempt_at=datetime.now(timezone.utc)))
+            await session.commit()
+
+    await sync.run_once()
+    stored = await load(session_maker, row.id)
+    assert (stored.status, stored.attempts) == ("done", 1)
@@ -0,0 +1,100 @@
+"""Patient search caching: key normalization, negative entries and the route"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from models import Patient
+from services import cache as cache_module
+
+
+@pytest.fixture
+async def search_calls(app_client, monkeypatch):
+    """Replaces the Healthie search with a double; returns its call list and results"""
+    import main
+
+    double = SimpleNamespace(calls=[], results=[])
+
+    async def search_patients_async(first_name, last_name, dob):
+        double.calls.append((first_name, last_name, dob))
+        await asyncio.sleep(0.01)
+        return list(double.results)
+
+    monkeypatch.setattr(main.healthie_client, "search_patients_async", search_patients_async)
+    main.patient_search_cache.invalidate()
+    yield double
+    main.patient_search_cache.invalidate()
+
+
+def search(app_client, first_name="Jane", last_name="Doe", dob="1990-01-01"):
+    return app_client.post("/api/healthie/patients/search", json={
+        "first_name": first_name, "last_name": last_name, "dob": dob
+    })
+
+
+def test_key_ignores_case_and_whitespace():
+    from main import patient_search_key
+
+    assert patient_search_key(" Mary  Ann ", "O'BRIEN", "1990-01-01 ") == ("mary ann", "o'brien", "1990-01-01")
+    assert patient_search_key("Jane", "Doe", "1990-01-01") != patient_search_key("Jane", "Doe", "1990-01-02")
+
+
+async def test_equivalent_searches_share_one_healthie_call(app_client, search_calls):
+    search_calls.results = [Patient(id="1", email="jane@example.com", first_name="Jane", last_name="Doe")]
+
+    responses = await asyncio.gather(
+        search(app_client), search(app_client, first_name="jane "), search(app_client, last_name="DOE")
+    )
+    responses.append(await search(app_client))
+
+    assert [r.status_code for r in responses] == [200] * 4
+    assert all(r.json() == [{"id": "1", "email": "jane@example.com", "firstName": "Jane", "lastName": "Doe"}]
+               for r in responses)
+    assert search_calls.calls == [("Jane", "Doe", "1990-01-01")]
+
+
+async def test_no_match_is_cached_for_the_shorter_ttl(app_client, search_calls, monkeypatch):
+    import main
+
+    now = [1000.0]
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    assert main.patient_search_cache.negative_ttl < main.patient_search_cache.ttl
+
+    assert (await search(app_client)).json() == []
+    assert (await search(app_client)).json() == []
+    assert len(search_calls.calls) == 1
+
+    now[0] += main.patient_search_cache.negative_ttl + 1
+    search_calls.results = [Patient(id="2", first_name="Jane", last_name="Doe")]
+    assert [p["id"] for p in (await search(app_client)).json()] == ["2"]
+    assert len(search_calls.calls) == 2
+
+
+async def test_admin_invalidation_forces_a_new_search(app_client, search_calls):
+    await search(app_client)
+    cleared = await app_client.delete("/api/admin/cache/patient-search")
+    assert cleared.json()["removed_count"] == 1
+
+    await search(app_client)
+    assert len(search_calls.calls) == 2
+    stats = (await app_client.get("/api/admin/cache/patient-search")).json()
+    assert stats["cache"]["loads"] >= 2
+
+
+async def test_client_filters_name_matches_by_dob_and_counts_discards(monkeypatch):
+    from services.healthie_client import HealthieApiClient
+
+    client = HealthieApiClient("https://healthie.invalid/graphql", "key")
+
+    async def execute(operation, query, variable_values=None):
+        assert variable_values == {"keywords": "Jane Doe"}
+        return {"users": [
+            {"id": "1", "first_name": "Jane", "last_name": "Doe", "dob": "1990-01-01"},
+            {"id": "2", "first_name": "Jane", "last_name": "Doe", "dob": "1985-05-05"},
+            {"id": "3", "first_name": "Jane", "last_name": "Doe", "dob": None},
+        ]}
+
+    monkeypatch.setattr(client, "_execute", execute)
+
+    assert [p.id for p in await client.search_patients_async("Jane", "Doe", "1990-01-01")] == ["1"]
+    assert client.search_stats == {"searches": 1, "upstream_rows": 3, "discarded_rows": 2, "max_upstream_rows": 3}
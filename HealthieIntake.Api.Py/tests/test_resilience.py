@@ -0,0 +1,186 @@
+"""Circuit breaker, bulkhead and deadlines around Healthie calls"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from gql.transport.exceptions import TransportQueryError, TransportServerError
+
+from services import resilience
+from services.resilience import (
+    Bulkhead, BulkheadFullError, CircuitBreaker, CircuitOpenError, DeadlineExceededError,
+    call_timeout, deadline,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controls time.monotonic() as seen by services.resilience"""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(resilience, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def fail(breaker: CircuitBreaker, times: int) -> None:
+    for _ in range(times):
+        breaker.before_call()
+        breaker.record_failure()
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("search_patients", failure_threshold=3, recovery_seconds=30)
+    fail(breaker, 2)
+    breaker.before_call()
+    breaker.record_success()
+    fail(breaker, 2)
+    assert breaker.state == "closed"
+
+    fail(breaker, 1)
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError) as rejected:
+        breaker.before_call()
+    assert rejected.value.retry_after == pytest.approx(30)
+    assert breaker.stats() == {
+        "state": "open", "consecutive_failures": 3, "times_opened": 1, "rejected": 1, "retry_in_seconds": 30.0
+    }
+
+
+def test_half_open_admits_one_probe_and_closes_on_success(clock):
+    breaker = CircuitBreaker("get_form", failure_threshold=1, recovery_seconds=30)
+    fail(breaker, 1)
+
+    clock.value += 31
+    breaker.before_call()
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_call()
+    assert breaker.rejected == 1
+
+
+def test_failed_probe_reopens_for_another_recovery_period(clock):
+    breaker = CircuitBreaker("get_form", failure_threshold=5, recovery_seconds=30)
+    fail(breaker, 5)
+
+    clock.value += 31
+    fail(breaker, 1)
+    assert breaker.state == "open"
+    assert breaker.times_opened == 2
+    clock.value += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_released_probe_lets_the_next_call_probe(clock):
+    breaker = CircuitBreaker("get_form", failure_threshold=1, recovery_seconds=30)
+    fail(breaker, 1)
+    clock.value += 31
+
+    breaker.before_call()
+    breaker.release()
+    breaker.before_call()
+    assert breaker.state == "half_open"
+
+
+async def test_bulkhead_rejects_after_waiting_and_recovers_on_release():
+    bulkhead = Bulkhead(max_concurrent=2, max_wait_seconds=0.05)
+    await bulkhead.acquire()
+    await bulkhead.acquire()
+
+    with pytest.raises(BulkheadFullError):
+        await bulkhead.acquire()
+    assert bulkhead.stats() == {"max_concurrent": 2, "in_flight": 2, "rejected": 1}
+
+    waiter = asyncio.create_task(bulkhead.acquire())
+    await asyncio.sleep(0.01)
+    bulkhead.release()
+    await waiter
+    assert bulkhead.in_flight == 2
+
+
+async def test_bulkhead_wait_is_capped_by_the_deadline():
+    bulkhead = Bulkhead(max_concurrent=1, max_wait_seconds=10)
+    await bulkhead.acquire()
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    with deadline(0.05), pytest.raises(BulkheadFullError):
+        await bulkhead.acquire()
+    assert loop.time() - started < 1
+
+
+def test_call_timeout_is_clamped_to_the_deadline():
+    assert call_timeout(10) == 10
+    with deadline(2):
+        assert call_timeout(10) <= 2
+        with deadline(30):
+            assert call_timeout(10) <= 2
+    with deadline(0.000001):
+        time.sleep(0.001)
+        with pytest.raises(DeadlineExceededError):
+            call_timeout(10)
+
+
+def client_with(execute):
+    from services.healthie_client import HealthieApiClient
+
+    client = HealthieApiClient(
+        "https://healthie.invalid/graphql", "key", max_concurrent_calls=1, bulkhead_wait=0.01,
+        breaker_failure_threshold=2, breaker_recovery=30,
+    )
+    client._session = SimpleNamespace(execute=execute)
+    return client
+
+
+async def test_only_upstream_failures_trip_the_client_breaker():
+    errors = [TransportQueryError("not found"), TransportServerError("bad request", 400),
+              TransportServerError("bad gateway", 502), asyncio.TimeoutError()]
+
+    async def execute(document, variable_values=None):
+        raise errors.pop(0)
+
+    client = client_with(execute)
+    for expected in (TransportQueryError, TransportServerError, TransportServerError, asyncio.TimeoutError):
+        with pytest.raises(expected):
+            await client._execute("get_form", None)
+
+    assert client.breakers["get_form"].state == "open"
+    with pytest.raises(CircuitOpenError):
+        await client._execute("get_form", None)
+    assert client.bulkhead.in_flight == 0
+
+
+async def test_full_bulkhead_does_not_leave_a_probe_running():
+    release = asyncio.Event()
+
+    async def execute(document, variable_values=None):
+        await release.wait()
+        return {"ok": True}
+
+    client = client_with(execute)
+    slow = asyncio.create_task(client._execute("slow", None))
+    await asyncio.sleep(0)
+
+    with pytest.raises(BulkheadFullError):
+        await client._execute("other", None)
+    release.set()
+    assert await slow == {"ok": True}
+    assert client.breakers["other"].state == "closed"
+    assert client.breakers["other"].consecutive_failures == 0
+
+
+async def test_unavailable_upstream_is_a_503_with_retry_after(app_client, monkeypatch):
+    import main
+
+    async def get_patient_async(patient_id):
+        raise CircuitOpenError("Circuit open for get_patient", retry_after=2.2)
+
+    monkeypatch.setattr(main.healthie_client, "get_patient_async", get_patient_async)
+    response = await app_client.get("/api/healthie/patients/123")
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "3"
+    assert response.json()["detail"] == "Circuit open for get_patient"
@@ -0,0 +1,69 @@
+"""IntakeRepository.search_summaries over the pg_trgm index from migrations/007"""
+import pytest
+from sqlalchemy import func, literal, literal_column, select, text
+
+from benchmarks.explain_form_data_indexes import LOAD_SQL, explain, plan_nodes
+from models.database import IntakeRecord
+from repositories import IntakeRepository
+from repositories.intake_repository import SEARCH_TEXT_SQL
+
+ROWS = 20_000
+
+
+@pytest.fixture
+async def loaded_session(pg_trgm, session):
+    """Session with ROWS synthetic intakes in its open transaction, rolled back afterwards"""
+    await session.execute(text(LOAD_SQL), {"start": 1, "stop": ROWS})
+    await session.execute(text("ANALYZE intakes"))
+    yield session
+    await session.rollback()
+
+
+def test_migration_007_builds_its_index_concurrently():
+    from migrate import discover
+
+    migration = next(m for m in discover() if m.version == 7)
+    assert not migration.transactional()
+    statements = migration.statements()
+    assert [s.split()[0] for s in statements] == ["DO", "CREATE", "ANALYZE"]
+    assert statements[1].startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_intakes_search_trgm")
+
+
+async def threshold(session) -> str:
+    return (await session.execute(text("SHOW pg_trgm.word_similarity_threshold"))).scalar_one()
+
+
+async def test_search_tolerates_typos(loaded_session):
+    rows, _ = await IntakeRepository(loaded_session).search_summaries("frist1234 last1234", limit=5)
+
+    assert rows[0]["first_name"] == "First1234"
+    assert 0 < rows[0]["similarity"] <= 1
+
+
+async def test_search_plan_uses_the_trigram_index(loaded_session):
+    await loaded_session.execute(text("SET LOCAL pg_trgm.word_similarity_threshold = 0.3"))
+    search_text = literal_column(SEARCH_TEXT_SQL)
+    statement = (
+        select(IntakeRecord.id, func.word_similarity("frist1234", search_text).label("similarity"))
+        .where(literal("frist1234").op("<%")(search_text))
+        .order_by(literal_column("similarity").desc(), IntakeRecord.id.desc())
+        .limit(26)
+    )
+
+    nodes = list(plan_nodes((await explain(loaded_session, statement))["Plan"]))
+
+    assert "ix_intakes_search_trgm" in {node["Index Name"] for node in nodes if "Index Name" in node}
+    assert not any(node["Node Type"] == "Seq Scan" for node in nodes)
+
+
+async def test_threshold_only_applies_to_the_search_transaction(pg_trgm, session):
+    await IntakeRepository(session).search_summaries("nobody", min_similarity=0.45)
+    assert await threshold(session) == "0.45"
+
+    await session.rollback()
+    assert await threshold(session) == "0.6"
+
+
+async def test_threshold_must_be_between_0_and_1():
+    with pytest.raises(ValueError):
+        await IntakeRepository(None).search_summaries("smith", min_similarity=1.5)
@@ -0,0 +1,249 @@
+"""
+Healthie sync worker - drains the healthie_sync_outbox table
+
+Runs as a separate process from the API:
+    python -m workers.healthie_sync            # poll forever
+    python -m workers.healthie_sync --once     # drain due rows and exit
+
+Rows are claimed in batches with FOR UPDATE SKIP LOCKED, so any number of
+workers can run side by side. Each batch is processed with bounded
+concurrency; failures are retried with exponential backoff and rows are
+dead-lettered after OUTBOX_MAX_ATTEMPTS. Calls the Healthie client refused
+to make (circuit open, bulkhead full) are rescheduled without counting an
+attempt. Delivery is at-least-once: a crash between the Healthie call and
+marking the row done causes a retry.
+"""
+import argparse
+import asyncio
+import logging
+import random
+import signal
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from config import settings
+from database import async_session_maker, close_db
+from models import FormAnswerGroupInput
+from models.database import HealthieSyncOutbox
+from repositories import OutboxRepository
+from services import HealthieApiClient
+from services.blob_store import BlobStore, create_blob_store, hydrate_blob_refs
+from services.resilience import UpstreamUnavailableError
+
+logger = logging.getLogger(__name__)
+
+
+class PermanentSyncError(Exception):
+    """Error that retrying cannot fix (bad payload, unknown operation)"""
+
+
+class HealthieSyncWorker:
+    """Claims outbox rows and pushes them to Healthie"""
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker,
+        healthie_client: HealthieApiClient,
+        batch_size: int = 20,
+        concurrency: int = 4,
+        max_attempts: int = 8,
+        backoff_base: float = 5.0,
+        backoff_max: float = 900.0,
+        poll_interval: float = 2.0,
+        lease_seconds: float = 300.0,
+        blob_store: Optional[BlobStore] = None,
+    ):
+        """
+        Args:
+            session_maker: Factory for database sessions
+            healthie_client: Client used to call Healthie
+            batch_size: Rows claimed per batch
+            concurrency: Max in-flight Healthie calls
+            max_attempts: Attempts before a row is dead-lettered
+            backoff_base: Delay in seconds after the first failure
+            backoff_max: Upper bound for the retry delay
+            poll_interval: Sleep between polls when the outbox is empty
+            lease_seconds: Time before a claimed row can be reclaimed
+            blob_store: Store used to inline blob references (signatures) before sending
+        """
+        self.session_maker = session_maker
+        self.healthie_client = healthie_client
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.blob_store = blob_store
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    @classmethod
+    def from_settings(cls, settings) -> "HealthieSyncWorker":
+        """Create a worker from application Settings"""
+        return cls(
+            session_maker=async_session_maker,
+            healthie_client=HealthieApiClient.from_settings(settings),
+            batch_size=settings.outbox_batch_size,
+            concurrency=settings.outbox_concurrency,
+            max_attempts=settings.outbox_max_attempts,
+            backoff_base=settings.outbox_backoff_base_seconds,
+            backoff_max=settings.outbox_backoff_max_seconds,
+            poll_interval=settings.outbox_poll_interval_seconds,
+            lease_seconds=settings.outbox_lease_seconds,
+            blob_store=create_blob_store(settings),
+        )
+
+    def backoff_delay(self, attempts: int) -> float:
+        """
+        Exponential backoff with jitter
+
+        Args:
+            attempts: Attempts made so far, including the one that just failed
+
+        Returns:
+            Seconds to wait before the next attempt
+        """
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    def unavailable_delay(self, error: UpstreamUnavailableError) -> float:
+        """
+        Delay before retrying a call that was not made
+
+        Args:
+            error: Error raised by the Healthie client
+
+        Returns:
+            The error's retry_after (or backoff_base), spread out so rows
+            rescheduled together do not all come back at once
+        """
+        delay = error.retry_after if error.retry_after else self.backoff_base
+        return min(self.backoff_max, delay) * random.uniform(1.0, 1.5)
+
+    async def run_once(self) -> int:
+        """
+        Claim and process one batch of due rows
+
+        Returns:
+            Number of rows processed
+        """
+        async with self.session_maker() as session:
+            rows = await OutboxRepository(session).claim_batch(self.batch_size, self.lease_seconds)
+
+        if rows:
+            await asyncio.gather(*(self._process(row) for row in rows))
+        return len(rows)
+
+    async def run_forever(self, stop: asyncio.Event) -> None:
+        """Poll until stop is set; a batch in progress is always finished"""
+        while not stop.is_set():
+            try:
+                processed = await self.run_once()
+            except Exception:
+                logger.exception("Outbox batch failed")
+                processed = 0
+
+            if processed < self.batch_size:
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def drain(self) -> int:
+        """
+        Process batches until no due rows remain
+
+        Returns:
+            Total number of rows processed
+        """
+        total = 0
+        while True:
+            processed = await self.run_once()
+            total += processed
+            if processed == 0:
+                return total
+
+    async def _process(self, row: HealthieSyncOutbox) -> None:
+        async with self._semaphore:
+            error: Optional[str] = None
+            permanent = False
+            unavailable: Optional[UpstreamUnavailableError] = None
+            try:
+                result = await self._execute(row.operation, row.payload)
+            except PermanentSyncError as e:
+                error, permanent = str(e), True
+            except UpstreamUnavailableError as e:
+                error, unavailable = str(e), e
+            except Exception as e:
+                error = str(e)
+
+        attempts = row.attempts + 1
+        async with self.session_maker() as session:
+            repo = OutboxRepository(session)
+            if unavailable is not None:
+                delay = self.unavailable_delay(unavailable)
+                retry_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+                await repo.reschedule(row.id, error, retry_at=retry_at)
+                logger.warning(f"Outbox {row.id} not sent, retrying in {delay:.0f}s without counting an attempt: {error}")
+            elif error is None:
+                await repo.mark_done(row.id, result)
+                logger.info(f"Outbox {row.id} synced to Healthie: {result}")
+            elif permanent or attempts >= self.max_attempts:
+                await repo.mark_failed(row.id, error, retry_at=None)
+                logger.error(f"Outbox {row.id} dead-lettered after {attempts} attempt(s): {error}")
+            else:
+                delay = self.backoff_delay(attempts)
+                retry_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+                await repo.mark_failed(row.id, error, retry_at=retry_at)
+                logger.warning(f"Outbox {row.id} attempt {attempts} failed, retrying in {delay:.0f}s: {error}")
+
+    async def _execute(self, operation: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Dispatch one outbox operation to Healthie"""
+        if operation == "create_form_answer_group":
+            if self.blob_store is not None:
+                # Healthie gets the signature image itself, not our reference
+                payload = await hydrate_blob_refs(payload, self.blob_store)
+            try:
+                input_data = FormAnswerGroupInput.model_validate(payload)
+            except ValidationError as e:
+                raise PermanentSyncError(f"Invalid payload: {e}")
+            form_answer_group_id = await self.healthie_client.create_form_answer_group_async(input_data)
+            return {"form_answer_group_id": form_answer_group_id}
+
+        raise PermanentSyncError(f"Unknown outbox operation: {operation}")
+
+
+async def main(once: bool = False) -> None:
+    worker = HealthieSyncWorker.from_settings(settings)
+    await worker.healthie_client.connect()
+    try:
+        if once:
+            processed = await worker.drain()
+            logger.info(f"Outbox drained ({processed} row(s) processed)")
+            return
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+
+        logger.info("Healthie sync worker started")
+        await worker.run_forever(stop)
+        logger.info("Healthie sync worker stopped")
+    finally:
+        await worker.healthie_client.close()
+        await close_db()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    parser = argparse.ArgumentParser(description="Drain the Healthie sync outbox")
+    parser.add_argument("--once", action="store_true", help="Process due rows and exit")
+    args = parser.parse_args()
+    asyncio.run(main(once=args.once))
@@ -42,10 +42,17 @@ function IntakeModal({ intake, onClose }) {
     ));
   };
 
+  // Blob references ("blob:sha256:<hex>") are served by the API and loaded by the browser on demand
+  const BLOB_REF_PREFIX = 'blob:sha256:';
+  const isBlobRef = (str) => typeof str === 'string' && str.startsWith(BLOB_REF_PREFIX);
+  const imageSrc = (str) => (
+    isBlobRef(str) ? `${API_BASE_URL}/api/blobs/${str.substring(BLOB_REF_PREFIX.length)}` : str
+  );
+
   // Helper to check if a string is a base64 image
   const isBase64Image = (str) => {
     if (typeof str !== 'string') return false;
-    return str.startsWith('data:image/') ||
+    return str.startsWith('data:image/') || isBlobRef(str) ||
            (str.length > 100 && /^[A-Za-z0-9+/=]+$/.test(str.substring(0, 100)));
   };
 
@@ -95,7 +102,7 @@ function IntakeModal({ intake, onClose }) {
 
     // Check if it's a base64 image or data URL
     if (typeof value === 'string' && isBase64Image(value)) {
-      const imgSrc = value.startsWith('data:') ? value : `data:image/png;base64,${value}`;
+      const imgSrc = value.startsWith('data:') || isBlobRef(value) ? imageSrc(value) : `data:image/png;base64,${value}`;
       return (
         <div className="mt-2">
           <img
@@ -341,7 +348,7 @@ function IntakeModal({ intake, onClose }) {
                           <strong>Signature:</strong>
                           <div className="mt-2">
                             <img
-                              src={signatureData.imageDataURL}
+                              src={imageSrc(signatureData.imageDataURL)}
                               alt="Patient Signature"
                               style={{
                                 maxWidth: '100%',
@@ -11,19 +11,31 @@ function AdminDashboard() {
   const [selectedIntake, setSelectedIntake] = useState(null);
   const [searchTerm, setSearchTerm] = useState('');
   const [statusFilter, setStatusFilter] = useState('all');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [totalCount, setTotalCount] = useState(0);
   const navigate = useNavigate();
 
-  // Fetch intakes from API
+  // Fetch intakes from API (status filter is applied server-side)
   useEffect(() => {
     fetchIntakes();
-  }, []);
+  }, [statusFilter]);
 
-  const fetchIntakes = async () => {
+  // Pass a cursor to append the next page; omit it to reload from the top
+  const fetchIntakes = async (cursor = null) => {
     try {
       setLoading(true);
-      const response = await axios.get(`${API_BASE_URL}/api/intake/list`);
-      // API returns { total_count, returned_count, intakes }
-      setIntakes(response.data.intakes || []);
+      const response = await axios.get(`${API_BASE_URL}/api/admin/intakes`, {
+        params: {
+          limit: 50,
+          ...(cursor ? { cursor } : {}),
+          ...(statusFilter !== 'all' ? { status: statusFilter } : {})
+        }
+      });
+      // API returns { total_count, returned_count, next_cursor, intakes } (summaries without form_data)
+      const page = response.data.intakes || [];
+      setIntakes(previous => (cursor ? [...previous, ...page] : page));
+      setNextCursor(response.data.next_cursor);
+      setTotalCount(response.data.total_count);
       setError(null);
     } catch (err) {
       console.error('Error fetching intakes:', err);
@@ -153,7 +165,7 @@ function AdminDashboard() {
           </select>
         </div>
         <div className="col-md-2">
-          <button className="btn btn-outline-primary w-100" onClick={fetchIntakes} style={{ height: '48px' }}>
+          <button className="btn btn-outline-primary w-100" onClick={() => fetchIntakes()} style={{ height: '48px' }}>
             Refresh
           </button>
         </div>
@@ -181,7 +193,7 @@ function AdminDashboard() {
           <div className="row mb-2">
             <div className="col">
               <p className="text-muted">
-                Showing {filteredIntakes.length} of {intakes.length} intake forms
+                Showing {filteredIntakes.length} of {totalCount} intake forms
               </p>
             </div>
           </div>
@@ -270,6 +282,13 @@ function AdminDashboard() {
                   </tbody>
                 </table>
               </div>
+              {nextCursor && (
+                <div className="text-center mt-3">
+                  <button className="btn btn-outline-primary" onClick={() => fetchIntakes(nextCursor)}>
+                    Load more
+                  </button>
+                </div>
+              )}
             </div>
           </div>
         </>
@@ -5,6 +5,50 @@ import MapboxAddressInput from './MapboxAddressInput';
 import SignaturePad from './SignaturePad';
 import TypedSignature from './TypedSignature';
 
+// Build an RFC 7396 merge patch turning `previous` into `next`.
+// Returns null when nothing changed.
+const isPlainObject = (value) => value !== null && typeof value === 'object' && !Array.isArray(value);
+
+const createMergePatch = (previous, next) => {
+  const patch = {};
+  Object.keys(next).forEach(key => {
+    const before = previous[key];
+    const after = next[key];
+    if (isPlainObject(before) && isPlainObject(after)) {
+      const nested = createMergePatch(before, after);
+      if (nested) patch[key] = nested;
+    } else if (JSON.stringify(before) !== JSON.stringify(after)) {
+      patch[key] = after === undefined ? null : after;
+    }
+  });
+  Object.keys(previous).forEach(key => {
+    if (!(key in next)) patch[key] = null;
+  });
+  return Object.keys(patch).length > 0 ? patch : null;
+};
+
+// Apply an RFC 7396 merge patch (null deletes a member)
+const applyMergePatch = (target, patch) => {
+  if (!isPlainObject(patch)) return patch;
+  const result = isPlainObject(target) ? { ...target } : {};
+  Object.keys(patch).forEach(key => {
+    if (patch[key] === null) {
+      delete result[key];
+    } else {
+      result[key] = applyMergePatch(result[key], patch[key]);
+    }
+  });
+  return result;
+};
+
+// Draft versions (last_updated_at) in the form draft sync events use:
+// UTC without offset, microseconds - comparable as plain strings
+const versionKey = (version) => {
+  if (!version) return null;
+  const bare = version.replace(/(Z|[+-]00:00)$/, '');
+  return bare.includes('.') ? bare : `${bare}.000000`;
+};
+
 const IntakeForm = () => {
   // State management
   const [form, setForm] = useState(null);
@@ -83,7 +127,7 @@ const IntakeForm = () => {
   const [pastMedications, setPastMedications] = useState([]);
   // Each past medication: { id: uniqueId, drugName: '', dosage: '', endDate: '', directions: '' }
 
-  // Medication autocomplete state (openFDA API)
+  // Medication autocomplete state (/api/medications/search)
   const [medicationSuggestions, setMedicationSuggestions] = useState({});
   const [showSuggestions, setShowSuggestions] = useState({});
   const [loadingSuggestions, setLoadingSuggestions] = useState({});
@@ -110,6 +154,13 @@ const IntakeForm = () => {
 
   // Signature pad refs
   const signaturePadRefs = useRef({});
+  // Last draft acknowledged by the DB, used to send only deltas (PATCH)
+  const lastSavedDraftRef = useRef(null);
+  // Idempotency-Key and timestamp of the pending submit, reused when it is retried
+  const submitAttemptRef = useRef(null);
+  // Identifies this device to draft sync, so its own changes are not pushed back to it
+  const draftClientIdRef = useRef(crypto.randomUUID());
+  const draftSyncHeaders = { 'X-Draft-Client-Id': draftClientIdRef.current };
 
   // Load form on mount
   useEffect(() => {
@@ -130,6 +181,38 @@ const IntakeForm = () => {
     }
   }, [formAnswers, dateMonths, dateDays, dateYears, checkboxSelections, currentStep, primaryLanguage, primaryLanguageOther, primaryCareProviderPhone, emergencyContactName, emergencyContactRelationship, emergencyContactPhone, hospitalizedRecently, hasMedicationAllergies, participatingInPT, medications, pastMedications, draftLoaded]);
 
+  // Receive draft changes made on the patient's other devices (replaces polling the draft)
+  useEffect(() => {
+    if (!patientId || !draftLoaded || hasCompletedIntake) return undefined;
+
+    let socket = null;
+    let retryTimer = null;
+    let retryDelay = 1000;
+    let stopped = false;
+
+    const connect = () => {
+      const wsBaseUrl = API_BASE_URL.replace(/^http/, 'ws');
+      socket = new WebSocket(
+        `${wsBaseUrl}/api/intake/draft/${encodeURIComponent(patientId)}/ws?client_id=${draftClientIdRef.current}`
+      );
+      socket.onopen = () => { retryDelay = 1000; };
+      socket.onmessage = (message) => handleDraftSyncEvent(JSON.parse(message.data));
+      socket.onclose = (event) => {
+        // 1008: draft sync is disabled on the server
+        if (stopped || event.code === 1008) return;
+        retryTimer = setTimeout(connect, retryDelay);
+        retryDelay = Math.min(retryDelay * 2, 30000);
+      };
+    };
+    connect();
+
+    return () => {
+      stopped = true;
+      clearTimeout(retryTimer);
+      if (socket) socket.close();
+    };
+  }, [patientId, draftLoaded, hasCompletedIntake]);
+
   // Calculate BMI when height or weight changes
   useEffect(() => {
     if (heightFeet && heightInches && bmiModuleId) {
@@ -472,7 +555,36 @@ const IntakeForm = () => {
         }
       };
 
-      const response = await axios.post(`${API_BASE_URL}/api/intake/draft`, draftData);
+      // Send only what changed since the last acknowledged save; fall back to
+      // a full save if there is no baseline or the server version moved on
+      let response = null;
+      const lastSaved = lastSavedDraftRef.current;
+      if (lastSaved && lastSaved.patientId === patientId) {
+        const patchResponse = await axios.patch(`${API_BASE_URL}/api/intake/draft/${patientId}`, {
+          last_updated_at: lastSaved.lastUpdatedAt,
+          first_name: draftData.first_name,
+          last_name: draftData.last_name,
+          email: draftData.email,
+          date_of_birth: draftData.date_of_birth,
+          phone: draftData.phone,
+          current_step: draftData.current_step,
+          merge_patch: createMergePatch(lastSaved.formData, draftData.form_data)
+        }, {
+          headers: draftSyncHeaders,
+          validateStatus: (status) => status === 200 || status === 404 || status === 409
+        });
+        if (patchResponse.status === 200) response = patchResponse;
+      }
+
+      if (!response) {
+        response = await axios.post(`${API_BASE_URL}/api/intake/draft`, draftData, { headers: draftSyncHeaders });
+      }
+
+      lastSavedDraftRef.current = {
+        patientId,
+        formData: draftData.form_data,
+        lastUpdatedAt: response.data.last_updated_at
+      };
       console.log('Draft saved to DB:', response.data);
       return response.data;
     } catch (error) {
@@ -482,6 +594,41 @@ const IntakeForm = () => {
     }
   };
 
+  // Apply a draft change pushed by another device. A merge patch computed
+  // against our version is applied directly; any other change newer than
+  // our version (by last_updated_at) is re-read from the API.
+  const handleDraftSyncEvent = async (event) => {
+    const lastSaved = lastSavedDraftRef.current;
+    const ownVersion = lastSaved && lastSaved.patientId === patientId ? versionKey(lastSaved.lastUpdatedAt) : null;
+
+    if (event.type === 'submitted') {
+      checkCompletedIntake(patientId);
+      return;
+    }
+    if (event.type === 'deleted') {
+      // Next save starts a new draft
+      lastSavedDraftRef.current = null;
+      return;
+    }
+    if (event.type === 'patched' && event.patch && ownVersion && event.base === ownVersion) {
+      const formData = applyMergePatch(lastSaved.formData, event.patch.merge_patch || {});
+      lastSavedDraftRef.current = { patientId, formData, lastUpdatedAt: event.last_updated_at };
+      applyDraftData({ current_step: event.patch.current_step, form_data: formData }, 'db');
+      return;
+    }
+
+    // Without a saved version of our own, the draft was already picked by loadMostRecentDraft
+    const newer = event.last_updated_at &&
+      (ownVersion ? event.last_updated_at > ownVersion : event.type !== 'subscribed');
+    if (event.type === 'resync' || newer) {
+      const draft = await loadDraftFromDB(patientId);
+      if (draft) {
+        lastSavedDraftRef.current = { patientId, formData: draft.form_data, lastUpdatedAt: draft.last_updated_at };
+        applyDraftData(draft, 'db');
+      }
+    }
+  };
+
   const clearAndStartOver = async () => {
     if (!patientId) {
       alert('No patient selected. Please search for your account first.');
@@ -500,6 +647,7 @@ const IntakeForm = () => {
     try {
       // 1. Delete draft from database
       await axios.delete(`${API_BASE_URL}/api/intake/draft/${clearingPatientId}`, {
+        headers: draftSyncHeaders,
         validateStatus: (status) => status === 200 || status === 404 // 404 is OK if no draft exists
       });
 
@@ -598,7 +746,7 @@ const IntakeForm = () => {
     ));
   };
 
-  // Debounce utility for openFDA API calls
+  // Debounce utility for medication search calls
   const debounceTimers = useRef({});
   const debounce = (func, delay, id) => {
     return (...args) => {
@@ -611,7 +759,7 @@ const IntakeForm = () => {
     };
   };
 
-  // Search openFDA for medication suggestions
+  // Search the API's medication index for suggestions
   const searchMedications = async (query, medicationId) => {
     if (query.length < 3) {
       setShowSuggestions({ ...showSuggestions, [medicationId]: false });
@@ -634,27 +782,13 @@ const IntakeForm = () => {
     setLoadingSuggestions({ ...loadingSuggestions, [medicationId]: true });
 
     try {
-      const API_KEY = '3yhXgt8QD6o3VEHPgTt38HALhJ8TZVnPquQpKDRa';
-
-      // Search both brand_name and generic_name in openFDA Drug Product (NDC) endpoint
-      // Use wildcard (*) for prefix matching: brand_name:query* OR generic_name:query*
-      const searchQuery = `(brand_name:${query}* OR generic_name:${query}*)`;
-      const url = `https://api.fda.gov/drug/ndc.json?search=${encodeURIComponent(searchQuery)}&limit=10&api_key=${API_KEY}`;
-
-      const response = await axios.get(url);
-
-      if (response.data && response.data.results) {
-        // Extract unique drug names (prefer brand name, fallback to generic)
-        const suggestions = response.data.results
-          .map(result => {
-            // Prefer brand_name, fallback to generic_name
-            const name = result.brand_name || result.generic_name || '';
-            // Some results have arrays, get first element
-            return Array.isArray(name) ? name[0] : name;
-          })
-          .filter(name => name) // Remove empty strings
-          .filter((name, index, self) => self.indexOf(name) === index) // Unique values
-          .slice(0, 10); // Limit to 10
+      // Server-side prefix index over openFDA brand and generic names (ranked, de-duplicated)
+      const response = await axios.get(`${API_BASE_URL}/api/medications/search`, {
+        params: { q: query, limit: 10 }
+      });
+
+      if (Array.isArray(response.data)) {
+        const suggestions = response.data;
 
         // Cache the results
         setSearchCache({
@@ -1250,6 +1384,22 @@ const IntakeForm = () => {
 
   // clearAndStartOver is now defined earlier in the file (near draft functions)
 
+  // Upload a signature image data URL to the blob store and return its "blob:sha256:..." reference.
+  // Falls back to the data URL itself; the API then offloads it server-side.
+  const uploadSignatureImage = async (dataURL) => {
+    if (!dataURL || !dataURL.startsWith('data:')) return dataURL;
+    try {
+      const imageBlob = await (await fetch(dataURL)).blob();
+      const response = await axios.post(`${API_BASE_URL}/api/blobs`, imageBlob, {
+        headers: { 'Content-Type': imageBlob.type }
+      });
+      return response.data.ref;
+    } catch (error) {
+      console.log('Signature upload failed, sending inline:', error.message);
+      return dataURL;
+    }
+  };
+
   const handleSubmit = async (e) => {
     e.preventDefault();
 
@@ -1392,32 +1542,39 @@ const IntakeForm = () => {
       }
 
       // Capture all signatures DIRECTLY into combinedFormAnswers (not using state)
+      // Images are uploaded to the blob store first; form_data only keeps the returned reference
       if (form) {
         const signatureModules = form.customModules.filter(m => m.modType === 'signature');
-        signatureModules.forEach(module => {
+        for (const module of signatureModules) {
           const ref = signaturePadRefs.current[module.id];
           if (ref && ref.getDataURL) {
             const dataURL = ref.getDataURL();
             if (dataURL) {
               // Check if this is new typed signature format (JSON string) or old format (data URL)
+              let parsedData = null;
               try {
-                const parsedData = JSON.parse(dataURL);
+                parsedData = JSON.parse(dataURL);
+              } catch (e) {
+                // Old SignaturePad format - just a data URL string
+              }
+
+              if (parsedData) {
                 // New TypedSignature format - store structured data
                 if (parsedData.agreed && parsedData.typedName) {
-                  combinedFormAnswers[module.id] = dataURL; // Store as JSON string
+                  const imageRef = await uploadSignatureImage(parsedData.imageDataURL);
+                  combinedFormAnswers[module.id] = JSON.stringify({ ...parsedData, imageDataURL: imageRef }); // Store as JSON string
                   // Also store individual fields for easier querying
                   combinedFormAnswers[`${module.id}_agreed`] = parsedData.agreed;
                   combinedFormAnswers[`${module.id}_timestamp`] = parsedData.timestamp;
                   combinedFormAnswers[`${module.id}_typed_name`] = parsedData.typedName;
-                  combinedFormAnswers[`${module.id}_image`] = parsedData.imageDataURL;
+                  combinedFormAnswers[`${module.id}_image`] = imageRef;
                 }
-              } catch (e) {
-                // Old SignaturePad format - just a data URL string
-                combinedFormAnswers[module.id] = dataURL;
+              } else {
+                combinedFormAnswers[module.id] = await uploadSignatureImage(dataURL);
               }
             }
           }
-        });
+        }
       }
 
       Object.keys(dateMonths).forEach(moduleId => {
@@ -1451,6 +1608,12 @@ const IntakeForm = () => {
         });
       }
 
+      // Retries after a network error reuse the key and body of the first attempt,
+      // so a double-click or resend cannot complete the intake twice
+      if (!submitAttemptRef.current) {
+        submitAttemptRef.current = { key: crypto.randomUUID(), submittedAt: new Date().toISOString() };
+      }
+
       // Build MongoDB submission object using Healthie patient data
       const mongoSubmission = {
         patient_healthie_id: patientId,
@@ -1466,7 +1629,7 @@ const IntakeForm = () => {
           // Store metadata
           patient_id: patientId,
           form_id: FORM_ID,
-          submission_date: new Date().toISOString(),
+          submission_date: submitAttemptRef.current.submittedAt,
 
           // Custom fields we track
           primary_language: primaryLanguage === 'Other' ? primaryLanguageOther : primaryLanguage,
@@ -1492,9 +1655,13 @@ const IntakeForm = () => {
       };
 
       // Submit to PostgreSQL API
-      const response = await axios.post(`${API_BASE_URL}/api/intake/submit`, mongoSubmission);
+      const response = await axios.post(`${API_BASE_URL}/api/intake/submit`, mongoSubmission, {
+        headers: { 'Idempotency-Key': submitAttemptRef.current.key, ...draftSyncHeaders }
+      });
 
       if (response.data && response.data.intake_id) {
+        submitAttemptRef.current = null;
+
         // Store patient ID before resetting state
         const submittedPatientId = patientId;
 
@@ -1513,6 +1680,7 @@ const IntakeForm = () => {
         // This ensures a clean state if user returns to the site
         try {
           await axios.delete(`${API_BASE_URL}/api/intake/draft/${submittedPatientId}`, {
+            headers: draftSyncHeaders,
             validateStatus: (status) => status === 200 || status === 404 // 404 is OK
           });
         } catch (error) {
@@ -1588,6 +1756,10 @@ const IntakeForm = () => {
         }
       }
     } catch (error) {
+      // The server answered, so the attempt is settled; a network error keeps the key for the retry
+      if (error.response) {
+        submitAttemptRef.current = null;
+      }
       setErrorMessage(`Error submitting form: ${error.message}`);
     } finally {
       setSubmitting(false);